@@ -0,0 +1,198 @@
+import json
+import os
+import time
+
+from persistence import atomic_write_text
+
+# -------------------- 운동/루틴별 집계 인덱스 --------------------
+# 기록을 추가/삭제할 때마다 그 기록에 든 운동과 루틴의 집계만 고친다.
+#   total    : 누적 횟수
+#   sessions : 해당 운동/루틴이 들어간 기록 수
+#   last     : 마지막으로 한 날짜
+#   best     : 한 세션 최고 횟수 (hist = 횟수별 세션 수, 최고 기록이 지워질 때 다음 최고를 찾는 용도)
+# workout_aggregates.json 에 저장하며, 저장소 도장(stamp)이 다르면 원본 기록으로 다시 만든다.
+# 보관된 해(record_archive.py)는 manifest 의 연도별 요약을 더하므로 보관 파일을 열지 않는다.
+
+AGGREGATE_SCHEMA = 1
+
+KIND_EXERCISE = "exercise"
+KIND_ROUTINE = "routine"
+
+
+def _reps(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Stats:
+    """운동 하나 또는 루틴 하나의 집계"""
+    __slots__ = ("total", "sessions", "last", "best", "hist")
+
+    def __init__(self):
+        self.total = 0
+        self.sessions = 0
+        self.last = None
+        self.best = 0
+        self.hist = {}
+
+    def add(self, value, date):
+        self.total += value
+        self.sessions += 1
+        self.hist[value] = self.hist.get(value, 0) + 1
+        if self.sessions == 1 or value > self.best:
+            self.best = value
+        if date and (self.last is None or date > self.last):
+            self.last = date
+
+    def remove(self, value, date):
+        """집계에서 빼기 — 마지막 날짜를 다시 찾아야 하면 True"""
+        self.total -= value
+        self.sessions -= 1
+        left = self.hist.get(value, 0) - 1
+        if left > 0:
+            self.hist[value] = left
+        else:
+            self.hist.pop(value, None)
+            if value == self.best:
+                self.best = max(self.hist, default=0)
+        if date and date == self.last:
+            self.last = None
+            return self.sessions > 0
+        return False
+
+    def merge(self, other):
+        """다른 집계(예: 보관된 해의 요약)를 더한다"""
+        self.total += other.total
+        self.sessions += other.sessions
+        for value, n in other.hist.items():
+            self.hist[value] = self.hist.get(value, 0) + n
+        self.best = max(self.hist, default=0)
+        if other.last and (self.last is None or other.last > self.last):
+            self.last = other.last
+
+    def to_json(self):
+        return [self.total, self.sessions, self.last, self.best, [[k, v] for k, v in self.hist.items()]]
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls()
+        stats.total, stats.sessions, stats.last, stats.best, hist = data
+        stats.hist = {k: v for k, v in hist}
+        return stats
+
+
+class AggregateIndex:
+    """운동/루틴별 집계 인덱스 (기록 추가/삭제 시 증분 갱신)"""
+
+    def __init__(self, resolver=None):
+        self.exercises = {}     # 운동 이름 -> Stats
+        self.routines = {}      # 루틴 이름 -> Stats
+        self.stamp = None       # 이 집계가 만들어진 시점의 저장소 도장
+        self.resolver = resolver  # (kind, name) -> 가장 최근 날짜 — 마지막 기록이 지워졌을 때만 사용
+        self._stale_last = set()
+
+    # ---------- 갱신 ----------
+    def add(self, rec):
+        date = rec.get("date")
+        session_total = 0
+        for name, value in rec.items():
+            if name == "date" or name == "routine":
+                continue
+            value = _reps(value)
+            if value is None:
+                continue
+            session_total += value
+            self.exercises.setdefault(name, Stats()).add(value, date)
+        self.routines.setdefault(rec.get("routine", ""), Stats()).add(session_total, date)
+
+    def remove(self, rec):
+        date = rec.get("date")
+        session_total = 0
+        for name, value in rec.items():
+            if name == "date" or name == "routine":
+                continue
+            value = _reps(value)
+            if value is None or name not in self.exercises:
+                continue
+            session_total += value
+            self._remove_from(self.exercises, KIND_EXERCISE, name, value, date)
+        routine = rec.get("routine", "")
+        if routine in self.routines:
+            self._remove_from(self.routines, KIND_ROUTINE, routine, session_total, date)
+
+    def _remove_from(self, table, kind, name, value, date):
+        stats = table[name]
+        if stats.remove(value, date):
+            self._stale_last.add((kind, name))
+        if stats.sessions <= 0:
+            del table[name]
+            self._stale_last.discard((kind, name))
+
+    def rebuild(self, records, summaries=()):
+        """원본 기록으로 처음부터 다시 만들기 (summaries: 보관된 해의 요약 — 그 해의 기록은 records 에 없다)"""
+        self.exercises = {}
+        self.routines = {}
+        self._stale_last = set()
+        for summary in summaries:
+            for table, key in ((self.exercises, "exercises"), (self.routines, "routines")):
+                for name, data in summary.get(key, {}).items():
+                    table.setdefault(name, Stats()).merge(Stats.from_json(data))
+        for rec in records:
+            self.add(rec)
+
+    # ---------- 조회 (O(1)) ----------
+    def get(self, name, kind=KIND_EXERCISE):
+        table = self.exercises if kind == KIND_EXERCISE else self.routines
+        stats = table.get(name)
+        if stats is not None and (kind, name) in self._stale_last:
+            self._stale_last.discard((kind, name))
+            if self.resolver is not None:
+                stats.last = self.resolver(kind, name)
+        return stats
+
+    def last_performed(self, name, kind=KIND_EXERCISE):
+        stats = self.get(name, kind)
+        return stats.last if stats else None
+
+    # ---------- 저장 ----------
+    def to_json(self):
+        return {
+            "schema": AGGREGATE_SCHEMA,
+            "stamp": self.stamp,
+            "exercises": {k: v.to_json() for k, v in self.exercises.items()},
+            "routines": {k: v.to_json() for k, v in self.routines.items()},
+            "stale_last": [list(k) for k in self._stale_last],
+        }
+
+    def save(self, path):
+        for _ in range(3):
+            try:
+                text = json.dumps(self.to_json(), ensure_ascii=False, separators=(",", ":"))
+                break
+            except RuntimeError:
+                # UI 스레드가 갱신하는 중이었다 — 끝나면 저장 요청이 다시 온다
+                time.sleep(0.01)
+        else:
+            return
+        atomic_write_text(path, text)
+
+    @classmethod
+    def load(cls, path, resolver=None):
+        """저장된 집계를 읽는다 (없거나 형식이 다르면 None)"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("schema") != AGGREGATE_SCHEMA:
+                return None
+            index = cls(resolver)
+            index.stamp = data.get("stamp")
+            index.exercises = {k: Stats.from_json(v) for k, v in data.get("exercises", {}).items()}
+            index.routines = {k: Stats.from_json(v) for k, v in data.get("routines", {}).items()}
+            index._stale_last = {tuple(k) for k in data.get("stale_last", [])}
+        except (ValueError, TypeError, AttributeError):
+            return None
+        return index
@@ -0,0 +1,249 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy 가 없으면 분석 기능만 쓸 수 없다
+    np = None
+
+# -------------------- 운동량 분석 --------------------
+# 기록 {date, routine, <운동 이름>: 총 횟수} 목록을 열(column) 배열로 바꿔서
+# 주/월별 운동량, 이동 평균, 연속 운동일, 개인 최고 기록을 한 번에 계산한다.
+#   세션 열 : day(1970-01-01 부터 일 수), routine id
+#   결과 열 : session 번호, exercise id, reps  (기록 하나에 운동 여러 개)
+# 계산 결과는 같은 인자로 다시 부르면 캐시에서 돌려준다 (엔진은 만들어진 뒤 바뀌지 않음).
+# 앱은 읽어 둔 기록(CompactRecords)의 열 배열을 그대로 복사해서 만든다 (from_compact — 기록 dict 를 만들지 않는다).
+
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+
+NO_DAY = -2 ** 63    # 날짜를 읽을 수 없는 기록 (NaT 와 같은 값)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("analytics requires numpy (pip install numpy)")
+
+
+class TrainingAnalytics:
+    """기록을 NumPy 열 배열로 들고 있는 분석 엔진"""
+
+    def __init__(self, records):
+        """records: 기록 dict (오래된 순서)"""
+        _require_numpy()
+        self.routine_names = []
+        self.exercise_names = []
+        self.routine_ids = {}
+        self.exercise_ids = {}
+        self._set_columns(*self._encode(records))
+
+    @classmethod
+    def from_compact(cls, records):
+        """최신순 CompactRecords (HistoryLoader.loaded) 의 열 배열로 만든다
+        — 열로 담지 못한 기록과 앞에 추가된 기록만 dict 로 읽는다"""
+        _require_numpy()
+        self = cls.__new__(cls)
+        # 열은 최신순이므로 뒤집어서 오래된 순서로 (결과 열도 통째로 뒤집으면 세션 순서와 맞는다)
+        routine = _column(records.routine_ids, np.int32)[::-1]
+        columned = routine >= 0
+        widths = np.diff(_column(records.offsets, np.int64))[::-1][columned]
+        session_day = _column(records.dates, np.int64)[::-1][columned] // 86400
+        result_reps = _column(records.result_reps, np.int64)[::-1]
+        # 이름 표는 다른 목록과 같이 쓰므로 이 기록에 나온 이름만 남긴다
+        routine_used, session_routine = np.unique(routine[columned], return_inverse=True)
+        exercise_used, result_exercise = np.unique(_column(records.result_exercise, np.int32)[::-1],
+                                                   return_inverse=True)
+        self.routine_names = [records.routines.names[i] for i in routine_used]
+        self.exercise_names = [records.exercises.names[i] for i in exercise_used]
+        self.routine_ids = {name: i for i, name in enumerate(self.routine_names)}
+        self.exercise_ids = {name: i for i, name in enumerate(self.exercise_names)}
+        sessions = len(session_day)
+        extra = self._encode(reversed(records.dict_records()))
+        self._set_columns(
+            np.concatenate((session_day, extra[0])),
+            np.concatenate((session_routine.astype(np.int32), extra[1])),
+            np.concatenate((np.repeat(np.arange(sessions, dtype=np.int32), widths), extra[2] + sessions)),
+            np.concatenate((result_exercise.astype(np.int32), extra[3])),
+            np.concatenate((result_reps, extra[4])))
+        return self
+
+    def _encode(self, records):
+        """기록 dict -> (day, session routine, result session, result exercise, reps) 배열 (이름 표에 이어서)"""
+        routine_ids = self.routine_ids
+        exercise_ids = self.exercise_ids
+        days = []
+        sess_routine = array("i")
+        res_session = array("i")
+        res_exercise = array("i")
+        res_reps = array("q")
+
+        for rec in records:
+            date = rec.get("date")
+            routine = rec.get("routine", "")
+            rid = routine_ids.get(routine)
+            if rid is None:
+                rid = routine_ids[routine] = len(self.routine_names)
+                self.routine_names.append(routine)
+            sid = len(days)
+            days.append(date[:10] if isinstance(date, str) else "")
+            sess_routine.append(rid)
+            for name, reps in rec.items():
+                if name == "date" or name == "routine":
+                    continue
+                try:
+                    reps = int(reps)
+                except (TypeError, ValueError):
+                    continue
+                eid = exercise_ids.get(name)
+                if eid is None:
+                    eid = exercise_ids[name] = len(self.exercise_names)
+                    self.exercise_names.append(name)
+                res_session.append(sid)
+                res_exercise.append(eid)
+                res_reps.append(reps)
+
+        return (_parse_days(days), _column(sess_routine, np.int32), _column(res_session, np.int32),
+                _column(res_exercise, np.int32), _column(res_reps, np.int64))
+
+    def _set_columns(self, session_day, session_routine, result_session, result_exercise, result_reps):
+        self.session_day = session_day
+        self.session_routine = session_routine
+        self.result_session = result_session
+        self.result_exercise = result_exercise
+        self.result_reps = result_reps
+        self.result_day = self.session_day[self.result_session]
+        self._cache = {}
+
+    @property
+    def session_count(self):
+        return len(self.session_day)
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    # ---------- 기간별 운동량 ----------
+    def volume(self, period=PERIOD_WEEK):
+        """운동별 기간 운동량 -> (기간 시작일 배열 datetime64[D], 운동 이름 목록, [운동 x 기간] 합계 행렬)"""
+        return self._cached(("volume", period), lambda: self._volume(period))
+
+    def _volume(self, period):
+        valid = self.result_day != NO_DAY
+        day = self.result_day[valid]
+        ex = self.result_exercise[valid]
+        reps = self.result_reps[valid]
+        n_ex = len(self.exercise_names)
+        if len(day) == 0:
+            return np.zeros(0, "datetime64[D]"), list(self.exercise_names), np.zeros((n_ex, 0), np.int64)
+        bucket = _period_index(day, period)
+        first = int(bucket.min())
+        n_periods = int(bucket.max()) - first + 1
+        flat = ex.astype(np.int64) * n_periods + (bucket - first)
+        totals = np.bincount(flat, weights=reps, minlength=n_ex * n_periods)
+        matrix = totals.astype(np.int64).reshape(n_ex, n_periods)
+        starts = _period_start(np.arange(first, first + n_periods), period)
+        return starts, list(self.exercise_names), matrix
+
+    def exercise_volume(self, exercise, period=PERIOD_WEEK):
+        """운동 하나의 기간별 운동량 -> (기간 시작일, 합계)"""
+        starts, _, matrix = self.volume(period)
+        eid = self.exercise_ids.get(exercise)
+        if eid is None:
+            return starts, np.zeros(len(starts), np.int64)
+        return starts, matrix[eid]
+
+    def rolling_average(self, exercise, window=4, period=PERIOD_WEEK):
+        """기간별 운동량의 이동 평균 (앞쪽 window-1 개 기간은 있는 만큼만 평균)"""
+        def compute():
+            starts, series = self.exercise_volume(exercise, period)
+            if len(series) == 0:
+                return starts, np.zeros(0)
+            csum = np.cumsum(np.concatenate(([0], series)).astype(np.float64))
+            idx = np.arange(1, len(series) + 1)
+            lo = np.maximum(idx - window, 0)
+            return starts, (csum[idx] - csum[lo]) / (idx - lo)
+        return self._cached(("rolling", exercise, window, period), compute)
+
+    # ---------- 연속 운동일 ----------
+    def streaks(self, exercise=None):
+        """연속으로 운동한 날 수 -> {"current", "longest", "last_day"}"""
+        def compute():
+            if exercise is None:
+                day = self.session_day
+            else:
+                eid = self.exercise_ids.get(exercise)
+                day = self.result_day[self.result_exercise == eid] if eid is not None else np.zeros(0, np.int64)
+            day = np.unique(day[day != NO_DAY])
+            if len(day) == 0:
+                return {"current": 0, "longest": 0, "last_day": None}
+            breaks = np.flatnonzero(np.diff(day) != 1)
+            run_starts = np.concatenate(([0], breaks + 1))
+            run_ends = np.concatenate((breaks, [len(day) - 1]))
+            lengths = run_ends - run_starts + 1
+            return {
+                "current": int(lengths[-1]),
+                "longest": int(lengths.max()),
+                "last_day": np.datetime64(int(day[-1]), "D"),
+            }
+        return self._cached(("streaks", exercise), compute)
+
+    # ---------- 개인 최고 기록 ----------
+    def personal_bests(self):
+        """운동별 한 세션 최고 횟수 -> {운동 이름: (횟수, 날짜 datetime64[D] 또는 None)}"""
+        def compute():
+            if len(self.result_reps) == 0:
+                return {}
+            # 운동 번호 오름차순, 같은 운동 안에서는 횟수 내림차순 → 운동별 첫 줄이 최고 기록
+            order = np.lexsort((-self.result_reps, self.result_exercise))
+            ex_sorted = self.result_exercise[order]
+            first = np.flatnonzero(np.concatenate(([True], ex_sorted[1:] != ex_sorted[:-1])))
+            best = {}
+            for i in order[first]:
+                day = int(self.result_day[i])
+                best[self.exercise_names[self.result_exercise[i]]] = (
+                    int(self.result_reps[i]), np.datetime64(day, "D") if day != NO_DAY else None)
+            return best
+        return self._cached(("bests",), compute)
+
+    def totals(self):
+        """운동별 전체 누적 횟수"""
+        def compute():
+            sums = np.bincount(self.result_exercise, weights=self.result_reps, minlength=len(self.exercise_names))
+            return {name: int(sums[i]) for i, name in enumerate(self.exercise_names)}
+        return self._cached(("totals",), compute)
+
+
+def _column(values, dtype):
+    """array.array -> 복사한 NumPy 배열 (원래 배열은 계속 늘거나 줄 수 있다)"""
+    if not len(values):
+        return np.zeros(0, dtype)
+    return np.frombuffer(values, dtype=dtype).copy()
+
+
+def _parse_days(day_strings):
+    """'YYYY-MM-DD' 목록 -> 1970-01-01 부터의 일 수 (읽을 수 없는 날짜는 NO_DAY)"""
+    if not day_strings:
+        return np.zeros(0, np.int64)
+    try:
+        return np.array(day_strings, dtype="datetime64[D]").astype(np.int64)
+    except ValueError:
+        out = np.empty(len(day_strings), np.int64)
+        for i, s in enumerate(day_strings):
+            try:
+                out[i] = np.datetime64(s, "D").astype(np.int64)
+            except ValueError:
+                out[i] = NO_DAY
+        return out
+
+
+def _period_index(day, period):
+    if period == PERIOD_MONTH:
+        return day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    # 1970-01-01 은 목요일 → 월요일 시작 주 번호
+    return (day + 3) // 7
+
+
+def _period_start(index, period):
+    if period == PERIOD_MONTH:
+        return index.astype("datetime64[M]").astype("datetime64[D]")
+    return (index * 7 - 3).astype("datetime64[D]")
@@ -0,0 +1,365 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import analytics
+from paths import data_files
+from perf import PERF, percentile
+from record_archive import archive_before, archive_months
+from storage import BACKEND_JSON, BACKEND_SQLITE, open_store
+
+# -------------------- 벤치마크 --------------------
+# 합성 데이터(기록 1천 ~ 1백만 개, 운동 수백 개짜리 루틴)로 앱 동작을 화면 없이 돌려서
+# 동작별 지연 시간 백분위(p50/p90/p99)와 최대 메모리를 JSON 파일로 남긴다.
+#   python benchmark.py run     [--sizes 1000,10000,100000] [--backend json|sqlite|all] [--out FILE]
+#   python benchmark.py compare OLD.json NEW.json [--threshold 0.2]
+# --breakdown 을 주면 앱 계측(perf.py)을 켜고 안쪽 구간(json.dumps, 줄 위젯 만들기, 글자 텍스처 ...)별 요약도 남긴다.
+# (저장소, 크기) 조합마다 하위 프로세스를 따로 띄운다 — 저장 방식은 main.py 를 불러올 때 정해지고,
+# 프로세스 최대 메모리(max_rss)도 조합별로 따로 재야 하기 때문이다.
+# Kivy 창은 SDL 의 offscreen 드라이버로 만들어서 화면 없이도 실제 위젯 코드를 그대로 탄다.
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+ROUTINES = 5
+EXERCISES_PER_RECORD = 5
+START_DATE = datetime(2015, 1, 1)
+SPAN = timedelta(days=3650)     # 기록 날짜는 크기와 상관없이 10년에 걸쳐 고르게
+
+RESULT_VERSION = 1
+
+
+# -------------------- 합성 데이터 --------------------
+def make_routines(count, exercises):
+    names = [f"Exercise {j:03d}" for j in range(exercises)]
+    return {f"Routine {i}": {"description": f"synthetic routine {i}",
+                             "exercises": [{"name": name, "sets": 3, "reps": 10, "rest": 30} for name in names]}
+            for i in range(count)}
+
+
+def make_records(size, routines, seed=1):
+    """날짜순 합성 기록 (루틴마다 운동 몇 개씩 골라서 횟수를 채운다)"""
+    rng = random.Random(seed)
+    names = list(routines)
+    step = max(1, int(SPAN.total_seconds() // max(size, 1)))
+    for i in range(size):
+        routine = names[i % len(names)]
+        rec = {"date": (START_DATE + timedelta(seconds=i * step)).strftime("%Y-%m-%d %H:%M:%S"),
+               "routine": routine}
+        for ex in rng.sample(routines[routine]["exercises"], EXERCISES_PER_RECORD):
+            rec[ex["name"]] = rng.randint(0, 30)
+        yield rec
+
+
+def generate(data_dir, backend, size, exercises, seed=1):
+    files = data_files(data_dir)
+    store = open_store(backend, files)
+    try:
+        routines = make_routines(ROUTINES, exercises)
+        store.save_routines(routines)
+        batch = []
+        for rec in make_records(size, routines, seed):
+            batch.append(rec)
+            if len(batch) >= 10000:
+                store.add_records(batch)
+                batch = []
+        if batch:
+            store.add_records(batch)
+        # 앱이 처음 열 때 하는 보관을 미리 해 두어 시작 시간은 평소 상태로 잰다
+        store.archive_records(archive_before(archive_months()))
+    finally:
+        store.close()
+
+
+# -------------------- 측정 --------------------
+def summarize(times, peak_bytes):
+    ms = sorted(t * 1000 for t in times)
+    return {
+        "samples": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 4),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p90_ms": round(percentile(ms, 90), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(ms[-1], 4),
+        "peak_kb": None if peak_bytes is None else round(peak_bytes / 1024, 1),
+    }
+
+
+def measure(func, repeat, setup=None, memory=True):
+    """func 를 repeat 번 재고, 따로 한 번 더 돌려 tracemalloc 최대 메모리를 잰다
+    (tracemalloc 은 느려서 시간 측정과 같이 돌리지 않는다 / 두 번 돌릴 수 없는 동작은 memory=False)"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    if not memory:
+        return summarize(times, None)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return summarize(times, peak)
+
+
+# -------------------- 앱 동작 (하위 프로세스) --------------------
+def _import_app():
+    """화면 없이 main.py 를 불러온다 (현재 폴더가 데이터 폴더여야 한다)"""
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    os.environ.setdefault("KIVY_NO_FILELOG", "1")
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    import main
+    return main
+
+
+def run_case(data_dir, backend, size, exercises, repeat, heavy_repeat, seed=1):
+    """데이터를 만들고 앱을 띄워서 동작별로 잰다 -> 결과 dict"""
+    start = time.perf_counter()
+    generate(data_dir, backend, size, exercises, seed)
+    generate_s = time.perf_counter() - start
+
+    os.environ["ECOFIT_STORAGE"] = backend
+    os.chdir(data_dir)     # main.py 의 데이터 파일 경로는 현재 폴더 기준
+    app_module = _import_app()
+    app = app_module.WorkoutApp()
+    ops = {}
+
+    def startup():
+        app.build()
+        app._startup_load(0)
+    ops["startup"] = measure(startup, 1, memory=False)
+
+    names = sorted(app.routines)
+    routine = app.routines[names[0]]
+
+    # ---------- 저장 / 읽기 ----------
+    def touch_routine():
+        routine["exercises"][0]["reps"] += 1
+    ops["save_data"] = measure(app.save_data, repeat, setup=touch_routine)
+
+    def drop_loaded_records():
+        # JSON 저장소는 한 번 읽은 기록을 들고 있으므로 매번 파일에서 다시 읽게 한다 (SQLite 는 캐시가 없다)
+        if hasattr(app.store, "records"):
+            app.store.records = None
+    ops["load_records"] = measure(app.load_records, heavy_repeat, setup=drop_loaded_records)
+    drop_loaded_records()   # 뒤의 동작은 앱처럼 기록을 구간별로 읽는 상태에서 잰다
+
+    # ---------- 기록 화면 ----------
+    ops["show_records"] = measure(app.show_records, repeat, setup=app.history.reset)
+    app.show_records()
+    ops["records_page"] = measure(app.load_record_page, repeat)
+
+    def load_all_history():
+        app.history.reset()
+        app.history.all()
+    # 전체 기록 색인 비용 (앱에서는 search() 가 여러 프레임에 나눠서 한다)
+    ops["history_index"] = measure(lambda: app.history.index().catch_up(), heavy_repeat, setup=load_all_history)
+
+    def drop_analytics():
+        app._analytics_version = None
+    # 분석 엔진 만들기 (읽어 둔 기록의 열 배열을 복사) — numpy 가 없으면 건너뛴다
+    if analytics.np is not None:
+        ops["analytics"] = measure(app.analytics, heavy_repeat, setup=drop_analytics)
+    app.history.reset()
+    app.show_records()
+
+    def set_filter():
+        app.record_filters["routine"].text = names[1]
+        app.record_filters["prefix"].text = "Exercise 01"
+    ops["records_filter"] = measure(app.apply_record_filter, repeat, setup=set_filter)
+
+    def clear_filter():
+        for field in app.record_filters.values():
+            field.text = ""
+        app.apply_record_filter()
+
+    # ---------- 루틴 화면 ----------
+    clear_filter()
+    app.open_routine(names[0])
+    ops["open_routine"] = measure(lambda: app.open_routine(names[1]), repeat,
+                                  setup=lambda: app.open_routine(names[0]))
+    app.open_routine(names[0])
+    ops["refresh_exercise_list"] = measure(lambda: app.refresh_exercise_list(routine), repeat,
+                                           setup=touch_routine)
+
+    # ---------- 운동 진행 ----------
+    def next_set():
+        # 휴식은 건너뛰고, 세션이 끝났으면 새로 시작
+        if app.session is not None and app.session.step.kind == app_module.STEP_REST:
+            app.rest_timer.skip()
+        if app.session is None or app.session.done:
+            app.start_routine(app_module.MODE_SEQUENTIAL)
+        app.actual_reps = 10
+    app.session = None
+    ops["complete_set"] = measure(app.complete_set, repeat, setup=next_set)
+
+    app.on_stop()
+    return {
+        "backend": backend,
+        "size": size,
+        "exercises": exercises,
+        "generate_s": round(generate_s, 3),
+        # ru_maxrss: 리눅스는 KB, macOS 는 바이트
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1),
+        "ops": ops,
+        "breakdown": PERF.stats() if PERF.enabled else None,
+    }
+
+
+# -------------------- 명령 --------------------
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def cmd_run(args):
+    backends = (BACKEND_JSON, BACKEND_SQLITE) if args.backend == "all" else (args.backend,)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    result = {
+        "version": RESULT_VERSION,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"exercises": args.exercises, "repeat": args.repeat, "heavy_repeat": args.heavy_repeat,
+                     "seed": args.seed, "breakdown": args.breakdown},
+        "cases": [],
+    }
+    for backend in backends:
+        for size in sizes:
+            work = tempfile.mkdtemp(prefix=f"ecofit-bench-{backend}-{size}-")
+            case_file = os.path.join(work, "case.json")
+            data_dir = os.path.join(work, "data")
+            os.mkdir(data_dir)
+            cmd = [sys.executable, os.path.abspath(__file__), "case", data_dir, case_file,
+                   "--backend", backend, "--size", str(size), "--exercises", str(args.exercises),
+                   "--repeat", str(args.repeat), "--heavy-repeat", str(args.heavy_repeat), "--seed", str(args.seed)]
+            env = dict(os.environ, ECOFIT_PERF="1" if args.breakdown else "0")
+            print(f"{backend} {size}...", file=sys.stderr, flush=True)
+            try:
+                subprocess.run(cmd, check=True, env=env)
+                with open(case_file, "r", encoding="utf-8") as f:
+                    case = json.load(f)
+            finally:
+                shutil.rmtree(work, ignore_errors=True)
+            result["cases"].append(case)
+            for name, op in case["ops"].items():
+                peak = "-" if op["peak_kb"] is None else f"{op['peak_kb']:.1f} KB"
+                print(f"  {name:22s} p50 {op['p50_ms']:10.3f} ms  p99 {op['p99_ms']:10.3f} ms  peak {peak:>12s}",
+                      file=sys.stderr)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"results -> {args.out}")
+    return 0
+
+
+def cmd_case(args):
+    case = run_case(args.data_dir, args.backend, args.size, args.exercises, args.repeat, args.heavy_repeat, args.seed)
+    with open(args.case_file, "w", encoding="utf-8") as f:
+        json.dump(case, f)
+    return 0
+
+
+def _op_table(result):
+    return {(case["backend"], case["size"], name): op
+            for case in result["cases"] for name, op in case["ops"].items()}
+
+
+def cmd_compare(args):
+    """두 결과 파일의 p50/p99 비교 — threshold 보다 느려진 동작이 있으면 종료 코드 1
+    (1ms 도 안 걸리는 동작의 흔들림은 빼도록 min_ms 이상 차이 날 때만 느려진 것으로 본다)"""
+    with open(args.old, "r", encoding="utf-8") as f:
+        old = _op_table(json.load(f))
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = _op_table(json.load(f))
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        changes = []
+        for metric in ("p50_ms", "p99_ms"):
+            change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            changes.append(change)
+        flag = ""
+        if changes[0] > args.threshold and after["p50_ms"] - before["p50_ms"] > args.min_ms:
+            regressions += 1
+            flag = "  <-- slower"
+        backend, size, name = key
+        print(f"{backend:6s} {size:>8d} {name:22s} p50 {before['p50_ms']:10.3f} -> {after['p50_ms']:10.3f} "
+              f"({changes[0]:+.0%})  p99 {before['p99_ms']:10.3f} -> {after['p99_ms']:10.3f} ({changes[1]:+.0%}){flag}")
+    only_old, only_new = len(old.keys() - new.keys()), len(new.keys() - old.keys())
+    if only_old or only_new:
+        print(f"not compared: {only_old} only in old, {only_new} only in new")
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+COMMANDS = {
+    "run": cmd_run,
+    "case": cmd_case,
+    "compare": cmd_compare,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="Ecofit headless benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_case_options(p):
+        p.add_argument("--exercises", type=int, default=300, help="exercises per routine (default 300)")
+        p.add_argument("--repeat", type=int, default=30, help="samples per cheap operation (default 30)")
+        p.add_argument("--heavy-repeat", type=int, default=3,
+                       help="samples for whole-history operations (default 3)")
+        p.add_argument("--seed", type=int, default=1)
+
+    run = sub.add_parser("run", help="generate datasets and measure every operation")
+    run.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                     help="comma separated record counts (e.g. 1000,1000000)")
+    run.add_argument("--backend", choices=(BACKEND_JSON, BACKEND_SQLITE, "all"), default="all")
+    run.add_argument("--out", default="benchmark_results.json", help="result file (JSON)")
+    run.add_argument("--breakdown", action="store_true",
+                     help="also record the in-app instrumentation (perf.py) per case")
+    add_case_options(run)
+
+    case = sub.add_parser("case", help=argparse.SUPPRESS)
+    case.add_argument("data_dir")
+    case.add_argument("case_file")
+    case.add_argument("--backend", choices=(BACKEND_JSON, BACKEND_SQLITE), required=True)
+    case.add_argument("--size", type=int, required=True)
+    add_case_options(case)
+
+    compare = sub.add_parser("compare", help="compare two result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=0.2,
+                         help="p50 slowdown that counts as a regression (default 0.2 = 20%%)")
+    compare.add_argument("--min-ms", type=float, default=0.5,
+                         help="ignore p50 changes smaller than this many ms (default 0.5)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import sys
+
+from aggregates import AggregateIndex
+from compact_records import CompactRecords
+from data_exchange import (drain, export_records, export_routines, import_records, import_routines,
+                           validate_record, validate_routine)
+from paths import data_files, get_data_path
+from profiles import ProfileManager
+from record_archive import archive_before, archive_months
+from record_journal import record_key
+from storage import BACKEND_JSON, BACKEND_SQLITE, open_store
+
+# -------------------- 명령줄 도구 --------------------
+# 화면 없이 데이터 폴더를 처리한다 (Kivy 를 불러오지 않음).
+#   python cli.py stats    [--data-dir DIR] [--json] [--analytics]
+#   python cli.py compact  [--data-dir DIR]
+#   python cli.py archive  [--months N] [--data-dir DIR]
+#   python cli.py validate [--data-dir DIR]
+#   python cli.py merge    SRC_DIR [--data-dir DIR]
+#   python cli.py export   [--routines PATH] [--records PATH] [--data-dir DIR]
+#   python cli.py profiles [--data-dir DIR]
+# --data-dir 가 없으면 앱과 같은 위치를 쓰고, 저장 방식은 --backend 또는 ECOFIT_STORAGE 로 정한다.
+# 명령은 앱에서 마지막으로 쓴 프로필에 적용된다 (--profile NAME 으로 다른 프로필 지정).
+# 조회 명령(stats, validate, export, profiles)과 merge 의 원본 폴더는 읽기 전용으로 연다 —
+# 옮기기(마이그레이션)나 manifest 쓰기로 폴더를 바꾸지 않는다.
+
+
+def open_data(data_dir, backend, read_only=False):
+    return open_store(backend, data_files(data_dir), read_only=read_only)
+
+
+def profile_manager(data_dir):
+    return ProfileManager(get_data_path("") if data_dir is None else data_dir)
+
+
+def profile_dir(data_dir, profile=None):
+    """프로필의 데이터 폴더 (profile 이 없으면 앱에서 마지막으로 쓴 프로필)"""
+    manager = profile_manager(data_dir)
+    if profile is None:
+        return manager.data_dir()
+    pid = manager.find(profile)
+    if pid is None:
+        raise ValueError(f"no such profile: {profile}")
+    return manager.data_dir(pid)
+
+
+def _print(data, as_json):
+    if as_json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    for key, value in data.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for k, v in value.items():
+                print(f"  {k}: {v}")
+        else:
+            print(f"{key}: {value}")
+
+
+# -------------------- 명령 --------------------
+def cmd_stats(store, args):
+    routines = store.load_routines()
+    index = AggregateIndex()
+    # 보관된 해는 요약만 더한다 (압축 파일을 풀지 않음)
+    index.rebuild(store.iter_records(archived=False), store.archive_summaries())
+    head = store.records_header()
+    data = {
+        "routines": len(routines),
+        "records": head.get("count", 0),
+        "latest": head.get("latest"),
+        "sessions_by_routine": {name: s.sessions for name, s in sorted(index.routines.items())},
+        "total_reps": {name: s.total for name, s in sorted(index.exercises.items())},
+        "best_reps": {name: s.best for name, s in sorted(index.exercises.items())},
+    }
+    if args.analytics:
+        # 연속 운동일/최고 기록 날짜는 보관된 해까지 전체 기록을 읽어서 분석 엔진으로 계산한다
+        from analytics import TrainingAnalytics
+        try:
+            engine = TrainingAnalytics.from_compact(CompactRecords(store.iter_records(newest_first=True)))
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            return 2
+        streak = engine.streaks()
+        data["streak_days"] = {"current": streak["current"], "longest": streak["longest"],
+                               "last_day": None if streak["last_day"] is None else str(streak["last_day"])}
+        data["best_dates"] = {name: None if day is None else str(day)
+                              for name, (_, day) in sorted(engine.personal_bests().items())}
+    _print(data, args.json)
+    return 0
+
+
+def cmd_compact(store, args):
+    before = store.records_header().get("count", 0)
+    store.compact_records()
+    print(f"compacted: {before} records")
+    return 0
+
+
+def cmd_archive(store, args):
+    before = archive_before(archive_months(args.months))
+    moved = store.archive_records(before)
+    for summary in store.archive_summaries():
+        print(f"{summary['first'][:4]}: {summary['count']:8d} records  {summary['first']} .. {summary['latest']}")
+    print(f"archived: {moved} records (years before {before})" if before else "archiving disabled (--months 0)")
+    return 0
+
+
+def cmd_validate(store, args):
+    problems = 0
+    for name, data in store.load_routines().items():
+        try:
+            validate_routine(dict(data, name=name))
+        except ValueError as e:
+            problems += 1
+            print(f"routine {name!r}: {e}")
+    seen = set()
+    for n, rec in enumerate(store.iter_records(), 1):
+        try:
+            validate_record(rec)
+        except ValueError as e:
+            problems += 1
+            print(f"record #{n} ({rec.get('date')}, {rec.get('routine')}): {e}")
+            continue
+        key = record_key(rec)
+        if key in seen:
+            problems += 1
+            print(f"record #{n}: duplicate {key}")
+        seen.add(key)
+    print(f"{problems} problem(s)")
+    return 1 if problems else 0
+
+
+def cmd_merge(store, args):
+    """다른 데이터 폴더의 루틴/기록을 합친다 (같은 이름의 루틴, 같은 (날짜, 루틴) 기록은 건너뜀)"""
+    source = open_data(args.source, args.backend, read_only=True)
+    try:
+        routines = store.load_routines()
+        added_routines = 0
+        src_routines = ((n, dict(data, name=name)) for n, (name, data) in enumerate(source.load_routines().items(), 1))
+        for batch in import_routines(src_routines, set(routines)):
+            for name, data in batch.items:
+                routines[name] = data
+            added_routines += len(batch.items)
+        if added_routines:
+            store.save_routines(routines)
+
+        added = duplicates = errors = 0
+        known = {record_key(rec) for rec in store.iter_records()}
+        for batch in import_records(enumerate(source.iter_records(), 1), known):
+            store.add_records(batch.items)
+            added += len(batch.items)
+            duplicates += batch.duplicates
+            errors += len(batch.errors)
+            for line_no, reason in batch.errors:
+                print(f"skipped record #{line_no}: {reason}", file=sys.stderr)
+    finally:
+        source.close()
+    print(f"routines added: {added_routines}, records added: {added}, duplicates: {duplicates}, errors: {errors}")
+    return 0
+
+
+def cmd_export(store, args):
+    if not args.routines and not args.records:
+        print("nothing to export (use --routines and/or --records)", file=sys.stderr)
+        return 2
+    if args.routines:
+        count = drain(export_routines(args.routines, store.load_routines()))
+        print(f"routines exported: {count} -> {args.routines}")
+    if args.records:
+        count = drain(export_records(args.records, store.iter_records()))
+        print(f"records exported: {count} -> {args.records}")
+    return 0
+
+
+def cmd_profiles(store, args):
+    manager = profile_manager(args.data_dir)
+    for pid, name in manager.items():
+        source = open_data(manager.data_dir(pid), args.backend, read_only=True)
+        try:
+            head = source.records_header()
+        finally:
+            source.close()
+        mark = "*" if pid == manager.current else " "
+        print(f"{mark} {pid:20s} {name:20s} records: {head.get('count', 0):8d}  latest: {head.get('latest')}")
+    return 0
+
+
+READ_ONLY = {"stats", "validate", "export", "profiles"}
+
+COMMANDS = {
+    "stats": cmd_stats,
+    "compact": cmd_compact,
+    "archive": cmd_archive,
+    "validate": cmd_validate,
+    "merge": cmd_merge,
+    "export": cmd_export,
+    "profiles": cmd_profiles,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Ecofit data tools (no GUI)")
+    parser.add_argument("--data-dir", help="data directory (default: the app's data location)")
+    parser.add_argument("--profile", help="profile name or id (default: the profile last used in the app)")
+    parser.add_argument("--backend", choices=(BACKEND_JSON, BACKEND_SQLITE),
+                        default=os.environ.get("ECOFIT_STORAGE", BACKEND_JSON))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="record counts and per-exercise totals")
+    stats.add_argument("--json", action="store_true", help="print JSON")
+    stats.add_argument("--analytics", action="store_true",
+                       help="also compute streaks and personal-best dates (reads the whole history)")
+    sub.add_parser("compact", help="rewrite the record journal / vacuum the database")
+    archive = sub.add_parser("archive", help="move years older than the horizon into compressed yearly files")
+    archive.add_argument("--months", type=int, help="keep this many months in the hot shards "
+                                                    "(default: ECOFIT_ARCHIVE_MONTHS or 12)")
+    sub.add_parser("validate", help="check routines and records, exit 1 on problems")
+    merge = sub.add_parser("merge", help="merge another data directory into this one")
+    merge.add_argument("source", help="data directory to merge from")
+    export = sub.add_parser("export", help="export to CSV / JSON Lines (by file extension)")
+    export.add_argument("--routines", help="output file for routines")
+    export.add_argument("--records", help="output file for records")
+    sub.add_parser("profiles", help="list profiles with their record counts")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_dir and not os.path.isdir(args.data_dir):
+        print(f"no such directory: {args.data_dir}", file=sys.stderr)
+        return 2
+    try:
+        data_dir = profile_dir(args.data_dir, args.profile)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    store = open_data(data_dir, args.backend, read_only=args.command in READ_ONLY)
+    try:
+        return COMMANDS[args.command](store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
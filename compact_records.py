@@ -0,0 +1,281 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from record_journal import record_key
+
+# -------------------- 압축 기록 목록 --------------------
+# 기록 dict 는 날짜 문자열, 루틴 이름, 운동 이름(키)을 기록마다 따로 들고 있어서 기록이 쌓일수록 메모리가 커진다.
+# 여기서는 이름을 정수 id 로 바꾸고(인턴), 날짜는 초 단위 정수로, 운동별 횟수는 배열 열(column)로 둔다.
+#   기록 열 : date(초), routine id, offset(결과 시작 위치)
+#   결과 열 : exercise id, reps           (기록 i 의 결과 = offset[i] ~ offset[i+1])
+# 꺼낼 때는 원래 모양 {date, routine, <운동>: 횟수} dict 를 그때그때 만들어 주므로 JSON 형식은 그대로다.
+# 이 모양으로 담을 수 없는 기록(키 순서가 다르거나, 날짜 형식이 다르거나, 횟수가 정수가 아닌 것)은 dict 그대로 둔다.
+# 기록마다 넣은 순서대로 번호(id)를 준다 — 앞의 기록이 지워져 위치가 바뀌어도 id 는 그대로라
+# 검색 색인(history_index.py)이 기록을 복사하지 않고 id 로만 가리킬 수 있다.
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def encode_date(text):
+    """'YYYY-MM-DD HH:MM:SS' -> 1970-01-01 부터 초 (형식이 다르면 None)"""
+    if not isinstance(text, str) or len(text) != 19 or text[4] != "-" or text[7] != "-" \
+            or text[10] != " " or text[13] != ":" or text[16] != ":":
+        return None
+    try:
+        dt = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                      int(text[11:13]), int(text[14:16]), int(text[17:19]))
+    except ValueError:
+        return None
+    return (dt - _EPOCH) // _SECOND
+
+
+def decode_date(seconds):
+    return (_EPOCH + timedelta(seconds=seconds)).strftime(DATE_FORMAT)
+
+
+class NameTable:
+    """문자열 <-> 정수 id (추가만 되므로 여러 목록이 같이 써도 안전)"""
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class CompactRecords:
+    """기록 목록 (list 처럼 쓰되 열 배열로 저장)
+
+    prepend 로 앞에 넣은 기록(최신순 목록에 새로 생긴 기록)은 몇 개뿐이라 dict 그대로 따로 둔다."""
+
+    def __init__(self, records=(), routines=None, exercises=None):
+        self.routines = routines or NameTable()
+        self.exercises = exercises or NameTable()
+        self.dates = array("q")
+        self.routine_ids = array("i")     # 0 이상: 루틴 id, 음수: -(raw 번호 + 1)
+        self.offsets = array("q", [0])
+        self.result_exercise = array("i")
+        self.result_reps = array("q")
+        self._raw = []                    # 열로 담을 수 없는 기록 dict
+        self._front = []                  # prepend 된 기록 (마지막이 맨 앞)
+        self.ids = array("q")             # 열 기록의 id (늘 오름차순 — 이분 탐색으로 위치를 찾는다)
+        self._front_ids = []
+        self.next_id = 0
+        self.extend(records)
+
+    # ---------- 인코딩 ----------
+    def _encode(self, rec):
+        """열에 담을 수 있으면 (date, routine id, [(exercise id, reps)]) 아니면 None"""
+        items = iter(rec.items())
+        try:
+            (k1, date), (k2, routine) = next(items), next(items)
+        except StopIteration:
+            return None
+        if k1 != "date" or k2 != "routine" or not isinstance(routine, str):
+            return None
+        seconds = encode_date(date)
+        if seconds is None:
+            return None
+        results = []
+        for name, reps in items:
+            if type(reps) is not int or not _INT64_MIN <= reps <= _INT64_MAX:
+                return None
+            results.append((self.exercises.intern(name), reps))
+        return seconds, self.routines.intern(routine), results
+
+    def _decode(self, i):
+        rid = self.routine_ids[i]
+        if rid < 0:
+            return dict(self._raw[-rid - 1])
+        rec = {"date": decode_date(self.dates[i]), "routine": self.routines.names[rid]}
+        names = self.exercises.names
+        ex, reps = self.result_exercise, self.result_reps
+        for j in range(self.offsets[i], self.offsets[i + 1]):
+            rec[names[ex[j]]] = reps[j]
+        return rec
+
+    # ---------- list 처럼 ----------
+    def append(self, rec):
+        """뒤에 추가 -> id"""
+        encoded = self._encode(rec)
+        if encoded is None:
+            self._raw.append(dict(rec))
+            self.dates.append(0)
+            self.routine_ids.append(-len(self._raw))
+        else:
+            seconds, rid, results = encoded
+            self.dates.append(seconds)
+            self.routine_ids.append(rid)
+            for eid, reps in results:
+                self.result_exercise.append(eid)
+                self.result_reps.append(reps)
+        self.offsets.append(len(self.result_exercise))
+        self.ids.append(self.next_id)
+        self.next_id += 1
+        return self.next_id - 1
+
+    def extend(self, records):
+        for rec in records:
+            self.append(rec)
+
+    def prepend(self, rec):
+        """맨 앞에 추가 -> id"""
+        self._front.append(rec)
+        self._front_ids.append(self.next_id)
+        self.next_id += 1
+        return self.next_id - 1
+
+    def __len__(self):
+        return len(self._front) + len(self.dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("record index out of range")
+        front = len(self._front)
+        if index < front:
+            return self._front[front - 1 - index]
+        return self._decode(index - front)
+
+    def __iter__(self):
+        yield from reversed(self._front)
+        for i in range(len(self.dates)):
+            yield self._decode(i)
+
+    def __reversed__(self):
+        for i in range(len(self.dates) - 1, -1, -1):
+            yield self._decode(i)
+        yield from self._front
+
+    def pop(self, index=-1):
+        rec = self[index]
+        n = len(self)
+        if index < 0:
+            index += n
+        front = len(self._front)
+        if index < front:
+            self._front.pop(front - 1 - index)
+            self._front_ids.pop(front - 1 - index)
+            return rec
+        i = index - front
+        start, end = self.offsets[i], self.offsets[i + 1]
+        del self.ids[i]
+        del self.dates[i]
+        del self.routine_ids[i]
+        del self.result_exercise[start:end]
+        del self.result_reps[start:end]
+        del self.offsets[i + 1]
+        width = end - start
+        if width:
+            offsets = self.offsets
+            for j in range(i + 1, len(offsets)):
+                offsets[j] -= width
+        return rec
+
+    def copy(self):
+        """이름 표는 같이 쓰고 배열만 복사 (순회 중 변경에 안전한 스냅숏)"""
+        other = CompactRecords(routines=self.routines, exercises=self.exercises)
+        other.dates = array("q", self.dates)
+        other.routine_ids = array("i", self.routine_ids)
+        other.offsets = array("q", self.offsets)
+        other.result_exercise = array("i", self.result_exercise)
+        other.result_reps = array("q", self.result_reps)
+        other._raw = self._raw[:]
+        other._front = self._front[:]
+        other.ids = array("q", self.ids)
+        other._front_ids = self._front_ids[:]
+        other.next_id = self.next_id
+        return other
+
+    # ---------- id ----------
+    def id_at(self, index):
+        """위치 -> id"""
+        front = len(self._front)
+        if index < 0:
+            index += len(self)
+        if index < front:
+            return self._front_ids[front - 1 - index]
+        return self.ids[index - front]
+
+    def by_id(self, rid):
+        """id -> 기록 (지워졌으면 None)"""
+        i = bisect_left(self.ids, rid)
+        if i < len(self.ids) and self.ids[i] == rid:
+            return self._decode(i)
+        for k, front_id in enumerate(self._front_ids):
+            if front_id == rid:
+                return self._front[k]
+        return None
+
+    def front_items(self):
+        """prepend 된 기록 (id, 기록)"""
+        return list(zip(self._front_ids, self._front))
+
+    def items_from(self, rid):
+        """열 기록 중 id 가 rid 이상인 것 (id, 기록) — 목록 순서대로"""
+        for i in range(bisect_left(self.ids, rid), len(self.ids)):
+            yield self.ids[i], self._decode(i)
+
+    def count_from(self, rid):
+        """열 기록 중 id 가 rid 이상인 것의 수"""
+        return len(self.ids) - bisect_left(self.ids, rid)
+
+    def dict_records(self):
+        """dict 그대로 둔 기록 (앞에 추가된 기록, 열로 담지 못한 기록) — 목록 순서대로"""
+        raw = [self._raw[-r - 1] for r in self.routine_ids if r < 0] if self._raw else []
+        return self._front[::-1] + raw
+
+    # ---------- 찾기 ----------
+    def find(self, rec, from_end=False):
+        """같은 객체(앞쪽 dict) 또는 같은 (날짜, 루틴) 키의 기록 위치 (없으면 None)
+        from_end 이면 뒤에서부터 찾는다"""
+        front = len(self._front)
+        for k in range(front):
+            if self._front[k] is rec:
+                return front - 1 - k
+        key = record_key(rec)
+        # 앞쪽 dict 는 위치 p = front - 1 - k
+        front_order = range(front) if from_end else range(front - 1, -1, -1)
+        if not from_end:
+            for k in front_order:
+                if record_key(self._front[k]) == key:
+                    return front - 1 - k
+        seconds = encode_date(key[0])
+        rid = self.routines.ids.get(key[1], -1) if isinstance(key[1], str) else -1
+        n = len(self.dates)
+        for i in (range(n - 1, -1, -1) if from_end else range(n)):
+            r = self.routine_ids[i]
+            if r >= 0:
+                if r == rid and self.dates[i] == seconds:
+                    return front + i
+            elif record_key(self._raw[-r - 1]) == key:
+                return front + i
+        if from_end:
+            for k in front_order:
+                if record_key(self._front[k]) == key:
+                    return front - 1 - k
+        return None
+
+    def __repr__(self):
+        return f"<CompactRecords {len(self)} records>"
+
+    def nbytes(self):
+        """열 배열이 차지하는 바이트 (dict 로 남은 기록 제외)"""
+        return sum(a.itemsize * len(a) for a in (self.dates, self.routine_ids, self.offsets, self.ids,
+                                                 self.result_exercise, self.result_reps))
@@ -0,0 +1,258 @@
+import csv
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
+from record_journal import record_key
+
+# -------------------- 가져오기 / 내보내기 --------------------
+# 루틴과 운동 기록을 CSV 또는 JSON Lines 로 주고받는다.
+# 파일은 한 줄씩 읽고 쓰는 제너레이터로 처리해서 기록이 수만 개여도 메모리를 일정하게 쓰고,
+# 검사/저장은 batch_size 개씩 끊어서 하므로 앱에서는 한 프레임에 한 묶음씩 처리할 수 있다.
+#   기록 CSV : date, routine, exercise, reps   (기록 하나 = 운동 수만큼의 줄, 같은 기록의 줄은 연속)
+#   루틴 CSV : routine, description, exercise, sets, reps, rest   (운동이 없는 루틴은 exercise 가 빈 줄 하나)
+#   JSONL    : 한 줄에 기록 하나 {date, routine, <운동>: 횟수} / 루틴 하나 {name, description, exercises}
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+BATCH_SIZE = 1000
+
+RECORD_FIELDS = ("date", "routine", "exercise", "reps")
+ROUTINE_FIELDS = ("routine", "description", "exercise", "sets", "reps", "rest")
+
+# 가져오기 한 묶음 — items: 저장할 것, duplicates: 이미 있어서 건너뛴 수, errors: [(줄 번호, 이유)]
+ImportBatch = namedtuple("ImportBatch", "items duplicates errors")
+
+
+def detect_format(path):
+    return FORMAT_CSV if path.lower().endswith(".csv") else FORMAT_JSONL
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def drain(progress):
+    """진행 상황 제너레이터를 끝까지 돌리고 마지막 값을 반환 (CLI 용)"""
+    last = None
+    for last in progress:
+        pass
+    return last
+
+
+# -------------------- 내보내기 --------------------
+def _csv_record_rows(rec):
+    date, routine = rec.get("date", ""), rec.get("routine", "")
+    rows = [(date, routine, k, v) for k, v in rec.items() if k not in ("date", "routine")]
+    # 운동이 하나도 없는 기록도 키는 남긴다
+    return rows or [(date, routine, "", "")]
+
+
+def _csv_routine_rows(name, data):
+    desc = data.get("description", "")
+    rows = [(name, desc, ex["name"], ex["sets"], ex["reps"], ex["rest"]) for ex in data.get("exercises", [])]
+    return rows or [(name, desc, "", "", "", "")]
+
+
+def _export(path, items, fmt, header, csv_rows, json_obj, batch_size):
+    """임시 파일에 batch_size 개씩 쓰면서 지금까지 쓴 수를 내보내고, 끝나면 교체"""
+    tmp_path = path + ".tmp"
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            if fmt == FORMAT_CSV:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                for chunk in batched(items, batch_size):
+                    for item in chunk:
+                        writer.writerows(csv_rows(item))
+                    count += len(chunk)
+                    yield count
+            else:
+                for chunk in batched(items, batch_size):
+                    f.write("".join(json.dumps(json_obj(item), ensure_ascii=False) + "\n" for item in chunk))
+                    count += len(chunk)
+                    yield count
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    yield count
+
+
+def export_records(path, records, fmt=None, batch_size=BATCH_SIZE):
+    """기록을 파일로 — 쓴 기록 수를 묶음마다 내보낸다"""
+    return _export(path, records, fmt or detect_format(path), RECORD_FIELDS,
+                   _csv_record_rows, lambda rec: rec, batch_size)
+
+
+def export_routines(path, routines, fmt=None, batch_size=BATCH_SIZE):
+    """루틴 dict 를 파일로 — 쓴 루틴 수를 묶음마다 내보낸다"""
+    return _export(path, routines.items(), fmt or detect_format(path), ROUTINE_FIELDS,
+                   lambda item: _csv_routine_rows(*item),
+                   lambda item: {"name": item[0], "description": item[1].get("description", ""),
+                                 "exercises": item[1].get("exercises", [])},
+                   batch_size)
+
+
+# -------------------- 읽기 (검사 전) --------------------
+def _read_jsonl(f):
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def _read_grouped_csv(f, key_fields, make, add):
+    """CSV 에서 키가 같은 연속된 줄을 하나로 묶는다 -> (첫 줄 번호, 묶은 것)"""
+    reader = csv.DictReader(f)
+    current_key, current, start = None, None, 0
+    for row in reader:
+        key = tuple(row.get(k) for k in key_fields)
+        if current is None or key != current_key:
+            if current is not None:
+                yield start, current
+            current_key, current, start = key, make(row), reader.line_num
+        add(current, row)
+    if current is not None:
+        yield start, current
+
+
+def _add_record_row(rec, row):
+    exercise = row.get("exercise")
+    if exercise:
+        rec[exercise] = row.get("reps")
+
+
+def _add_routine_row(routine, row):
+    if row.get("exercise"):
+        routine["exercises"].append({"name": row["exercise"], "sets": row.get("sets"),
+                                     "reps": row.get("reps"), "rest": row.get("rest")})
+
+
+def read_records(path, fmt=None):
+    """파일에서 기록을 하나씩 -> (줄 번호, dict 또는 None)"""
+    fmt = fmt or detect_format(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == FORMAT_CSV:
+            yield from _read_grouped_csv(
+                f, ("date", "routine"),
+                lambda row: {"date": row.get("date"), "routine": row.get("routine")}, _add_record_row)
+        else:
+            for line_no, obj in _read_jsonl(f):
+                # 기록 저널 줄 {"op": "add", "rec": {...}} 도 받아준다
+                if isinstance(obj, dict) and obj.get("op") == "add" and isinstance(obj.get("rec"), dict):
+                    obj = obj["rec"]
+                yield line_no, obj
+
+
+def read_routines(path, fmt=None):
+    """파일에서 루틴을 하나씩 -> (줄 번호, {name, description, exercises} 또는 None)"""
+    fmt = fmt or detect_format(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == FORMAT_CSV:
+            yield from _read_grouped_csv(
+                f, ("routine",),
+                lambda row: {"name": row.get("routine"), "description": row.get("description") or "",
+                             "exercises": []},
+                _add_routine_row)
+        else:
+            yield from _read_jsonl(f)
+
+
+# -------------------- 검사 --------------------
+def _count(value, field):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number: {value!r}")
+    if n < 0:
+        raise ValueError(f"{field} is negative: {n}")
+    return n
+
+
+def validate_record(obj):
+    """가져온 기록을 저장 형식으로 정리 (잘못되면 ValueError)"""
+    if not isinstance(obj, dict):
+        raise ValueError("not a record")
+    date, routine = obj.get("date"), obj.get("routine")
+    if not isinstance(date, str):
+        raise ValueError("missing date")
+    try:
+        datetime.strptime(date, DATE_FORMAT)
+    except ValueError:
+        raise ValueError(f"bad date: {date!r}")
+    if not isinstance(routine, str) or not routine:
+        raise ValueError("missing routine")
+    rec = {"date": date, "routine": routine}
+    for k, v in obj.items():
+        if k not in ("date", "routine"):
+            rec[k] = _count(v, k)
+    return rec
+
+
+def validate_routine(obj):
+    """가져온 루틴 -> (이름, {description, exercises}) (잘못되면 ValueError)"""
+    if not isinstance(obj, dict):
+        raise ValueError("not a routine")
+    name = obj.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("missing routine name")
+    exercises = obj.get("exercises") or []
+    if not isinstance(exercises, list):
+        raise ValueError("exercises is not a list")
+    clean = []
+    for ex in exercises:
+        if not isinstance(ex, dict) or not isinstance(ex.get("name"), str) or not ex["name"].strip():
+            raise ValueError("exercise without name")
+        clean.append({"name": ex["name"], "sets": _count(ex.get("sets"), "sets"),
+                      "reps": _count(ex.get("reps"), "reps"), "rest": _count(ex.get("rest"), "rest")})
+    return name, {"description": str(obj.get("description") or ""), "exercises": clean}
+
+
+def _import(rows, validate, key_of, known, batch_size):
+    for chunk in batched(rows, batch_size):
+        items, errors, duplicates = [], [], 0
+        for line_no, obj in chunk:
+            try:
+                item = validate(obj)
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+                continue
+            key = key_of(item)
+            if key in known:
+                duplicates += 1
+                continue
+            known.add(key)
+            items.append(item)
+        yield ImportBatch(items, duplicates, errors)
+
+
+def import_records(rows, known_keys, batch_size=BATCH_SIZE):
+    """(줄 번호, 기록) 목록을 검사해서 묶음으로 -> ImportBatch
+    known_keys 는 이미 있는 (날짜, 루틴) 집합 — 가져온 것도 추가되므로 파일 안의 중복도 걸러진다"""
+    return _import(rows, validate_record, record_key, known_keys, batch_size)
+
+
+def import_routines(rows, known_names, batch_size=BATCH_SIZE):
+    """(줄 번호, 루틴) 목록을 검사해서 묶음으로 -> ImportBatch (items 는 (이름, 데이터))
+    이름이 이미 있는 루틴은 덮어쓰지 않고 건너뛴다"""
+    return _import(rows, validate_routine, lambda item: item[0], known_names, batch_size)
@@ -0,0 +1,69 @@
+# -------------------- 재사용 대화상자 --------------------
+# 팝업과 입력칸은 이름별로 한 번만 만들고, 열 때마다 값과 동작(ok/cancel 등)만 바꿔 끼운다.
+# 버튼은 만들 때 한 번만 "이 이름의 동작을 실행"하도록 묶어 두므로 바인딩이 쌓이지 않고,
+# 닫히면 동작을 비워서 이전에 넘긴 함수(클로저)가 남지 않는다.
+# Kivy 를 직접 불러오지 않는다 — 팝업/입력칸은 만드는 쪽(main.py)에서 넘겨준다.
+
+
+class Dialog:
+    """한 번 만든 팝업 + 입력칸 + 열 때마다 바뀌는 동작"""
+
+    def __init__(self, popup, fields=None):
+        self.popup = popup
+        self.fields = fields or {}  # 이름 -> text 속성이 있는 입력 위젯
+        self._actions = {}
+        popup.bind(on_dismiss=self._on_dismiss)
+
+    def button(self, btn, action):
+        """버튼을 동작 이름에 한 번만 묶는다"""
+        btn.bind(on_release=lambda x: self.trigger(action))
+        return btn
+
+    def trigger(self, action):
+        callback = self._actions.get(action)
+        if callback is None:
+            # 따로 넘기지 않은 동작(취소 등)은 닫기
+            self.dismiss()
+        else:
+            callback(self)
+
+    def open(self, title=None, values=None, **actions):
+        """값을 채우고 이번에 쓸 동작을 바꿔 끼운 뒤 연다"""
+        if title is not None:
+            self.popup.title = title
+        for name, value in (values or {}).items():
+            self.fields[name].text = value
+        self._actions = actions
+        self.popup.open()
+
+    def values(self):
+        return {name: field.text for name, field in self.fields.items()}
+
+    def dismiss(self):
+        self.popup.dismiss()
+
+    def _on_dismiss(self, *args):
+        self._actions = {}
+
+
+class DialogPool:
+    """이름별 대화상자 캐시 (없으면 build(name) 으로 한 번만 만든다)"""
+
+    def __init__(self, build):
+        self.build = build
+        self.dialogs = {}
+        self.created = 0
+        self.opened = 0
+
+    def get(self, name):
+        dialog = self.dialogs.get(name)
+        if dialog is None:
+            dialog = self.dialogs[name] = self.build(name)
+            self.created += 1
+        return dialog
+
+    def open(self, name, title=None, values=None, **actions):
+        dialog = self.get(name)
+        dialog.open(title=title, values=values, **actions)
+        self.opened += 1
+        return dialog
@@ -0,0 +1,32 @@
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.textinput import TextInput
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+from widgets import FONT_NAME, FLabel, FButton, register_font
+
+# -------------------- 커스텀 위젯 (나중에 불러오는 것) --------------------
+# main.py 에서 Factory 에 이름만 등록해 두고, 팝업/기록 화면을 처음 열 때 이 모듈을 불러온다.
+
+
+class FTextInput(TextInput):
+    def __init__(self, **kwargs):
+        register_font()
+        kwargs.setdefault("font_name", FONT_NAME)
+        super().__init__(**kwargs)
+
+class RecordRow(RecycleDataViewBehavior, BoxLayout):
+    """기록 화면의 한 줄 (화면에 보이는 줄만 만들어서 재사용)"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.index = 0
+        self.label = FLabel()
+        self.del_btn = FButton(size_hint_x=None, width=50)
+        App.get_running_app().catalog.bind(self.del_btn, "delete_short")
+        self.del_btn.bind(on_release=lambda x: App.get_running_app().delete_record(self.index))
+        self.add_widget(self.label)
+        self.add_widget(self.del_btn)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.index = index
+        self.label.text = data["text"]
@@ -0,0 +1,163 @@
+from record_journal import record_key
+from compact_records import CompactRecords
+from history_index import HistoryIndex
+
+# -------------------- 운동 기록 지연 로더 --------------------
+# 시작할 때는 저장소의 요약(기록 수, 최신 날짜)만 읽고,
+# 기록 화면/분석에서 요청한 구간(window)만큼만 최신순으로 읽어온다.
+# 필터 검색 색인은 지금까지 읽은 기록(loaded)만 가리키고, 구간을 더 읽을 때마다 같이 늘어난다.
+# search() 는 한 번에 정해진 수(budget)까지만 더 읽으므로, 드문 조건도 화면을 멈추지 않고 여러 번에 나눠 찾는다.
+
+SEARCH_BUDGET = 1000    # search() 한 번에 더 읽어 올 최대 기록 수
+
+
+class HistoryLoader:
+    """운동 기록을 최신순 구간 단위로 필요할 때만 읽어오는 로더"""
+
+    def __init__(self, store):
+        self.store = store
+        self.loaded = CompactRecords()    # 지금까지 읽은 기록 (최신순)
+        self._source = None
+        self._exhausted = False
+        self._skip = {}         # 아직 읽지 않은 구간에서 이미 삭제된 기록 키
+        self._last_read = None  # 저장소에서 마지막으로 읽은 기록 (읽는 위치)
+        self.version = 0        # 기록이 바뀔 때마다 증가 (분석 캐시 무효화용)
+        self._index = None      # 검색 색인 (필터를 처음 쓸 때 만든다)
+        head = store.records_header()
+        self.count = head.get("count", 0)
+        self.latest = head.get("latest")
+
+    @property
+    def fully_loaded(self):
+        return self._exhausted
+
+    def window(self, start, size):
+        """최신순으로 start 번째부터 size 개"""
+        self._fill(start + size)
+        return self.loaded[start:start + size]
+
+    def iter_newest(self):
+        """최신 기록부터 하나씩 — 필요한 만큼만 더 읽어온다"""
+        i = 0
+        while True:
+            if i >= len(self.loaded):
+                self._fill(i + 50)
+                if i >= len(self.loaded):
+                    return
+            yield self.loaded[i]
+            i += 1
+
+    def all(self):
+        """전체 기록 (최신순) — 분석처럼 전체가 필요한 곳에서만 사용"""
+        self._fill(None)
+        return self.loaded
+
+    def index(self):
+        """필터 검색용 색인 — 이미 읽은 기록은 search() 가 조금씩 넣고, 이후 읽거나 바뀌는 기록은 바로 반영한다"""
+        if self._index is None:
+            self._index = HistoryIndex(self.loaded)
+        return self._index
+
+    def search(self, query, offset=0, limit=None, budget=SEARCH_BUDGET):
+        """조건에 맞는 기록 (최신순) offset 번째부터 limit 개 -> (HistoryPage, 끝까지 찾았는지)
+        모자라면 budget 개까지 더 읽어서 다시 찾는다 — 끝까지 못 찾았으면 다음에 다시 부른다"""
+        index = self.index()
+        spent = 0
+        while True:
+            # 이미 읽어 둔 기록부터 색인에 넣고, 다 넣었으면 저장소에서 더 읽는다
+            spent += index.catch_up(None if budget is None else max(budget - spent, 0))
+            page = index.query(offset=offset, limit=limit, **query)
+            complete = self._exhausted and not index.pending
+            if complete or (limit is not None and len(page.records) >= limit):
+                return page, complete
+            if budget is not None and spent >= budget:
+                return page, False
+            step = max(limit or 0, 200)
+            before = len(self.loaded)
+            self._fill(before + (step if budget is None else min(step, budget - spent)))
+            spent += len(self.loaded) - before
+
+    def _fill(self, target):
+        while not self._exhausted and (target is None or len(self.loaded) < target):
+            if self._source is None:
+                self._source = self.store.iter_records(newest_first=True)
+            rec = next(self._source, None)
+            if rec is None:
+                self._exhausted = True
+                self._source = None
+                break
+            self._last_read = rec
+            key = record_key(rec)
+            if self._skip.get(key):
+                self._skip[key] -= 1
+                continue
+            rid = self.loaded.append(rec)
+            if self._index is not None:
+                self._index.append(rec, rid)
+
+    # ---------- 변경 ----------
+    def _read_past(self, rec):
+        """추가된 기록을 읽어 둔 기록 앞에 넣어야 하는지
+        — 아직 읽기 전이거나 읽는 위치보다 오래된 자리면 나중에 저장소에서 읽힌다"""
+        if self._exhausted:
+            return True
+        return self._source is not None and self.store.read_past(rec, self._last_read)
+
+    def add(self, rec):
+        self.store.add_record(rec)
+        if self._read_past(rec):
+            rid = self.loaded.prepend(rec)
+            if self._index is not None:
+                self._index.add(rec, rid)
+        self.count += 1
+        self.version += 1
+        date = rec.get("date")
+        if date and (self.latest is None or date > self.latest):
+            self.latest = date
+
+    def add_many(self, recs):
+        """가져온 기록 여러 개 추가 — 저장소 순서대로 뒤에 붙으므로 최신순 앞쪽에 들어간다"""
+        if not recs:
+            return
+        self.store.add_records(recs)
+        for rec in recs:
+            if self._read_past(rec):
+                rid = self.loaded.prepend(rec)
+                if self._index is not None:
+                    self._index.add(rec, rid)
+        self.count += len(recs)
+        self.version += 1
+        newest = max((r.get("date") or "" for r in recs), default="")
+        if newest and (self.latest is None or newest > self.latest):
+            self.latest = newest
+
+    def remove(self, rec):
+        self.store.delete_record(rec)
+        self.count = max(0, self.count - 1)
+        self.version += 1
+        # 같은 객체가 없으면 키가 같은 가장 최근 기록 (저장소에서 다시 읽은 같은 기록일 수 있다)
+        pos = self.loaded.find(rec)
+        if pos is not None:
+            if self._index is not None:
+                self._index.remove(self.loaded.id_at(pos))
+            self.loaded.pop(pos)
+        else:
+            # 읽는 중인 구간 뒤쪽에 있던 기록이면 나중에 건너뛴다
+            if self._source is not None:
+                key = record_key(rec)
+                self._skip[key] = self._skip.get(key, 0) + 1
+        if rec.get("date") == self.latest:
+            self.latest = self.loaded[0].get("date") if self.loaded else self.store.records_header().get("latest")
+
+    def reset(self):
+        """저장소가 통째로 바뀐 뒤 (압축, 가져오기 등) 다시 읽기"""
+        self.loaded = CompactRecords()
+        self._source = None
+        self._exhausted = False
+        self._skip = {}
+        self._last_read = None
+        self._index = None
+        self.version += 1
+        head = self.store.records_header()
+        self.count = head.get("count", 0)
+        self.latest = head.get("latest")
@@ -0,0 +1,240 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+from compact_records import encode_date
+
+# -------------------- 기록 검색 색인 --------------------
+# 기록 화면의 필터(루틴, 운동 이름/앞부분, 날짜 범위)를 전체 기록을 훑지 않고 처리한다.
+#   by_date     : 전체 기록 (최신순)
+#   by_routine  : 루틴 이름 -> 그 루틴 기록 (최신순)
+#   by_exercise : 운동 이름 -> 그 운동이 들어간 기록 (최신순)
+# 목록은 날짜 키(-초) 오름차순 = 최신순이다 — 기록은 최신부터 읽어 들이므로 색인에는 대개 뒤에 붙이기만 한다.
+#   prefix_keys : 소문자 운동 이름 정렬 목록 (앞부분 검색은 이분 탐색으로 범위만 찾는다)
+# 기록 자체는 복사하지 않는다 — 색인은 기록 목록(HistoryLoader.loaded, CompactRecords)의 id 만 들고 있고
+# 검색 결과를 돌려줄 때 그 목록에서 꺼낸다. 목록에 기록이 들어오거나 빠질 때마다 add/remove 로 같이 고친다.
+# 색인을 만들 때 이미 읽혀 있던 기록은 catch_up() 으로 조금씩 넣는다 (한 번에 전체를 색인하지 않음) —
+# 색인은 늘 목록 앞쪽(최신) 일부를 덮고, 그 뒤에 읽혀 들어오는 기록은 append() 로 따라 붙는다.
+
+NO_DATE = 2 ** 62       # 날짜를 읽을 수 없는 기록의 키 (가장 오래된 것으로 취급)
+
+HistoryPage = namedtuple("HistoryPage", "total records")
+
+
+def _date_key(date):
+    """정렬 키 — 최신일수록 작다 (-초)"""
+    seconds = encode_date(date)
+    return NO_DATE if seconds is None else -seconds
+
+
+def _bound(date, end_of_day=False):
+    """'YYYY-MM-DD' 또는 'YYYY-MM-DD HH:MM:SS' -> 날짜 키 (날짜만 있으면 그날 0시 / 23:59:59)"""
+    if date is None:
+        return None
+    if len(date) == 10:
+        date += " 23:59:59" if end_of_day else " 00:00:00"
+    seconds = encode_date(date)
+    if seconds is None:
+        raise ValueError(f"bad date: {date!r}")
+    return -seconds
+
+
+class Postings:
+    """날짜 키 순(최신순)으로 정렬된 (날짜 키, id) 목록"""
+    __slots__ = ("dates", "ids")
+
+    def __init__(self):
+        self.dates = array("q")
+        self.ids = array("q")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, date, rid):
+        if not self.dates or date >= self.dates[-1]:
+            # 기록은 최신부터 읽어 오므로 대부분 뒤에 붙이기만 하면 된다
+            self.dates.append(date)
+            self.ids.append(rid)
+        else:
+            i = bisect_right(self.dates, date)
+            self.dates.insert(i, date)
+            self.ids.insert(i, rid)
+
+    def remove(self, date, rid):
+        i = bisect_left(self.dates, date)
+        while i < len(self.dates) and self.dates[i] == date:
+            if self.ids[i] == rid:
+                del self.dates[i]
+                del self.ids[i]
+                return True
+            i += 1
+        return False
+
+    def span(self, lo, hi):
+        """날짜 키가 lo ~ hi 인 구간 [start, end)"""
+        start = 0 if lo is None else bisect_left(self.dates, lo)
+        end = len(self.dates) if hi is None else bisect_right(self.dates, hi)
+        return start, max(start, end)
+
+
+class HistoryIndex:
+    """루틴 / 운동 이름(앞부분) / 날짜 범위 검색 색인 (records: 색인할 CompactRecords — 복사하지 않음)"""
+
+    def __init__(self, records):
+        self.records = records
+        self.dates = array("q")     # id -> 날짜 키 (색인에 없는 id 는 NO_DATE)
+        self.by_date = Postings()
+        self.by_routine = {}
+        self.by_exercise = {}
+        self.prefix_keys = []       # (소문자 이름, 이름) 정렬 목록
+        self.next_id = 0            # 열 기록은 이 id 부터 아직 색인하지 않았다
+        for rid, rec in records.front_items():
+            self.add(rec, rid)
+
+    def __len__(self):
+        return len(self.by_date)
+
+    @property
+    def pending(self):
+        """목록에는 있지만 아직 색인하지 않은 기록 수"""
+        return self.records.count_from(self.next_id)
+
+    def catch_up(self, limit=None):
+        """아직 색인하지 않은 기록을 limit 개까지 넣는다 -> 넣은 수"""
+        done = 0
+        for rid, rec in self.records.items_from(self.next_id):
+            if limit is not None and done >= limit:
+                break
+            self.add(rec, rid)
+            self.next_id = rid + 1
+            done += 1
+        return done
+
+    # ---------- 갱신 ----------
+    def append(self, rec, rid):
+        """목록 뒤에 새로 읽혀 들어온 기록 — 따라잡은 상태일 때만 바로 넣고, 아니면 catch_up 에 맡긴다"""
+        if self.records.count_from(self.next_id) == 1:
+            self.add(rec, rid)
+            self.next_id = rid + 1
+
+    def add(self, rec, rid):
+        """records 에 id rid 로 들어간 기록을 색인에 넣는다"""
+        date = _date_key(rec.get("date"))
+        if rid >= len(self.dates):
+            self.dates.extend([NO_DATE] * (rid + 1 - len(self.dates)))
+        self.dates[rid] = date
+        self.by_date.add(date, rid)
+        self.by_routine.setdefault(rec.get("routine", ""), Postings()).add(date, rid)
+        for name in rec:
+            if name == "date" or name == "routine":
+                continue
+            postings = self.by_exercise.get(name)
+            if postings is None:
+                postings = self.by_exercise[name] = Postings()
+                insort(self.prefix_keys, (name.casefold(), name))
+            postings.add(date, rid)
+
+    def remove(self, rid):
+        """id rid 인 기록을 색인에서 뺀다 (records 에서 빼기 전에 부른다)"""
+        stored = self.records.by_id(rid)
+        if stored is None or rid >= len(self.dates):
+            return False
+        date = self.dates[rid]
+        if not self.by_date.remove(date, rid):
+            return False
+        postings = self.by_routine.get(stored.get("routine", ""))
+        if postings is not None:
+            postings.remove(date, rid)
+        for name in stored:
+            if name != "date" and name != "routine" and name in self.by_exercise:
+                self.by_exercise[name].remove(date, rid)
+        return True
+
+    # ---------- 검색 ----------
+    def exercise_names(self, prefix):
+        """앞부분이 prefix 인 운동 이름 (대소문자 무시)"""
+        key = prefix.casefold()
+        i = bisect_left(self.prefix_keys, (key,))
+        names = []
+        while i < len(self.prefix_keys) and self.prefix_keys[i][0].startswith(key):
+            names.append(self.prefix_keys[i][1])
+            i += 1
+        return names
+
+    def query(self, routine=None, exercise=None, prefix=None, since=None, until=None,
+              newest_first=True, offset=0, limit=None):
+        """조건에 맞는 기록 중 offset 번째부터 limit 개 -> HistoryPage(전체 수, 기록 목록)
+
+        routine: 루틴 이름, exercise: 운동 이름(정확히), prefix: 운동 이름 앞부분,
+        since/until: 'YYYY-MM-DD' 또는 'YYYY-MM-DD HH:MM:SS' (날짜만 주면 그날 전체 포함)"""
+        lo, hi = _bound(until, end_of_day=True), _bound(since)
+
+        # 후보 목록들 — 조건마다 (목록 묶음), 가장 작은 묶음을 기준으로 나머지 조건을 확인한다
+        groups = []
+        if routine is not None:
+            groups.append([self.by_routine[routine]] if routine in self.by_routine else [])
+        if exercise is not None:
+            groups.append([self.by_exercise[exercise]] if exercise in self.by_exercise else [])
+        if prefix:
+            groups.append([self.by_exercise[name] for name in self.exercise_names(prefix)])
+        if not groups:
+            groups.append([self.by_date])
+
+        spans = [[(p, p.span(lo, hi)) for p in group] for group in groups]
+        sizes = [sum(end - start for _, (start, end) in group) for group in spans]
+        driver = min(range(len(spans)), key=sizes.__getitem__)
+
+        if len(spans) == 1 and len(spans[driver]) == 1:
+            # 조건 하나짜리는 정렬된 목록을 그대로 잘라서 돌려준다
+            postings, (start, end) = spans[driver][0]
+            total = end - start
+            if newest_first:
+                first = start + offset
+                ids = postings.ids[first:end if limit is None else min(end, first + limit)]
+            else:
+                stop = max(start, end - offset)
+                first = stop - limit if limit is not None else start
+                ids = reversed(postings.ids[max(start, first):stop])
+            return HistoryPage(total, [self.records.by_id(i) for i in ids])
+
+        ids = self._collect(spans[driver])
+        for g in range(len(spans)):
+            if g == driver or not ids:
+                continue
+            if len(ids) * len(spans[g]) * 16 < sizes[g]:
+                # 후보가 아주 적으면 기록마다 그 날짜 구간만 이분 탐색
+                ids = [i for i in ids if self._matches(i, groups[g])]
+            else:
+                allowed = set()
+                for postings, (start, end) in spans[g]:
+                    allowed.update(postings.ids[start:end])
+                ids = [i for i in ids if i in allowed]
+        total = len(ids)
+        if not newest_first:
+            ids.reverse()
+        page = ids[offset:] if limit is None else ids[offset:offset + limit]
+        return HistoryPage(total, [self.records.by_id(i) for i in page])
+
+    @staticmethod
+    def _collect(spans):
+        """여러 목록의 구간을 최신순으로 합친다 (한 기록이 여러 목록에 있으면 한 번만)"""
+        if len(spans) == 1:
+            postings, (start, end) = spans[0]
+            return list(postings.ids[start:end])
+        # 각 목록은 (날짜 키, id) 순으로 정렬되어 있으므로 병합하면서 연속된 같은 id 만 건너뛴다
+        ids, last = [], None
+        for _, rid in heapq.merge(*(zip(p.dates[start:end], p.ids[start:end]) for p, (start, end) in spans)):
+            if rid != last:
+                ids.append(rid)
+                last = rid
+        return ids
+
+    def _matches(self, rid, group):
+        """기록 rid 가 이 조건 묶음의 목록 중 하나에 들어 있는지 (그 날짜 구간만 이분 탐색)"""
+        date = self.dates[rid]
+        for postings in group:
+            start, end = postings.span(date, date)
+            if rid in postings.ids[start:end]:
+                return True
+        return False
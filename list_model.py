@@ -0,0 +1,77 @@
+from perf import instrument
+
+# -------------------- 키 기반 목록 모델 --------------------
+# 목록 전체를 지우고 다시 만드는 대신, 키(루틴 이름, 운동 번호 등)별로
+# 이전에 그린 값과 비교해서 바뀐 줄만 추가/수정/삭제한다.
+# 줄 위젯은 모델이 들고 있으므로 화면을 오가도 다시 만들지 않는다.
+# (Kivy 를 직접 import 하지 않으므로 위젯 없이도 테스트/벤치마크 가능)
+
+
+class KeyedListModel:
+    """바뀐 줄만 갱신하는 목록 모델"""
+
+    def __init__(self, container, make_row, set_row, placeholder=None):
+        self.container = container      # add_widget / remove_widget 이 있는 레이아웃
+        self.make_row = make_row        # (key, value) -> 줄 위젯
+        self.set_row = set_row          # (위젯, value) -> None
+        self.placeholder = placeholder  # 목록이 비었을 때 보여줄 위젯을 만드는 함수
+        self.rows = {}                  # key -> 줄 위젯
+        self.values = {}                # key -> 마지막으로 그린 값
+        self.order = []                 # 화면에 보이는 순서
+        self._empty_widget = None
+        self.created = 0                # 지금까지 만든 줄 수 (계측용)
+        self.updated = 0                # 값이 바뀌어 다시 그린 줄 수
+
+    @instrument("list.sync")
+    def sync(self, entries):
+        """entries: (key, value) 목록 — 바뀐 부분만 반영"""
+        new_order = []
+        new_values = {}
+        for key, value in entries:
+            new_order.append(key)
+            new_values[key] = value
+
+        # 사라진 줄 제거
+        for key in self.order:
+            if key not in new_values:
+                self.container.remove_widget(self.rows.pop(key))
+                del self.values[key]
+
+        # 새 줄 생성 / 바뀐 줄 갱신
+        appended = []
+        for key in new_order:
+            value = new_values[key]
+            row = self.rows.get(key)
+            if row is None:
+                row = self.make_row(key, value)
+                self.rows[key] = row
+                self.created += 1
+                appended.append(key)
+            elif self.values[key] != value:
+                self.set_row(row, value)
+                self.updated += 1
+            self.values[key] = value
+
+        # 순서: 기존 줄 순서가 그대로면 새 줄만 뒤에 붙이고, 아니면 기존 위젯을 다시 배치
+        kept = [k for k in self.order if k in new_values]
+        if kept + appended == new_order:
+            for key in appended:
+                self.container.add_widget(self.rows[key])
+        else:
+            for key in kept:
+                self.container.remove_widget(self.rows[key])
+            for key in new_order:
+                self.container.add_widget(self.rows[key])
+        self.order = new_order
+        self._sync_placeholder()
+
+    def _sync_placeholder(self):
+        if self.placeholder is None:
+            return
+        if not self.order:
+            if self._empty_widget is None:
+                self._empty_widget = self.placeholder()
+            if self._empty_widget.parent is None:
+                self.container.add_widget(self._empty_widget)
+        elif self._empty_widget is not None and self._empty_widget.parent is not None:
+            self.container.remove_widget(self._empty_widget)
@@ -1,47 +1,49 @@
+import time
+_T0 = time.perf_counter()   # 시작 시간 측정 기준 (Kivy 를 불러오는 시간 포함)
+
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
-from kivy.uix.textinput import TextInput
-from kivy.uix.button import Button
-from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.screenmanager import ScreenManager, Screen, NoTransition
+from kivy.factory import Factory
 from kivy.clock import Clock
+from kivy.logger import Logger
 import json
 import os
-import sys
 from datetime import datetime
-from kivy.core.text import LabelBase
-
-def resource_path(relative_path):
-    """EXE와 같은 위치에서 파일 참조"""
-    base_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
-    return os.path.join(base_dir, relative_path)
-
-def get_data_path(filename):
-    """PyInstaller exe에서도 안전하게 저장 가능한 경로 반환"""
-    if hasattr(sys, '_MEIPASS'):
-        # AppData/Local/Ecofit 폴더에 저장
-        base_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "Ecofit")
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir, exist_ok=True)
-        return os.path.join(base_dir, filename)
-    else:
-        # 개발 단계에서는 현재 폴더 사용
-        return filename
+from storage import open_store
+from record_archive import archive_before, archive_months
+from history import HistoryLoader
+from list_model import KeyedListModel
+from translations import TranslationCatalog
+from rest_timer import RestTimer
+from persistence import SaveWorker
+from aggregates import AggregateIndex, KIND_EXERCISE
+from session_engine import SessionEngine, MODE_SEQUENTIAL, MODE_CIRCUIT, STEP_SET, STEP_REST
+from session_checkpoint import SessionCheckpoint
+from record_journal import record_key
+from data_exchange import (BATCH_SIZE, ImportBatch, batched, export_records, export_routines, import_records,
+                           import_routines, read_records, read_routines)
+from paths import resource_path, get_data_path
+from profiles import ProfileManager
+from widgets import FONT_NAME, FLabel, FButton
+from startup_timer import StartupTimer
+from dialog_pool import Dialog, DialogPool
+from perf import PERF, DUMP_NAME, instrument, timed
 
 # -------------------- FILE PATHS --------------------
-FONT_FILE = resource_path("NotoSansKR-VariableFont_wght.ttf")
-SAVE_FILE = get_data_path("workout_data.json")     # 데이터는 사용자 폴더에 저장
-RECORD_FILE = get_data_path("workout_records.json")
+# 데이터는 사용자 폴더에 저장 — 프로필마다 폴더가 따로 있고, 파일 경로는 self.files (paths.DataFiles)
+DATA_ROOT = get_data_path("")
+STORAGE_BACKEND = os.environ.get("ECOFIT_STORAGE", "json")   # "json" 또는 "sqlite"
+ARCHIVE_MONTHS = archive_months()   # 이보다 오래된 해의 기록은 연도별 압축 파일로 (ECOFIT_ARCHIVE_MONTHS, 0 이면 끔)
 LANG_FILE = get_data_path("languages/language.json")
 
-# 폰트 등록 (없으면 예외날 수 있음 — 필요 없으면 주석 처리 가능)
-try:
-    LabelBase.register(name="NotoSans", fn_regular=FONT_FILE)
-except Exception:
-    # 폰트 파일이 없으면 기본 폰트로 계속 동작
-    pass
+RECORD_PAGE_SIZE = 50   # 기록 화면에서 한 번에 불러오는 기록 수
+STARTUP_LOG = os.environ.get("ECOFIT_STARTUP_LOG")    # 주어지면 시작 시간을 이 파일에 한 줄씩 남긴다
+
+# 첫 화면에 없는 위젯은 처음 쓸 때 모듈을 불러온다 (Popup, GridLayout 등 Kivy 기본 위젯은 이미 등록돼 있음)
+Factory.register("FTextInput", module="extra_widgets")
+Factory.register("RecordRow", module="extra_widgets")
 
 # -------------------- 번역 파일 유틸 --------------------
 def load_language_setting():
@@ -60,45 +62,16 @@ def save_language_setting(lang):
     except Exception:
         pass
 
-def load_translation(lang):
-    path = resource_path(f"languages/{lang}.json")  # 언어 폴더 안으로 경로 변경
-    if not os.path.exists(path):
-        return {}
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {}
-
-# -------------------- 커스텀 위젯 --------------------
-class FLabel(Label):
-    def __init__(self, **kwargs):
-        kwargs.setdefault("font_name", "NotoSans")
-        super().__init__(**kwargs)
-
-class FButton(Button):
-    def __init__(self, **kwargs):
-        kwargs.setdefault("font_name", "NotoSans")
-        super().__init__(**kwargs)
-
-class FTextInput(TextInput):
-    def __init__(self, **kwargs):
-        kwargs.setdefault("font_name", "NotoSans")
-        super().__init__(**kwargs)
-
-
 # -------------------- 메인 앱 --------------------
 class WorkoutApp(App):
 
     def tr(self, key):
-        return self.translations.get(key, key)
-
-    def restart_ui(self):
-        """언어 변경 후 UI 전체 재구성"""
-        new_root = self._build_root_layout()
-        self.root.clear_widgets()
-        self.root.add_widget(new_root)
-        self.root_layout = new_root
+        return self.catalog.tr(key)
+
+    def tr_bind(self, widget, key):
+        """위젯 글자를 번역 키에 묶어 둔다 (언어를 바꾸면 그 자리에서 바뀜)"""
+        return self.catalog.bind(widget, key)
+
     def show_language_toggle(self, instance):
         """언어 선택 버튼 토글"""
         # 이미 표시 중이면 제거
@@ -123,457 +96,897 @@ class WorkoutApp(App):
     def change_language(self, lang):
         save_language_setting(lang)
         self.lang = lang
-        self.translations = load_translation(lang)
         # toggle 패널 제거
         if hasattr(self, "_lang_box") and self._lang_box.parent:
             self.root_layout.remove_widget(self._lang_box)
-        self.restart_ui()
+        self.catalog.set_language(lang)
 
     def select_language(self, lang):
         save_language_setting(lang)
         self.lang = lang
-        self.translations = load_translation(lang)
         if hasattr(self, "lang_toggle") and self.lang_toggle.parent:
             self.root_layout.remove_widget(self.lang_toggle)
-        Clock.schedule_once(lambda dt: self.restart_ui(), 0.05)
+        self.catalog.set_language(lang)
+
+    def _on_language_changed(self):
+        """번역 키로 묶을 수 없는 (값이 들어간) 글자만 다시 그린다"""
+        self.lang_btn.text = self.lang.upper()
+        if "routine" in self._screens and getattr(self, "current_routine", None) in self.routines:
+            self.refresh_exercise_list(self.routines[self.current_routine])
+        if "set" in self._screens and hasattr(self, "current_exercise"):
+            self._update_set_labels()
+        if "rest" in self._screens:
+            self._update_pause_btn()
+            if hasattr(self, "rest_time"):
+                self.rest_label.text = self.catalog.template("rest_count").format(sec=self.rest_time)
 
     def build(self):
+        # 첫 프레임은 글자 하나만 그리고, 폰트/번역/데이터/홈 화면은 그 다음 프레임에 준비한다
+        self.startup = StartupTimer(_T0)
+        self.screen_manager = ScreenManager(transition=NoTransition())
+        self._screens = {}
+        self.dialogs = DialogPool(self._build_dialog)
+        self._record_query = None   # 기록 화면 필터 (None 이면 전체)
+        self._perf_overlay = None
+        self._frame_event = None
+        splash = Screen(name="splash")
+        splash.add_widget(Label(text="Ecofit", font_size=28))
+        self.screen_manager.add_widget(splash)
+        # schedule_once(0) 은 이번 프레임을 그리기 전에 불리므로 한 번 더 미뤄서 첫 화면이 먼저 보이게 한다
+        Clock.schedule_once(lambda dt: Clock.schedule_once(self._startup_load, 0), 0)
+        self.startup.mark("build")
+        return self.screen_manager
+
+    def _startup_load(self, dt):
+        self.startup.mark("first_frame")
         # 언어 로딩
         self.lang = load_language_setting()
-        self.translations = load_translation(self.lang)
-
-        # 데이터 로드
+        self.catalog = TranslationCatalog(resource_path("languages"), self.lang)
+        self.catalog.add_listener(self._on_language_changed)
+
+        # 데이터 로드 (마지막으로 쓴 프로필)
+        self.save_worker = SaveWorker()
+        self.save_worker.start()
+        self.profiles = ProfileManager(DATA_ROOT)
+        self._open_profile()
+        self.rest_timer = RestTimer(Clock, self.update_rest, self.finish_rest)
+        self.startup.mark("data")
+
+        # 화면은 처음 보여줄 때 한 번만 만들고 이후에는 데이터만 바꿔 끼운다
+        self.show_screen("home")
+        self.screen_manager.remove_widget(self.screen_manager.get_screen("splash"))
+        self.startup.mark("home")
+        Clock.schedule_once(self._startup_idle, 0.5)
+
+    def _startup_idle(self, dt):
+        # 홈 화면이 뜬 뒤 여유 있을 때 — 나머지 언어 파일과 기록 화면 모듈을 미리 불러 두고 팝업은 미리 만들어 둔다
+        self.catalog.preload()
+        for name in ("RecordRow", "RecycleView", "RecycleBoxLayout"):
+            Factory.get(name)
+        for name in ("exercise", "routine", "run_type"):
+            self.dialogs.get(name)
+        self.startup.mark("idle")
+        Logger.info(f"Startup: {self.startup.summary()}")
+        if STARTUP_LOG:
+            self.startup.append_to(STARTUP_LOG)
+        self._bind_perf_keys()
+        # 지난번에 끝내지 못한 운동이 있으면 물어본다
+        self.offer_resume_session()
+
+    # -------------------- PROFILES --------------------
+    def _open_profile(self):
+        """현재 프로필의 폴더만 연다 — 루틴, 기록 요약(manifest), 집계, 진행 중인 운동"""
+        self.files = self.profiles.files()
+        self.store = open_store(STORAGE_BACKEND, self.files, worker=self.save_worker)
+        # 보관 기간이 지난 해가 생겼으면 연도별 압축 파일로 옮긴다 (manifest 만 보고 판단 — 대개 할 일이 없다)
+        self.store.archive_records(archive_before(ARCHIVE_MONTHS))
         self.routines = self.load_data()
-        self.records = self.load_records()
+        # 기록은 요약만 읽고, 실제 기록은 기록 화면/분석에서 필요할 때 최근 샤드부터 구간별로 읽는다
+        self.history = HistoryLoader(self.store)
+        # 운동별 집계 — 저장소 도장이 같을 때만 저장된 것을 그대로 쓴다
+        self.aggregates = AggregateIndex.load(self.files.aggregates, resolver=self._find_last_date)
+        if self.aggregates is not None and self.aggregates.stamp != self.store.records_header().get("stamp"):
+            self.aggregates = None
+        self.checkpoint = SessionCheckpoint(self.files.session)
+        self._analytics = self._analytics_version = None
+        self._record_query = None
+
+    def switch_profile(self, pid):
+        if pid == self.profiles.current:
+            return
+        # 이전 프로필의 남은 저장을 끝내고 닫는다
+        self.save_worker.flush()
+        self.store.close()
+        self.checkpoint.close()
+        self.profiles.switch(pid)
+        self._open_profile()
+        self.refresh_routine_list()
+        self.profile_btn.text = self.profiles.name()
+        if "records" in self._screens:
+            for field in self.record_filters.values():
+                field.text = ""
+            self.records_view.data = []
+        self.show_screen("home")
+        self.offer_resume_session()
+
+    def show_profile_popup(self, instance):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        scroll = Factory.ScrollView(size_hint=(1, 1))
+        box = BoxLayout(orientation='vertical', spacing=5, size_hint_y=None)
+        box.bind(minimum_height=box.setter('height'))
+        popup = self._popup(layout, "profile", size_hint=(0.8, 0.8))
+        for pid, name in self.profiles.items():
+            btn = FButton(text=name, size_hint_y=None, height=50, disabled=pid == self.profiles.current)
+            btn.bind(on_release=lambda x, p=pid: (popup.dismiss(), self.switch_profile(p)))
+            box.add_widget(btn)
+        scroll.add_widget(box)
+        layout.add_widget(scroll)
+        name_input = self.catalog.bind(Factory.FTextInput(multiline=False, size_hint_y=None, height=40),
+                                       "profile_name", "hint_text")
+        layout.add_widget(name_input)
+        btn_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
+        add_btn = self.tr_bind(FButton(), "add_profile")
+        close_btn = self.tr_bind(FButton(on_release=popup.dismiss), "back")
+        btn_layout.add_widget(add_btn)
+        btn_layout.add_widget(close_btn)
+        layout.add_widget(btn_layout)
+
+        def add_profile(*args):
+            name = name_input.text.strip()
+            if name:
+                popup.dismiss()
+                self.switch_profile(self.profiles.create(name))
+        add_btn.bind(on_release=add_profile)
+        popup.open()
+
+    # -------------------- SCREENS --------------------
+    def show_screen(self, name):
+        """캐시된 화면으로 전환 (없으면 _build_<name>_screen 으로 만든다)"""
+        with timed(f"screen.{name}"):
+            if name not in self._screens:
+                screen = Screen(name=name)
+                screen.add_widget(getattr(self, f"_build_{name}_screen")())
+                self.screen_manager.add_widget(screen)
+                self._screens[name] = screen
+            self.screen_manager.current = name
+
+    # -------------------- DIALOGS --------------------
+    # 팝업은 처음 열 때 _build_<name>_dialog 로 한 번만 만들고, 이후에는 값과 동작만 바꿔서 다시 연다
+    def _build_dialog(self, name):
+        return getattr(self, f"_build_{name}_dialog")()
+
+    def _popup(self, content, title_key=None, **kwargs):
+        kwargs.setdefault("size_hint", (0.7, 0.7))
+        kwargs.setdefault("auto_dismiss", False)
+        popup = Factory.Popup(content=content, title_font=FONT_NAME, **kwargs)
+        if title_key:
+            self.catalog.bind(popup, title_key, "title")
+        return popup
+
+    def _ok_cancel_row(self):
+        btn_layout = BoxLayout(size_hint_y=None, height=40, spacing=10)
+        ok_btn = self.tr_bind(FButton(), "yes")
+        cancel_btn = self.tr_bind(FButton(), "no")
+        btn_layout.add_widget(ok_btn)
+        btn_layout.add_widget(cancel_btn)
+        return btn_layout, ok_btn, cancel_btn
+
+    def _build_routine_dialog(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        name_input = self.catalog.bind(Factory.FTextInput(size_hint_y=None, height=40), "routine_name", "hint_text")
+        layout.add_widget(name_input)
+        desc_input = self.catalog.bind(Factory.FTextInput(size_hint_y=None, height=80), "description", "hint_text")
+        layout.add_widget(desc_input)
+        btn_layout, ok_btn, cancel_btn = self._ok_cancel_row()
+        layout.add_widget(btn_layout)
+
+        dialog = Dialog(self._popup(layout, "add_routine", size_hint=(0.7, 0.5)),
+                        {"name": name_input, "description": desc_input})
+        dialog.button(ok_btn, "ok")
+        dialog.button(cancel_btn, "cancel")
+        return dialog
+
+    def _build_exercise_dialog(self):
+        """운동 추가/수정이 같이 쓰는 입력 폼 (제목은 열 때 정한다)"""
+        layout = Factory.GridLayout(cols=2, spacing=10, padding=10, size_hint_y=None)
+        layout.bind(minimum_height=layout.setter('height'))
+        fields = {}
+        for name, key in (("name", "label_ex_name"), ("sets", "label_sets"), ("reps", "label_reps"), ("rest", "label_rest_sec")):
+            layout.add_widget(self.tr_bind(FLabel(), key))
+            if name == "name":
+                field = Factory.FTextInput(size_hint_y=None, height=40)
+            else:
+                field = Factory.FTextInput(input_filter="int", size_hint_y=None, height=40)
+            layout.add_widget(field)
+            fields[name] = field
+
+        btn_layout, ok_btn, cancel_btn = self._ok_cancel_row()
+        outer = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        outer.add_widget(layout)
+        outer.add_widget(btn_layout)
 
-        # root layout 생성 (분리된 함수로 재사용 가능)
-        self.root_layout = self._build_root_layout()
-        return self.root_layout
+        dialog = Dialog(self._popup(outer), fields)
+        dialog.button(ok_btn, "ok")
+        dialog.button(cancel_btn, "cancel")
+        return dialog
 
-    def _build_root_layout(self):
+    def _build_run_type_dialog(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        seq_btn = self.tr_bind(FButton(), "seq_mode")
+        circ_btn = self.tr_bind(FButton(), "circuit_mode")
+        layout.add_widget(seq_btn)
+        layout.add_widget(circ_btn)
+        dialog = Dialog(self._popup(layout, "select_run_type", size_hint=(0.5, 0.4), auto_dismiss=True))
+        dialog.button(seq_btn, "sequential")
+        dialog.button(circ_btn, "circuit")
+        return dialog
+
+    def _build_home_screen(self):
         root_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        self.title_label = FLabel(text=self.tr("app_title"), font_size=28, size_hint_y=None, height=50)
+        self.root_layout = root_layout
+        self.title_label = self.tr_bind(FLabel(font_size=28, size_hint_y=None, height=50), "app_title")
         root_layout.add_widget(self.title_label)
 
-        self.scroll = ScrollView(size_hint=(1, 1))
+        self.scroll = Factory.ScrollView(size_hint=(1, 1))
         self.routine_list = BoxLayout(orientation='vertical', spacing=5, size_hint_y=None)
         self.routine_list.bind(minimum_height=self.routine_list.setter('height'))
+        self.routine_rows = KeyedListModel(
+            self.routine_list, self._make_routine_row, self._set_routine_row,
+            placeholder=lambda: self.tr_bind(FLabel(size_hint_y=None, height=30), "no_routine"))
         self.scroll.add_widget(self.routine_list)
         root_layout.add_widget(self.scroll)
         self.refresh_routine_list()
 
-        add_btn = FButton(text=self.tr("add_routine"), size_hint_y=None, height=50, on_release=self.show_add_routine_popup)
+        add_btn = self.tr_bind(FButton(size_hint_y=None, height=50, on_release=self.show_add_routine_popup), "add_routine")
         root_layout.add_widget(add_btn)
 
-        rec_btn = FButton(text=self.tr("records"), size_hint_y=None, height=50, on_release=self.show_records)
+        rec_btn = self.tr_bind(FButton(size_hint_y=None, height=50, on_release=self.show_records), "records")
         root_layout.add_widget(rec_btn)
 
+        data_btn = self.tr_bind(FButton(size_hint_y=None, height=50, on_release=self.show_data_popup), "data_transfer")
+        root_layout.add_widget(data_btn)
+
+        # 프로필 버튼 (지금 프로필 이름)
+        self.profile_btn = FButton(text=self.profiles.name(), size_hint_y=None, height=50)
+        self.profile_btn.bind(on_release=self.show_profile_popup)
+        root_layout.add_widget(self.profile_btn)
+
         # 언어 버튼
-        lang_btn = FButton(text=self.lang.upper(), size_hint_y=None, height=50)
-        lang_btn.bind(on_release=self.show_language_toggle)
-        root_layout.add_widget(lang_btn)
+        self.lang_btn = FButton(text=self.lang.upper(), size_hint_y=None, height=50)
+        self.lang_btn.bind(on_release=self.show_language_toggle)
+        root_layout.add_widget(self.lang_btn)
 
         return root_layout
 
     # -------------------- ROUTINE MANAGEMENT --------------------
     def refresh_routine_list(self):
-        self.routine_list.clear_widgets()
-        if not self.routines:
-            self.routine_list.add_widget(FLabel(text=self.tr("no_routine"), size_hint_y=None, height=30))
-        else:
-            for name in self.routines.keys():
-                btn_layout = BoxLayout(size_hint_y=None, height=50)
-                btn = FButton(text=name)
-                btn.bind(on_release=lambda instance, n=name: self.open_routine(n))
-                delete_btn = FButton(text=self.tr("delete_short"), size_hint_x=None, width=50)
-                delete_btn.bind(on_release=lambda instance, n=name: self.delete_routine(n))
-                btn_layout.add_widget(btn)
-                btn_layout.add_widget(delete_btn)
-                self.routine_list.add_widget(btn_layout)
+        # 바뀐 루틴 줄만 추가/삭제 (루틴 이름이 키)
+        self.routine_rows.sync((name, name) for name in self.routines)
+
+    @instrument("routine_list.row")
+    def _make_routine_row(self, name, text):
+        btn_layout = BoxLayout(size_hint_y=None, height=50)
+        btn = FButton(text=text)
+        btn.bind(on_release=lambda instance, n=name: self.open_routine(n))
+        delete_btn = self.tr_bind(FButton(size_hint_x=None, width=50), "delete_short")
+        delete_btn.bind(on_release=lambda instance, n=name: self.delete_routine(n))
+        btn_layout.add_widget(btn)
+        btn_layout.add_widget(delete_btn)
+        btn_layout.name_btn = btn
+        return btn_layout
+
+    def _set_routine_row(self, row, text):
+        row.name_btn.text = text
 
     def delete_routine(self, name):
         if name in self.routines:
             del self.routines[name]
-            self.save_data()
+            self.store.delete_routine(name)
             self.refresh_routine_list()
 
     def show_add_routine_popup(self, instance):
-        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        name_input = FTextInput(hint_text=self.tr("routine_name"), size_hint_y=None, height=40)
-        layout.add_widget(name_input)
-        desc_input = FTextInput(hint_text=self.tr("description"), size_hint_y=None, height=80)
-        layout.add_widget(desc_input)
+        self.dialogs.open("routine", values={"name": "", "description": ""}, ok=self.create_routine)
 
-        popup_layout = BoxLayout(size_hint_y=None, height=40, spacing=10)
-        ok_btn = FButton(text=self.tr("yes"))
-        cancel_btn = FButton(text=self.tr("no"))
-        popup_layout.add_widget(ok_btn)
-        popup_layout.add_widget(cancel_btn)
-        layout.add_widget(popup_layout)
-
-        popup = Popup(title=self.tr("add_routine"), content=layout, size_hint=(0.7, 0.5), auto_dismiss=False, title_font="NotoSansKR-VariableFont_wght.ttf")
-
-        def create_routine(instance):
-            name = name_input.text.strip()
-            desc = desc_input.text.strip()
-            if not name or name in self.routines:
-                return
-            self.routines[name] = {"description": desc, "exercises": []}
-            self.save_data()
-            popup.dismiss()
-            self.refresh_routine_list()
-
-        ok_btn.bind(on_release=create_routine)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+    def create_routine(self, dialog):
+        values = dialog.values()
+        name = values["name"].strip()
+        desc = values["description"].strip()
+        if not name or name in self.routines:
+            return
+        self.routines[name] = {"description": desc, "exercises": []}
+        self.store.add_routine(name, self.routines[name])
+        dialog.dismiss()
+        self.refresh_routine_list()
 
     # -------------------- ROUTINE DETAIL --------------------
     def open_routine(self, routine_name):
-        self.root_layout.clear_widgets()
         self.current_routine = routine_name
         data = self.routines[routine_name]
-
-        title = FLabel(text=f"[b]{routine_name}[/b]", markup=True, font_size=26, size_hint_y=None, height=50)
-        self.root_layout.add_widget(title)
+        self.show_screen("routine")
+        self.routine_title.text = f"[b]{routine_name}[/b]"
         # 저장은 'description' 키에 하므로 보여줄 때도 'description' 사용
-        desc_label = FLabel(text=data.get("description", ""), size_hint_y=None, height=50)
-        self.root_layout.add_widget(desc_label)
+        self.routine_desc.text = data.get("description", "")
+        self.refresh_exercise_list(data)
+
+    def _build_routine_screen(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.routine_title = FLabel(markup=True, font_size=26, size_hint_y=None, height=50)
+        layout.add_widget(self.routine_title)
+        self.routine_desc = FLabel(size_hint_y=None, height=50)
+        layout.add_widget(self.routine_desc)
 
-        self.scroll_ex = ScrollView(size_hint=(1, 1))
+        # 운동 목록 줄 위젯은 루틴을 바꿔 열어도 재사용
+        self.scroll_ex = Factory.ScrollView(size_hint=(1, 1))
         self.exercise_box = BoxLayout(orientation='vertical', spacing=5, size_hint_y=None)
         self.exercise_box.bind(minimum_height=self.exercise_box.setter('height'))
+        self.exercise_rows = KeyedListModel(
+            self.exercise_box, self._make_exercise_row, self._set_exercise_row,
+            placeholder=lambda: self.tr_bind(FLabel(size_hint_y=None, height=30), "no_exercise"))
         self.scroll_ex.add_widget(self.exercise_box)
-        self.root_layout.add_widget(self.scroll_ex)
-
-        self.refresh_exercise_list(data)
+        layout.add_widget(self.scroll_ex)
 
         btn_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
-        add_ex_btn = FButton(text=self.tr("add_exercise"), on_release=self.show_add_exercise_popup)
-        run_btn = FButton(text=self.tr("run_routine"), on_release=self.show_routine_type_popup)
-        back_btn = FButton(text=self.tr("back"), on_release=self.go_back)
+        add_ex_btn = self.tr_bind(FButton(on_release=self.show_add_exercise_popup), "add_exercise")
+        run_btn = self.tr_bind(FButton(on_release=self.show_routine_type_popup), "run_routine")
+        back_btn = self.tr_bind(FButton(on_release=self.go_back), "back")
         btn_layout.add_widget(add_ex_btn)
         btn_layout.add_widget(run_btn)
         btn_layout.add_widget(back_btn)
-        self.root_layout.add_widget(btn_layout)
+        layout.add_widget(btn_layout)
+        return layout
 
+    @instrument("exercise_list.refresh")
     def refresh_exercise_list(self, data):
-        self.exercise_box.clear_widgets()
-        if not data["exercises"]:
-            self.exercise_box.add_widget(FLabel(text=self.tr("no_exercise"), size_hint_y=None, height=30))
-        else:
-            for i, ex in enumerate(data["exercises"]):
-                txt = f"{ex['name']} - {ex['sets']} {self.tr('sets_short')} x {ex['reps']} {self.tr('reps_short')} | {self.tr('rest_short')} {ex['rest']}{self.tr('sec_short')}"
-                ex_layout = BoxLayout(size_hint_y=None, height=30)
-                ex_label = FLabel(text=txt)
-                edit_btn = FButton(text=self.tr("edit"), size_hint_x=None, width=50)
-                del_btn = FButton(text=self.tr("delete_short"), size_hint_x=None, width=50)
-                edit_btn.bind(on_release=lambda x, idx=i: self.show_edit_exercise_popup(idx))
-                del_btn.bind(on_release=lambda x, idx=i: self.delete_exercise(idx))
-                ex_layout.add_widget(ex_label)
-                ex_layout.add_widget(edit_btn)
-                ex_layout.add_widget(del_btn)
-                self.exercise_box.add_widget(ex_layout)
+        # 운동 번호가 키 — 수정/추가/삭제된 줄의 글자만 바뀐다
+        self.exercise_rows.sync((i, self._exercise_text(ex)) for i, ex in enumerate(data["exercises"]))
+
+    def _exercise_text(self, ex):
+        return self.catalog.template("exercise_row").format(**ex)
+
+    @instrument("exercise_list.row")
+    def _make_exercise_row(self, idx, txt):
+        ex_layout = BoxLayout(size_hint_y=None, height=30)
+        ex_label = FLabel(text=txt)
+        edit_btn = self.tr_bind(FButton(size_hint_x=None, width=50), "edit")
+        del_btn = self.tr_bind(FButton(size_hint_x=None, width=50), "delete_short")
+        edit_btn.bind(on_release=lambda x: self.show_edit_exercise_popup(idx))
+        del_btn.bind(on_release=lambda x: self.delete_exercise(idx))
+        ex_layout.add_widget(ex_label)
+        ex_layout.add_widget(edit_btn)
+        ex_layout.add_widget(del_btn)
+        ex_layout.label = ex_label
+        return ex_layout
+
+    def _set_exercise_row(self, row, txt):
+        row.label.text = txt
 
     # -------------------- EDIT EXERCISE --------------------
     def show_edit_exercise_popup(self, index):
         ex = self.routines[self.current_routine]["exercises"][index]
-        layout = GridLayout(cols=2, spacing=10, padding=10, size_hint_y=None)
-        layout.bind(minimum_height=layout.setter('height'))
-
-        layout.add_widget(FLabel(text=self.tr("label_ex_name")))
-        name_input = FTextInput(text=ex['name'], size_hint_y=None, height=40)
-        layout.add_widget(name_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_sets")))
-        sets_input = FTextInput(text=str(ex['sets']), input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(sets_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_reps")))
-        reps_input = FTextInput(text=str(ex['reps']), input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(reps_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_rest_sec")))
-        rest_input = FTextInput(text=str(ex['rest']), input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(rest_input)
-
-        btn_layout = BoxLayout(size_hint_y=None, height=40, spacing=10)
-        ok_btn = FButton(text=self.tr("yes"))
-        cancel_btn = FButton(text=self.tr("no"))
-        btn_layout.add_widget(ok_btn)
-        btn_layout.add_widget(cancel_btn)
-
-        outer = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        outer.add_widget(layout)
-        outer.add_widget(btn_layout)
-
-        popup = Popup(title=self.tr("edit_exercise"), content=outer, size_hint=(0.7, 0.7), auto_dismiss=False, title_font="NotoSansKR-VariableFont_wght.ttf")
-
-        def save_changes(instance):
-            ex['name'] = name_input.text.strip()
-            ex['sets'] = int(sets_input.text.strip())
-            ex['reps'] = int(reps_input.text.strip())
-            ex['rest'] = int(rest_input.text.strip())
-            self.save_data()
-            popup.dismiss()
-            self.refresh_exercise_list(self.routines[self.current_routine])
-
-        ok_btn.bind(on_release=save_changes)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        values = {"name": ex['name'], "sets": str(ex['sets']), "reps": str(ex['reps']), "rest": str(ex['rest'])}
+        self.dialogs.open("exercise", title=self.tr("edit_exercise"), values=values,
+                          ok=lambda dialog: self.save_exercise(dialog, index))
+
+    def save_exercise(self, dialog, index):
+        exercises = self.routines[self.current_routine]["exercises"]
+        ex = self._exercise_from_form(dialog.values())
+        if ex is None or not 0 <= index < len(exercises):
+            return
+        exercises[index].update(ex)
+        self.store.update_exercise(self.current_routine, index, exercises[index])
+        dialog.dismiss()
+        self.refresh_exercise_list(self.routines[self.current_routine])
+
+    def _exercise_from_form(self, values):
+        """입력칸 값 -> 운동 dict (비었거나 숫자가 아니면 None)"""
+        name = values["name"].strip()
+        if not name:
+            return None
+        try:
+            return {"name": name, "sets": int(values["sets"]), "reps": int(values["reps"]), "rest": int(values["rest"])}
+        except ValueError:
+            return None
 
     def delete_exercise(self, index):
         data = self.routines[self.current_routine]["exercises"]
         if 0 <= index < len(data):
             data.pop(index)
-            self.save_data()
+            self.store.delete_exercise(self.current_routine, index)
             self.refresh_exercise_list(self.routines[self.current_routine])
 
     # -------------------- ADD EXERCISE --------------------
     def show_add_exercise_popup(self, instance):
-        layout = GridLayout(cols=2, spacing=10, padding=10, size_hint_y=None)
-        layout.bind(minimum_height=layout.setter('height'))
-
-        layout.add_widget(FLabel(text=self.tr("label_ex_name")))
-        name_input = FTextInput(size_hint_y=None, height=40)
-        layout.add_widget(name_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_sets")))
-        sets_input = FTextInput(input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(sets_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_reps")))
-        reps_input = FTextInput(input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(reps_input)
-
-        layout.add_widget(FLabel(text=self.tr("label_rest_sec")))
-        rest_input = FTextInput(input_filter="int", size_hint_y=None, height=40)
-        layout.add_widget(rest_input)
-
-        btn_layout = BoxLayout(size_hint_y=None, height=40, spacing=10)
-        ok_btn = FButton(text=self.tr("yes"))
-        cancel_btn = FButton(text=self.tr("no"))
-        btn_layout.add_widget(ok_btn)
-        btn_layout.add_widget(cancel_btn)
+        self.dialogs.open("exercise", title=self.tr("add_exercise"),
+                          values={"name": "", "sets": "", "reps": "", "rest": ""}, ok=self.add_exercise)
 
-        outer = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        outer.add_widget(layout)
-        outer.add_widget(btn_layout)
-
-        popup = Popup(title=self.tr("add_exercise"), content=outer, size_hint=(0.7, 0.7), auto_dismiss=False, title_font="NotoSansKR-VariableFont_wght.ttf")
-
-        ok_btn.bind(on_release=lambda x: self.add_exercise(name_input.text, sets_input.text, reps_input.text, rest_input.text, popup))
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
-
-    def add_exercise(self, name, sets, reps, rest, popup):
-        if not name.strip() or not sets.strip() or not reps.strip() or not rest.strip():
+    def add_exercise(self, dialog):
+        ex = self._exercise_from_form(dialog.values())
+        if ex is None:
             return
         data = self.routines[self.current_routine]
-        data["exercises"].append({
-            "name": name,
-            "sets": int(sets),
-            "reps": int(reps),
-            "rest": int(rest)
-        })
-        self.save_data()
-        popup.dismiss()
+        data["exercises"].append(ex)
+        self.store.add_exercise(self.current_routine, ex)
+        dialog.dismiss()
         self.refresh_exercise_list(data)
 
     def go_back(self, instance=None):
-        self.root_layout.clear_widgets()
-        self.root_layout.add_widget(self.title_label)
-        self.root_layout.add_widget(self.scroll)
         self.refresh_routine_list()
-
-        add_btn = FButton(text=self.tr("add_routine"), size_hint_y=None, height=50, on_release=self.show_add_routine_popup)
-        rec_btn = FButton(text=self.tr("records"), size_hint_y=None, height=50, on_release=self.show_records)
-        lang_btn = FButton(text=self.lang.upper(), size_hint_y=None, height=50, on_release=self.show_language_toggle)
-        self.root_layout.add_widget(add_btn)
-        self.root_layout.add_widget(rec_btn)
-        self.root_layout.add_widget(lang_btn)
+        self.show_screen("home")
 
     # -------------------- RUN ROUTINE --------------------
     def show_routine_type_popup(self, instance):
-        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        seq_btn = FButton(text=self.tr("seq_mode"))
-        circ_btn = FButton(text=self.tr("circuit_mode"))
-        layout.add_widget(seq_btn)
-        layout.add_widget(circ_btn)
-        popup = Popup(title=self.tr("select_run_type"), content=layout, size_hint=(0.5, 0.4), auto_dismiss=True, title_font="NotoSansKR-VariableFont_wght.ttf")
-        seq_btn.bind(on_release=lambda x: (popup.dismiss(), self.start_routine("sequential")))
-        circ_btn.bind(on_release=lambda x: (popup.dismiss(), self.start_routine("circuit")))
-        popup.open()
+        self.dialogs.open("run_type",
+                          sequential=lambda dialog: (dialog.dismiss(), self.start_routine(MODE_SEQUENTIAL)),
+                          circuit=lambda dialog: (dialog.dismiss(), self.start_routine(MODE_CIRCUIT)))
 
     def start_routine(self, r_type):
-        self.routine_type = r_type
-        self.data = self.routines[self.current_routine]["exercises"]
-        if not self.data:
+        exercises = self.routines[self.current_routine]["exercises"]
+        if not exercises:
             return
-        self.root_layout.clear_widgets()
-        self.current_ex_index = 0
-        self.current_set_per_ex = [0]*len(self.data)
-        self.set_reps_accum = [0]*len(self.data)
-        if self.routine_type == "sequential":
-            self.ex_order = list(range(len(self.data)))
-        else:  # circuit
-            max_sets = max(ex["sets"] for ex in self.data)
-            self.ex_order = []
-            for s in range(max_sets):
-                for i, ex in enumerate(self.data):
-                    if self.current_set_per_ex[i] < ex["sets"]:
-                        self.ex_order.append(i)
-        self.show_exercise(self.ex_order[0])
-
-    def show_exercise(self, ex_idx):
-        self.root_layout.clear_widgets()
-        idx = ex_idx
-        self.current_ex_index = idx
-        ex = self.data[idx]
-        self.current_exercise = ex
-        self.current_set = self.current_set_per_ex[idx] + 1
-        self.exercise_label = FLabel(text=f"{ex['name']} ({self.tr('set_label')} {self.current_set}/{ex['sets']})", font_size=26, size_hint_y=None, height=50)
-        self.root_layout.add_widget(self.exercise_label)
+        # 세트/휴식 순서는 여기서 한 번만 계산하고 이후에는 단계만 넘긴다
+        self.session = SessionEngine(self.current_routine, exercises, r_type)
+        self.checkpoint.begin(self.session, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.show_step()
+
+    def offer_resume_session(self):
+        restored = self.checkpoint.restore()
+        if restored is None:
+            self.checkpoint.discard()
+            return
+        session, started = restored
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        layout.add_widget(FLabel(text=f"{session.routine}\n{started or ''}", halign="center"))
+        btn_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
+        yes_btn = FButton(text=self.tr("yes"))
+        no_btn = FButton(text=self.tr("no"))
+        btn_layout.add_widget(yes_btn)
+        btn_layout.add_widget(no_btn)
+        layout.add_widget(btn_layout)
+        popup = Factory.Popup(title=self.tr("resume_session"), content=layout, size_hint=(0.7, 0.4), auto_dismiss=False, title_font=FONT_NAME)
+        yes_btn.bind(on_release=lambda x: (popup.dismiss(), self.resume_session(session)))
+        no_btn.bind(on_release=lambda x: (popup.dismiss(), self.checkpoint.discard()))
+        popup.open()
+
+    def resume_session(self, session):
+        self.current_routine = session.routine
+        self.session = session
+        self.checkpoint.reopen()
+        self.show_step()
+
+    def show_step(self):
+        """세션의 현재 단계에 맞는 화면 표시"""
+        step = self.session.step
+        if step.kind == STEP_SET:
+            self.show_exercise(step)
+        elif step.kind == STEP_REST:
+            self.start_rest(step.rest)
+        else:
+            self.record_results()
+            self.show_finish_screen()
+
+    def show_exercise(self, step):
+        self.current_exercise = self.session.exercises[step.ex_index]
+        self.current_set = step.set_no
         self.actual_reps = 0
-        self.rep_label = FLabel(text=f"{self.actual_reps}/{ex['reps']} {self.tr('reps_unit')}", font_size=22)
-        self.root_layout.add_widget(self.rep_label)
+        self.show_screen("set")
+        self._update_set_labels()
+
+    def _update_set_labels(self):
+        ex = self.current_exercise
+        self.exercise_label.text = self.catalog.template("set_title").format(name=ex['name'], set=self.current_set, sets=ex['sets'])
+        self.rep_label.text = self.catalog.template("rep_count").format(done=self.actual_reps, target=ex['reps'])
+        # 지난 기록 / 최고 기록은 집계 인덱스에서 바로 꺼낸다
+        stats = self.aggregate_index().get(ex['name'], KIND_EXERCISE)
+        if stats and stats.last:
+            self.summary_label.text = self.catalog.template("exercise_summary").format(last=stats.last[:10], best=stats.best)
+        else:
+            self.summary_label.text = ""
+
+    def _build_set_screen(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.exercise_label = FLabel(font_size=26, size_hint_y=None, height=50)
+        layout.add_widget(self.exercise_label)
+        self.summary_label = FLabel(size_hint_y=None, height=30)
+        layout.add_widget(self.summary_label)
+        self.rep_label = FLabel(font_size=22)
+        layout.add_widget(self.rep_label)
         btn_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
         plus_btn = FButton(text="+")
         minus_btn = FButton(text="-")
-        done_btn = FButton(text=self.tr("complete"))
+        done_btn = self.tr_bind(FButton(), "complete")
         btn_layout.add_widget(plus_btn)
         btn_layout.add_widget(minus_btn)
         btn_layout.add_widget(done_btn)
-        self.root_layout.add_widget(btn_layout)
+        layout.add_widget(btn_layout)
         plus_btn.bind(on_release=lambda x: self.add_rep())
         minus_btn.bind(on_release=lambda x: self.sub_rep())
         done_btn.bind(on_release=lambda x: self.complete_set())
+        return layout
 
     def add_rep(self):
         self.actual_reps += 1
-        self.rep_label.text = f"{self.actual_reps}/{self.current_exercise['reps']} {self.tr('reps_unit')}"
+        self.rep_label.text = self.catalog.template("rep_count").format(done=self.actual_reps, target=self.current_exercise['reps'])
 
     def sub_rep(self):
         if self.actual_reps > 0:
             self.actual_reps -= 1
-            self.rep_label.text = f"{self.actual_reps}/{self.current_exercise['reps']} {self.tr('reps_unit')}"
+            self.rep_label.text = self.catalog.template("rep_count").format(done=self.actual_reps, target=self.current_exercise['reps'])
 
     def start_rest(self, seconds):
-        self.root_layout.clear_widgets()
         self.rest_time = seconds
-        self.rest_label = FLabel(text=f"{self.tr('rest_label')}: {self.rest_time}{self.tr('sec_short')}", font_size=30)
-        self.root_layout.add_widget(self.rest_label)
-
-        Clock.schedule_interval(self.update_rest, 1)
+        self.show_screen("rest")
+        # 끝나는 시각 기준 타이머 — 다시 불러도 이전 예약은 취소된다
+        self.rest_timer.start(seconds)
+        self._update_pause_btn()
 
-    def update_rest(self, dt):
-        self.rest_time -= 1
-        if self.rest_time <= 0:
-            Clock.unschedule(self.update_rest)
-            self.show_exercise(self.current_ex_index)
+    def _build_rest_screen(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.rest_label = FLabel(font_size=30)
+        layout.add_widget(self.rest_label)
+        btn_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
+        self.pause_btn = FButton(on_release=lambda x: self.toggle_rest_pause())
+        skip_btn = self.tr_bind(FButton(on_release=lambda x: self.rest_timer.skip()), "skip")
+        btn_layout.add_widget(self.pause_btn)
+        btn_layout.add_widget(skip_btn)
+        layout.add_widget(btn_layout)
+        return layout
+
+    @instrument("rest.tick")
+    def update_rest(self, seconds_left):
+        """화면 숫자가 바뀔 때만 불린다"""
+        self.rest_time = seconds_left
+        self.rest_label.text = self.catalog.template("rest_count").format(sec=seconds_left)
+
+    @instrument("rest.finish")
+    def finish_rest(self):
+        stats = self.rest_timer.jitter_stats()
+        Logger.debug(f"RestTimer: jitter mean {stats['mean_ms']:.1f}ms p99 {stats['p99_ms']:.1f}ms")
+        self.session.finish_rest()
+        self.show_step()
+
+    def toggle_rest_pause(self):
+        if self.rest_timer.paused:
+            self.rest_timer.resume()
+            self.session.resume()
         else:
-            self.rest_label.text = f"{self.tr('rest_label')}: {self.rest_time}{self.tr('sec_short')}"
+            self.rest_timer.pause()
+            self.session.pause()
+        self._update_pause_btn()
 
+    def _update_pause_btn(self):
+        self.pause_btn.text = self.tr("resume") if self.rest_timer.paused else self.tr("pause")
+
+    @instrument("session.complete_set")
     def complete_set(self):
-        idx = self.current_ex_index
-        self.set_reps_accum[idx] += self.actual_reps
-        self.current_set_per_ex[idx] += 1
+        position, step = self.session.position, self.session.step
+        self.session.complete_set(self.actual_reps)
+        # 세트마다 고정 크기 한 줄만 남기고, 디스크 동기화는 저장 스레드에서
+        self.checkpoint.record_set(position, step.ex_index, self.actual_reps)
+        self.save_worker.schedule(self.files.session, self.checkpoint.sync)
         self.actual_reps = 0
-
-        # Circuit
-        if self.routine_type == "circuit":
-            next_idx = None
-            for i in range(idx + 1, len(self.ex_order)):
-                if self.current_set_per_ex[self.ex_order[i]] < self.data[self.ex_order[i]]["sets"]:
-                    next_idx = i
-                    break
-            if next_idx is not None:
-                self.start_rest(self.data[idx]['rest'])  # 휴식 시작
-            else:
-                self.record_circuit_results()
-                self.show_finish_screen()
-        else:  # Sequential
-            ex = self.current_exercise
-            if self.current_set_per_ex[idx] < ex["sets"]:
-                self.start_rest(ex['rest'])  # 휴식 시작
-            else:
-                next_idx = idx + 1
-                if next_idx < len(self.data):
-                    self.start_rest(self.data[idx]['rest'])  # 다음 운동 전 휴식
-                else:
-                    self.record_sequential_results()
-                    self.show_finish_screen()
+        self.show_step()
 
     # -------------------- RECORDING --------------------
-    def record_sequential_results(self):
+    def record_results(self):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        record = {"date": now, "routine": self.current_routine}
-        for i, ex in enumerate(self.data):
-            record[ex['name']] = self.set_reps_accum[i]
-        self.records.append(record)
-        self.save_records()
-
-    def record_circuit_results(self):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        record = {"date": now, "routine": self.current_routine}
-        for i, ex in enumerate(self.data):
-            record[ex['name']] = self.set_reps_accum[i]
-        self.records.append(record)
-        self.save_records()
+        record = self.session.result(now)
+        self.history.add(record)
+        self._update_aggregates(added=record)
+        self.checkpoint.discard()
 
+    @instrument("records.show")
     def show_records(self, instance=None):
-        self.root_layout.clear_widgets()
-        layout = BoxLayout(orientation='vertical', spacing=5)
-        scroll = ScrollView()
-        rec_box = BoxLayout(orientation='vertical', spacing=5, size_hint_y=None)
+        self.show_screen("records")
+        self.records_view.data = []
+        self.records_view.scroll_y = 1
+        # 최신 기록부터 한 페이지씩 읽어온다
+        self.load_record_page()
+
+    def _build_records_screen(self):
+        layout = BoxLayout(orientation='vertical', spacing=5, padding=10)
+        # 필터: 루틴 / 운동 이름(앞부분) / 날짜 범위 — 엔터 또는 검색 버튼으로 적용
+        filter_bar = BoxLayout(size_hint_y=None, height=40, spacing=5)
+        self.record_filters = {}
+        for name, key in (("routine", "filter_routine"), ("prefix", "filter_exercise"),
+                          ("since", "filter_from"), ("until", "filter_to")):
+            field = self.catalog.bind(Factory.FTextInput(multiline=False), key, "hint_text")
+            field.bind(on_text_validate=self.apply_record_filter)
+            self.record_filters[name] = field
+            filter_bar.add_widget(field)
+        search_btn = self.tr_bind(FButton(size_hint_x=None, width=80, on_release=self.apply_record_filter), "search")
+        filter_bar.add_widget(search_btn)
+        layout.add_widget(filter_bar)
+        self.records_view = Factory.RecycleView(viewclass="RecordRow")
+        rec_box = Factory.RecycleBoxLayout(orientation='vertical', spacing=5, size_hint_y=None,
+                                   default_size=(None, 30), default_size_hint=(1, None))
         rec_box.bind(minimum_height=rec_box.setter('height'))
-        for i, rec in enumerate(self.records):
-            ex_text = ", ".join(f"{k}:{v}" for k, v in rec.items() if k not in ["date", "routine"])
-            text = f"{rec['date']} - {rec['routine']} - {ex_text}"
-            rec_layout = BoxLayout(size_hint_y=None, height=30)
-            lbl = FLabel(text=text)
-            del_btn = FButton(text=self.tr("delete_short"), size_hint_x=None, width=50)
-            del_btn.bind(on_release=lambda x, idx=i: self.delete_record(idx))
-            rec_layout.add_widget(lbl)
-            rec_layout.add_widget(del_btn)
-            rec_box.add_widget(rec_layout)
-        scroll.add_widget(rec_box)
-        layout.add_widget(scroll)
-        back_btn = FButton(text=self.tr("back"), size_hint_y=None, height=50, on_release=self.go_back)
+        self.records_view.add_widget(rec_box)
+        self.records_view.bind(scroll_y=self._on_records_scroll)
+        layout.add_widget(self.records_view)
+        back_btn = self.tr_bind(FButton(size_hint_y=None, height=50, on_release=self.go_back), "back")
         layout.add_widget(back_btn)
-        self.root_layout.add_widget(layout)
+        return layout
+
+    def _record_row(self, rec):
+        ex_text = ", ".join(f"{k}:{v}" for k, v in rec.items() if k not in ["date", "routine"])
+        text = f"{rec['date']} - {rec['routine']} - {ex_text}"
+        return {"text": text, "record": rec}
+
+    @instrument("records.filter")
+    def apply_record_filter(self, instance=None):
+        query = {name: field.text.strip() for name, field in self.record_filters.items() if field.text.strip()}
+        self._record_query = query or None
+        self.records_view.data = []
+        self.records_view.scroll_y = 1
+        try:
+            self.load_record_page()
+        except ValueError as e:
+            # 날짜 형식이 틀린 경우
+            Logger.warning(f"Records: {e}")
+            self._record_query = None
+
+    @instrument("records.page")
+    def load_record_page(self):
+        data = self.records_view.data
+        if self._record_query is not None:
+            # 필터가 있으면 색인에서 조건에 맞는 기록만 한 페이지씩
+            self._search_record_page(self._record_query, len(data) + RECORD_PAGE_SIZE)
+            return
+        if self.history.fully_loaded and len(data) >= len(self.history.loaded):
+            return
+        rows = [self._record_row(rec) for rec in self.history.window(len(data), RECORD_PAGE_SIZE)]
+        if rows:
+            data.extend(rows)
+
+    def _search_record_page(self, query, target):
+        """필터 결과를 target 줄까지 채운다 — 색인은 읽어 둔 기록만 가리키므로
+        모자라면 한 프레임에 조금씩 더 읽으면서 다음 프레임에 이어서 찾는다"""
+        data = self.records_view.data
+        if query is not self._record_query or len(data) >= target:
+            return
+        page, complete = self.history.search(query, offset=len(data), limit=target - len(data))
+        data.extend([self._record_row(rec) for rec in page.records])
+        if len(data) < target and not complete:
+            Clock.schedule_once(lambda dt: self._continue_record_search(query, target), 0)
+
+    def _continue_record_search(self, query, target):
+        # 그 사이 기록 화면을 떠났으면 그만둔다 (필터가 바뀐 것은 _search_record_page 가 확인)
+        if self.screen_manager.current == "records":
+            self._search_record_page(query, target)
+
+    def _on_records_scroll(self, view, scroll_y):
+        # 맨 아래 근처까지 내려오면 다음 페이지
+        if scroll_y <= 0.05:
+            self.load_record_page()
 
     def delete_record(self, index):
-        if 0 <= index < len(self.records):
-            self.records.pop(index)
-            self.save_records()
-            self.show_records()
+        data = self.records_view.data
+        if 0 <= index < len(data):
+            rec = data.pop(index)["record"]
+            self.history.remove(rec)
+            self._update_aggregates(removed=rec)
+
+    # -------------------- IMPORT / EXPORT --------------------
+    def show_data_popup(self, instance):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        path_input = Factory.FTextInput(text=get_data_path("ecofit_export.csv"), multiline=False, size_hint_y=None, height=40)
+        layout.add_widget(path_input)
+        status = FLabel(size_hint_y=None, height=30)
+        grid = Factory.GridLayout(cols=2, spacing=5, size_hint_y=None, height=105)
+        actions = [("export_routines", self.export_routines), ("export_records", self.export_records),
+                   ("import_routines", self.import_routines), ("import_records", self.import_records)]
+        for key, action in actions:
+            btn = self.tr_bind(FButton(), key)
+            btn.bind(on_release=lambda x, a=action: a(path_input.text.strip(), status))
+            grid.add_widget(btn)
+        layout.add_widget(grid)
+        layout.add_widget(status)
+        close_btn = self.tr_bind(FButton(size_hint_y=None, height=50), "back")
+        layout.add_widget(close_btn)
+        popup = Factory.Popup(title=self.tr("data_transfer"), content=layout, size_hint=(0.8, 0.6), auto_dismiss=False, title_font=FONT_NAME)
+        close_btn.bind(on_release=popup.dismiss)
+        popup.open()
+
+    def run_batches(self, steps, on_step, on_done):
+        """제너레이터를 한 프레임에 한 묶음씩 진행 — 큰 파일을 다뤄도 화면이 멈추지 않는다"""
+        def pump(dt):
+            try:
+                on_step(next(steps))
+            except StopIteration:
+                on_done(None)
+                return False
+            except (OSError, ValueError) as e:
+                on_done(e)
+                return False
+        Clock.schedule_interval(pump, 0)
+
+    def _finish_transfer(self, status, error, text=None):
+        if error is not None:
+            Logger.warning(f"DataTransfer: {error}")
+            status.text = str(error)
+        elif text is not None:
+            status.text = text
+
+    def export_routines(self, path, status):
+        done = [0]
+        self.run_batches(export_routines(path, self.routines), lambda n: done.__setitem__(0, n),
+                         lambda err: self._finish_transfer(status, err, self.catalog.template("export_result").format(count=done[0])))
+
+    def export_records(self, path, status):
+        done = [0]
+        self.run_batches(export_records(path, self.store.iter_records()), lambda n: done.__setitem__(0, n),
+                         lambda err: self._finish_transfer(status, err, self.catalog.template("export_result").format(count=done[0])))
+
+    def _import_progress(self, status, totals, batch):
+        totals[0] += len(batch.items)
+        totals[1] += batch.duplicates
+        totals[2] += len(batch.errors)
+        for line_no, reason in batch.errors[:3]:
+            Logger.warning(f"DataTransfer: line {line_no}: {reason}")
+        status.text = self.catalog.template("import_result").format(added=totals[0], duplicates=totals[1], errors=totals[2])
+
+    def import_routines(self, path, status):
+        totals = [0, 0, 0]
+
+        def apply(batch):
+            for name, data in batch.items:
+                self.routines[name] = data
+                self.store.add_routine(name, data)
+            self._import_progress(status, totals, batch)
+
+        def done(err):
+            self.refresh_routine_list()
+            self._finish_transfer(status, err)
+
+        self.run_batches(import_routines(read_routines(path), set(self.routines)), apply, done)
+
+    def import_records(self, path, status):
+        totals = [0, 0, 0]
+
+        def batches():
+            # 이미 있는 (날짜, 루틴) 은 건너뛴다 — 키 모음도 한 프레임에 한 묶음씩 만들고,
+            # 기록은 최신순 구간 읽기로 지나가기만 한다 (전체 기록/보관 파일을 메모리에 붙잡아 두지 않음)
+            known = set()
+            for chunk in batched(self.store.iter_records(newest_first=True), BATCH_SIZE):
+                known.update(record_key(rec) for rec in chunk)
+                yield ImportBatch([], 0, [])
+            yield from import_records(read_records(path), known)
+
+        def apply(batch):
+            # 묶음 하나 = 저널 쓰기 한 번 / 트랜잭션 하나
+            self.history.add_many(batch.items)
+            if self.aggregates is not None and batch.items:
+                for rec in batch.items:
+                    self.aggregates.add(rec)
+                self._save_aggregates()
+            self._import_progress(status, totals, batch)
+
+        self.run_batches(batches(), apply, lambda err: self._finish_transfer(status, err))
 
     # -------------------- FINISH --------------------
     def show_finish_screen(self):
-        self.root_layout.clear_widgets()
-        self.root_layout.add_widget(FLabel(text=self.tr("finish_msg"), font_size=30))
-        back_btn = FButton(text=self.tr("back_to_routine"), size_hint_y=None, height=50, on_release=lambda x: self.open_routine(self.current_routine))
-        self.root_layout.add_widget(back_btn)
+        self.show_screen("finish")
+
+    def _build_finish_screen(self):
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        layout.add_widget(self.tr_bind(FLabel(font_size=30), "finish_msg"))
+        back_btn = self.tr_bind(FButton(size_hint_y=None, height=50, on_release=lambda x: self.open_routine(self.current_routine) if self.current_routine in self.routines else self.go_back()), "back_to_routine")
+        layout.add_widget(back_btn)
+        return layout
 
     # -------------------- SAVE / LOAD --------------------
+    @instrument("save_data")
     def save_data(self):
-        with open(SAVE_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.routines, f, ensure_ascii=False, indent=4)
+        self.store.save_routines(self.routines)
 
     def load_data(self):
-        if os.path.exists(SAVE_FILE):
-            with open(SAVE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
-
-    def save_records(self):
-        with open(RECORD_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.records, f, ensure_ascii=False, indent=4)
+        return self.store.load_routines()
 
+    @instrument("load_records")
     def load_records(self):
-        if os.path.exists(RECORD_FILE):
-            with open(RECORD_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
+        return self.store.load_records()
+
+    # -------------------- AGGREGATES --------------------
+    def aggregate_index(self):
+        """운동/루틴별 집계 — 저장된 것이 오래됐으면 처음 필요할 때 원본 기록으로 다시 만든다"""
+        if self.aggregates is None:
+            self.aggregates = AggregateIndex(resolver=self._find_last_date)
+            # 보관된 해는 manifest 의 요약을 더하고, 기록은 샤드에 남은 것만 읽는다
+            self.aggregates.rebuild(self.store.iter_records(newest_first=True, archived=False),
+                                    self.store.archive_summaries())
+            self._save_aggregates()
+        return self.aggregates
+
+    def _update_aggregates(self, added=None, removed=None):
+        if self.aggregates is None:
+            return  # 다음에 필요할 때 통째로 다시 만든다
+        if added is not None:
+            self.aggregates.add(added)
+        if removed is not None:
+            self.aggregates.remove(removed)
+        self._save_aggregates()
+
+    def _save_aggregates(self):
+        self.aggregates.stamp = self.store.records_header().get("stamp")
+        index, path = self.aggregates, self.files.aggregates
+        self.save_worker.schedule(path, lambda: index.save(path))
+
+    def _find_last_date(self, kind, name):
+        """마지막 기록이 지워졌을 때 — 최신 기록부터 찾아본다"""
+        for rec in self.history.iter_newest():
+            if (rec.get("routine") == name) if kind != KIND_EXERCISE else (name in rec):
+                return rec.get("date")
+        return None
+
+    # -------------------- ANALYTICS --------------------
+    def analytics(self):
+        """운동량 분석 엔진 — 새 기록이 생기거나 지워지기 전까지는 캐시된 것을 돌려준다"""
+        if self._analytics_version != self.history.version:
+            from analytics import TrainingAnalytics
+            self._analytics = TrainingAnalytics.from_compact(self.history.all())
+            self._analytics_version = self.history.version
+        return self._analytics
+
+    # -------------------- PERF OVERLAY --------------------
+    # F12: 계측을 켜고 오버레이(동작별 p50/p99, 프레임 시간) 표시/숨기기
+    # F11: 지금까지의 요약을 데이터 폴더의 ecofit_perf.json 으로 저장 (계측이 켜져 있으면 종료할 때도 저장)
+    def _bind_perf_keys(self):
+        from kivy.core.window import Window
+        Window.bind(on_key_down=self._on_perf_key)
+        if PERF.enabled:
+            self._start_frame_sampler()
+
+    def _on_perf_key(self, window, key, scancode, codepoint, modifiers):
+        if key == 293:      # F12
+            self.toggle_perf_overlay()
+            return True
+        if key == 292:      # F11
+            self.dump_perf()
+            return True
+        return False
+
+    def _start_frame_sampler(self):
+        if self._frame_event is None:
+            # 간격 0 = 매 프레임, dt 가 곧 프레임 시간
+            self._frame_event = Clock.schedule_interval(lambda dt: PERF.record("frame", dt), 0)
+
+    def toggle_perf_overlay(self):
+        from kivy.core.window import Window
+        if self._perf_overlay is not None:
+            overlay, event = self._perf_overlay
+            event.cancel()
+            Window.remove_widget(overlay)
+            self._perf_overlay = None
+            return
+        PERF.enabled = True
+        self._start_frame_sampler()
+        from kivy.graphics import Color, Rectangle
+        overlay = Label(font_name="data/fonts/RobotoMono-Regular.ttf", font_size=12, color=(1, 1, 0.6, 1),
+                        size_hint=(None, None), halign="left", valign="top", padding=(6, 6))
+        overlay.bind(texture_size=overlay.setter("size"))
+        with overlay.canvas.before:
+            Color(0, 0, 0, 0.7)
+            background = Rectangle()
+        overlay.bind(pos=lambda w, pos: setattr(background, "pos", pos),
+                     size=lambda w, size: setattr(background, "size", size))
+        overlay.text = PERF.format_table(limit=15)
+        event = Clock.schedule_interval(lambda dt: setattr(overlay, "text", PERF.format_table(limit=15)), 1)
+        Window.add_widget(overlay)
+        self._perf_overlay = (overlay, event)
+
+    def dump_perf(self):
+        path = PERF.dump(get_data_path(DUMP_NAME))
+        Logger.info(f"Perf: summary written to {path}")
+        return path
+
+    def on_stop(self):
+        # 백그라운드에 남아 있는 저장을 모두 끝낸 뒤 종료
+        if not hasattr(self, "checkpoint"):
+            return  # 데이터를 읽기 전에 닫혔다
+        if PERF.enabled and PERF.buffers:
+            self.dump_perf()
+        self.store.close()
+        self.save_worker.stop()
+        self.checkpoint.close()
 if __name__ == "__main__":
     WorkoutApp().run()
@@ -0,0 +1,43 @@
+import os
+import sys
+from collections import namedtuple
+
+# -------------------- 파일 경로 --------------------
+# 앱(main.py)과 명령줄 도구(cli.py)가 같이 쓰는 경로 규칙 — Kivy 를 불러오지 않는다.
+
+
+def resource_path(relative_path):
+    """EXE와 같은 위치에서 파일 참조"""
+    base_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+    return os.path.join(base_dir, relative_path)
+
+def get_data_path(filename):
+    """PyInstaller exe에서도 안전하게 저장 가능한 경로 반환"""
+    if hasattr(sys, '_MEIPASS'):
+        # AppData/Local/Ecofit 폴더에 저장
+        base_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "Ecofit")
+        if not os.path.exists(base_dir):
+            os.makedirs(base_dir, exist_ok=True)
+        return os.path.join(base_dir, filename)
+    else:
+        # 개발 단계에서는 현재 폴더 사용
+        return filename
+
+# 데이터 폴더 안의 파일 이름
+SAVE_NAME = "workout_data.json"
+RECORD_NAME = "workout_records.json"      # 예전 형식 (최초 실행 시 저널로 가져옴)
+JOURNAL_NAME = "workout_records.jsonl"     # 예전 단일 저널 (최초 실행 시 월별 샤드로 옮김)
+SHARD_DIR_NAME = "workout_records"         # 월별 기록 샤드 + manifest.json
+DB_NAME = "workout.db"
+AGG_NAME = "workout_aggregates.json"
+SESSION_NAME = "workout_session.ckpt"     # 진행 중인 운동 (끝나면 삭제)
+
+DataFiles = namedtuple("DataFiles", "data records journal shards db aggregates session")
+
+
+def data_files(base_dir=None):
+    """데이터 폴더의 파일 경로 모음 (base_dir 가 없으면 앱이 쓰는 위치)"""
+    names = (SAVE_NAME, RECORD_NAME, JOURNAL_NAME, SHARD_DIR_NAME, DB_NAME, AGG_NAME, SESSION_NAME)
+    if base_dir is None:
+        return DataFiles(*(get_data_path(n) for n in names))
+    return DataFiles(*(os.path.join(base_dir, n) for n in names))
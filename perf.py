@@ -0,0 +1,151 @@
+import json
+import os
+import time
+from array import array
+from datetime import datetime
+from functools import wraps
+
+# -------------------- 성능 계측 --------------------
+# 저장, 목록 만들기, 화면 전환, 타이머 콜백처럼 자주 도는 경로의 소요 시간을
+# 이름별 고정 크기 링 버퍼(최근 capacity 개)에 ms 로 남기고, p50/p99 로 요약한다.
+#   with timed("storage.routines.dumps"): ...        # 코드 구간
+#   @instrument("records.page")                      # 함수 전체
+# 꺼져 있으면(기본) 플래그 하나만 확인하고 바로 원래 코드를 실행한다.
+# ECOFIT_PERF=1 로 켜고 시작하거나, 앱에서 F12(오버레이)로 켠다.
+# 저장 스레드에서도 기록하지만 잠금은 쓰지 않는다 — 드물게 표본 하나가 덮어써질 뿐 요약에는 영향이 없다.
+# Kivy 를 불러오지 않는다 (벤치마크/명령줄에서도 사용).
+
+DEFAULT_CAPACITY = 512
+DUMP_NAME = "ecofit_perf.json"
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 q 백분위 (선형 보간)"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class RingBuffer:
+    """최근 capacity 개의 값만 남기는 float 배열"""
+    __slots__ = ("values", "count")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.values = array("d", bytes(8 * capacity))
+        self.count = 0      # 지금까지 들어온 수 (덮어쓴 것 포함)
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def samples(self):
+        """남아 있는 값 (순서 무관)"""
+        return self.values[:min(self.count, len(self.values))].tolist()
+
+
+class _Timed:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimed()
+
+
+class PerfRecorder:
+    """이름별 소요 시간 링 버퍼 모음"""
+
+    def __init__(self, enabled=False, capacity=DEFAULT_CAPACITY):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.buffers = {}
+
+    def record(self, name, seconds):
+        buf = self.buffers.get(name)
+        if buf is None:
+            buf = self.buffers[name] = RingBuffer(self.capacity)
+        buf.add(seconds * 1000)
+
+    def timed(self, name):
+        """with 구간 시간 재기 (꺼져 있으면 아무것도 하지 않는 객체)"""
+        if not self.enabled:
+            return _NULL
+        return _Timed(self, name)
+
+    def instrument(self, name):
+        """함수 전체 시간을 name 으로 재는 데코레이터 (켜고 끄는 것은 부를 때마다 확인)"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        self.buffers = {}
+
+    # ---------- 요약 ----------
+    def stats(self):
+        """이름 -> {count, p50_ms, p99_ms, max_ms} (최근 표본 기준)"""
+        result = {}
+        for name in sorted(self.buffers):
+            buf = self.buffers[name]
+            values = sorted(buf.samples())
+            if not values:
+                continue
+            result[name] = {"count": buf.count, "p50_ms": round(percentile(values, 50), 3),
+                            "p99_ms": round(percentile(values, 99), 3), "max_ms": round(values[-1], 3)}
+        return result
+
+    def format_table(self, limit=None):
+        """오버레이/로그용 표 — p99 가 큰 순서"""
+        rows = sorted(self.stats().items(), key=lambda item: item[1]["p99_ms"], reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        lines = [f"{'operation':24s} {'n':>6s} {'p50':>8s} {'p99':>8s} {'max':>8s}"]
+        for name, s in rows:
+            lines.append(f"{name[:24]:24s} {s['count']:6d} {s['p50_ms']:8.2f} {s['p99_ms']:8.2f} {s['max_ms']:8.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """요약을 JSON 파일로 (현장에서 느린 기기 진단용)"""
+        data = {"date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "capacity": self.capacity,
+                "stats": self.stats()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# 앱 전체가 같이 쓰는 기록기
+PERF = PerfRecorder(enabled=os.environ.get("ECOFIT_PERF") == "1")
+timed = PERF.timed
+instrument = PERF.instrument
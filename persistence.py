@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import time
+
+from perf import timed
+
+# -------------------- 백그라운드 저장 --------------------
+# UI 스레드는 "저장해 달라"는 표시만 남기고 바로 돌아온다.
+# 짧은 시간 안에 몰린 변경은 한 번의 쓰기로 합쳐지고,
+# 파일은 임시 파일에 다 쓴 뒤 교체하므로 중간에 꺼져도 잘리지 않는다.
+
+
+def atomic_write_text(path, text):
+    """임시 파일에 쓴 뒤 os.replace 로 교체"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SaveWorker(threading.Thread):
+    """변경을 모아서 잠시 뒤 한 번에 저장하는 스레드"""
+
+    def __init__(self, delay=0.3, max_delay=2.0):
+        super().__init__(name="ecofit-save", daemon=True)
+        self.delay = delay          # 마지막 변경 후 이만큼 조용하면 저장
+        self.max_delay = max_delay  # 변경이 계속 이어져도 이 시간 안에는 저장
+        self.errors = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._jobs = {}             # key -> [write, due, deadline]
+        self._stopping = False
+
+    def schedule(self, key, write):
+        """key 별로 마지막 요청만 남겨서 나중에 write() 실행"""
+        now = time.monotonic()
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                self._jobs[key] = [write, now + self.delay, now + self.max_delay]
+            else:
+                job[0] = write
+                job[1] = min(now + self.delay, job[2])
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = time.monotonic()
+                    due = [k for k, job in self._jobs.items() if job[1] <= now]
+                    if due:
+                        break
+                    timeout = min((job[1] for job in self._jobs.values()), default=now + 3600) - now
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+                ready = [self._jobs.pop(k)[0] for k in due]
+            self._run_jobs(ready)
+
+    def _run_jobs(self, writes):
+        with self._io_lock:
+            for write in writes:
+                try:
+                    with timed("save_worker.write"):
+                        write()
+                except Exception as e:
+                    self.errors.append(e)
+
+    def flush(self):
+        """남아 있는 저장을 지금 바로 실행 (호출한 스레드에서)"""
+        with self._cond:
+            writes = [job[0] for job in self._jobs.values()]
+            self._jobs.clear()
+        self._run_jobs(writes)
+
+    def stop(self):
+        self.flush()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout=5)
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+from datetime import datetime
+
+from paths import data_files
+
+# -------------------- 사용자 프로필 --------------------
+# 체육관 공용 태블릿처럼 여러 사람이 한 설치를 쓸 때, 사람마다 데이터 폴더를 따로 둔다.
+#   <데이터 위치>/profiles.json        : 프로필 목록 + 마지막으로 쓴 프로필
+#   <데이터 위치>/                      : 기본 프로필 (예전 설치의 데이터 그대로)
+#   <데이터 위치>/profiles/<id>/        : 그 밖의 프로필 (루틴, 월별 기록 샤드, 집계, 진행 중인 운동)
+# 프로필을 바꾸면 그 프로필의 폴더만 열기 때문에 읽기/저장 비용은 그 사람의 기록에만 달려 있다.
+# Kivy 를 불러오지 않는다 (cli.py 에서도 사용).
+
+PROFILES_NAME = "profiles.json"
+PROFILE_DIR = "profiles"
+DEFAULT_PROFILE = "default"
+
+
+def _slug(name):
+    slug = re.sub(r"[^0-9a-z_-]+", "-", name.strip().lower()).strip("-")
+    return slug[:32] or "profile"
+
+
+class ProfileManager:
+    """프로필 목록과 프로필별 데이터 폴더"""
+
+    def __init__(self, root=""):
+        self.root = root    # 데이터 위치 ("" 이면 현재 폴더)
+        self.path = os.path.join(root, PROFILES_NAME)
+        self.profiles = {DEFAULT_PROFILE: {"name": DEFAULT_PROFILE}}    # id -> {name, created}
+        self.current = DEFAULT_PROFILE
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if not isinstance(data, dict):
+            return
+        profiles = data.get("profiles")
+        if isinstance(profiles, dict):
+            self.profiles.update((pid, info) for pid, info in profiles.items() if isinstance(info, dict))
+        if data.get("current") in self.profiles:
+            self.current = data["current"]
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"current": self.current, "profiles": self.profiles}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # ---------- 폴더 ----------
+    def data_dir(self, pid=None):
+        pid = pid or self.current
+        if pid == DEFAULT_PROFILE:
+            return self.root
+        return os.path.join(self.root, PROFILE_DIR, pid)
+
+    def files(self, pid=None):
+        """프로필의 데이터 파일 경로 (paths.DataFiles)"""
+        return data_files(self.data_dir(pid))
+
+    # ---------- 목록 ----------
+    def name(self, pid=None):
+        return self.profiles.get(pid or self.current, {}).get("name", pid)
+
+    def items(self):
+        """(id, 이름) — 기본 프로필이 먼저, 나머지는 만든 순서"""
+        return [(pid, info.get("name", pid)) for pid, info in self.profiles.items()]
+
+    def find(self, name):
+        """이름 또는 id 로 프로필 찾기 (없으면 None)"""
+        if name in self.profiles:
+            return name
+        for pid, info in self.profiles.items():
+            if info.get("name") == name:
+                return pid
+        return None
+
+    def create(self, name):
+        """새 프로필 (같은 이름이 있으면 그 프로필) -> id"""
+        name = name.strip()
+        if not name:
+            raise ValueError("empty profile name")
+        existing = self.find(name)
+        if existing is not None:
+            return existing
+        base = pid = _slug(name)
+        n = 2
+        while pid in self.profiles or os.path.exists(os.path.join(self.root, PROFILE_DIR, pid)):
+            pid = f"{base}-{n}"
+            n += 1
+        os.makedirs(self.data_dir(pid), exist_ok=True)
+        self.profiles[pid] = {"name": name, "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        self.save()
+        return pid
+
+    def switch(self, pid):
+        if pid not in self.profiles:
+            raise KeyError(pid)
+        self.current = pid
+        self.save()
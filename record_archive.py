@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+from datetime import date
+
+from aggregates import AggregateIndex
+
+# -------------------- 오래된 기록 보관 (연도별) --------------------
+# 보관 기간(기본 12개월)이 지난 해의 기록은 월별 샤드에서 빼서 해마다 압축 파일 하나로 옮긴다:
+#   <샤드 폴더>/archive/2019.jsonl.gz    (오래된 순서의 JSON Lines, gzip)
+#   <샤드 폴더>/archive/summary.json     (해마다 요약: 기록 수, 처음/마지막 날짜, 운동/루틴별 집계)
+# 통계/집계는 보관 파일을 열지 않고 요약만 더하면 된다.
+# 요약은 크기가 커서(운동 수 × 해) 보관 파일이 바뀔 때만 쓴다 — 기록을 추가/삭제할 때마다 쓰는
+# manifest.json 에는 해마다 기록 수, 최신 날짜, 파일 크기만 둔다.
+# 보관 파일은 기록 화면/분석이 그 해까지 거슬러 올라갈 때 처음 한 번 풀어서 읽는다.
+# 한 해는 통째로 보관하거나 통째로 샤드에 둔다 (올해와 보관 기간에 걸친 해는 샤드에 남는다) —
+# 그래서 샤드에 남는 기록은 길어야 보관 기간 + 11개월이다.
+# Kivy 를 불러오지 않는다 (cli.py 에서도 사용).
+
+ARCHIVE_DIR = "archive"
+ARCHIVE_EXT = ".jsonl.gz"
+SUMMARY_NAME = "summary.json"
+DEFAULT_ARCHIVE_MONTHS = 12
+
+
+def archive_months(value=None):
+    """보관 기간(개월) — ECOFIT_ARCHIVE_MONTHS, 0 이면 보관하지 않는다"""
+    if value is None:
+        value = os.environ.get("ECOFIT_ARCHIVE_MONTHS", DEFAULT_ARCHIVE_MONTHS)
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return DEFAULT_ARCHIVE_MONTHS
+
+
+def archive_before(months, today=None):
+    """이 해보다 이전 해는 통째로 보관 기간이 지났다 (months 가 0 이면 None)"""
+    if not months:
+        return None
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - months
+    return f"{month_index // 12:04d}"
+
+
+def summarize(records):
+    """한 해의 요약 — 기록 수, 처음/마지막 날짜, 운동/루틴별 집계 (aggregates.Stats 형식)"""
+    index = AggregateIndex()
+    first = latest = None
+    count = 0
+    for rec in records:
+        index.add(rec)
+        count += 1
+        d = rec.get("date")
+        if isinstance(d, str):
+            if first is None or d < first:
+                first = d
+            if latest is None or d > latest:
+                latest = d
+    data = index.to_json()
+    return {"count": count, "first": first, "latest": latest,
+            "exercises": data["exercises"], "routines": data["routines"]}
+
+
+def write_archive(path, records):
+    """기록을 압축 파일로 새로 쓴다 (임시 파일에 쓰고 바꿔치기) -> 파일 크기"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_archive(path):
+    """보관 파일의 기록 (오래된 순서) — 깨진 줄은 건너뛴다"""
+    records = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    records.append(rec)
+    except (OSError, EOFError):
+        # 끝이 잘린 압축 파일 — 읽힌 데까지만
+        pass
+    return records
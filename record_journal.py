@@ -0,0 +1,282 @@
+import json
+import os
+
+from perf import instrument
+
+# -------------------- 운동 기록 저널 --------------------
+# workout_records.jsonl 한 줄 = 하나의 작업
+#   {"op": "add", "rec": {...기록...}}
+#   {"op": "del", "key": [date, routine]}   (삭제 툼스톤: 그 시점까지 같은 키의 가장 최근 기록을 지운다)
+# 기록 하나를 저장하는 비용은 전체 기록 수와 상관없이 한 줄 추가뿐이다.
+# workout_records.jsonl.head 에는 기록 수/최신 날짜 같은 작은 요약을 따로 둬서
+# 앱 시작 시 저널 전체를 읽지 않아도 되게 한다.
+
+OP_ADD = "add"
+OP_DEL = "del"
+
+REVERSE_CHUNK = 64 * 1024
+
+
+def record_key(rec):
+    """기록을 구분하는 키 (날짜, 루틴)"""
+    return rec.get("date"), rec.get("routine")
+
+
+def _dumps_line(entry):
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class RecordJournal:
+    """추가 전용 JSON Lines 기록 저장소 (툼스톤 삭제 + 압축)"""
+
+    def __init__(self, path, legacy_path=None, compact_ratio=0.5, read_only=False):
+        self.path = path
+        self.head_path = path + ".head"
+        self.legacy_path = legacy_path      # 예전 workout_records.json (최초 1회 가져오기)
+        self.compact_ratio = compact_ratio  # 쓰레기 줄 / 살아있는 기록 비율이 넘으면 압축
+        self.read_only = read_only          # 읽기만 (압축/요약 파일 쓰기를 하지 않는다 — CLI 조회 명령)
+        self.live = 0
+        self.garbage = 0
+        self.latest = None                  # 살아있는 기록 중 가장 늦은 날짜 (모르면 None)
+        self.generation = 0                 # 압축으로 파일이 바뀔 때마다 증가
+        self.size = 0                       # 저널 파일 크기 (바이트) — 기록이 바뀌었는지 확인하는 도장으로도 쓴다
+        self._head_ready = False
+        self._needs_newline = False
+
+    # ---------- 읽기 ----------
+    def load(self):
+        """저널을 재생해서 살아있는 기록 리스트를 반환"""
+        if not os.path.exists(self.path):
+            records = self._load_legacy()
+            if not self.read_only:
+                self.compact(records)
+            return records
+
+        records = []
+        positions = {}  # key -> records 안의 위치 목록
+        garbage = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            last_line = ""
+            for line in f:
+                last_line = line
+                entry = self._parse(line)
+                if entry is None:
+                    garbage += 1
+                    continue
+                if entry.get("op") == OP_DEL:
+                    garbage += 1
+                    key = tuple(entry.get("key") or (None, None))
+                    slots = positions.get(key)
+                    if slots:
+                        records[slots.pop()] = None
+                        garbage += 1
+                else:
+                    rec = entry.get("rec")
+                    if not isinstance(rec, dict):
+                        garbage += 1
+                        continue
+                    positions.setdefault(record_key(rec), []).append(len(records))
+                    records.append(rec)
+            # 마지막 줄이 중간에 끊겼으면 다음 추가 전에 줄바꿈부터 넣는다
+            self._needs_newline = bool(last_line) and not last_line.endswith("\n")
+
+        records = [r for r in records if r is not None]
+        self.size = os.path.getsize(self.path)
+        self._head_ready = True
+        self.live = len(records)
+        self.garbage = garbage
+        self.latest = max((r.get("date", "") for r in records), default=None)
+        if self.garbage and self.garbage > self.live * self.compact_ratio and not self.read_only:
+            self.compact(records)
+        else:
+            self._write_head()
+        return records
+
+    def ensure(self):
+        """저널 파일이 없으면 예전 기록 파일에서 만들어 둔다"""
+        if not os.path.exists(self.path):
+            self.load()
+
+    def header(self):
+        """시작 시 읽는 작은 요약 — 기록 수, 최신 날짜, 도장(stamp)"""
+        if not self._head_ready:
+            self.ensure()
+            head = self._read_head()
+            size = os.path.getsize(self.path)
+            if head is None or head.get("size") != size:
+                # 요약이 없거나 저널과 맞지 않으면 한 번 전체를 읽어 다시 만든다
+                self.load()
+            else:
+                self.live = head.get("count", 0)
+                self.garbage = head.get("garbage", 0)
+                self.latest = head.get("latest")
+                self.size = size
+                self._needs_newline = size > 0 and not self._ends_with_newline()
+                self._head_ready = True
+        if self.latest is None and self.live:
+            newest = next(self.iter_reverse(), None)
+            self.latest = newest.get("date") if newest else None
+        return {"count": self.live, "latest": self.latest, "stamp": self.size}
+
+    def iter_reverse(self):
+        """최신 기록부터 하나씩 반환 — 파일 끝에서부터 필요한 만큼만 읽는다"""
+        self.ensure()
+        generation = self.generation
+        pending = {}  # 아직 짝을 못 찾은 툼스톤 수 (키별)
+        for line in self._reverse_lines():
+            if generation != self.generation:
+                # 압축으로 파일이 바뀌었으면 위치가 맞지 않으므로 멈춘다
+                return
+            entry = self._parse(line)
+            if entry is None:
+                continue
+            if entry.get("op") == OP_DEL:
+                key = tuple(entry.get("key") or (None, None))
+                pending[key] = pending.get(key, 0) + 1
+                continue
+            rec = entry.get("rec")
+            if not isinstance(rec, dict):
+                continue
+            key = record_key(rec)
+            if pending.get(key):
+                pending[key] -= 1
+                continue
+            yield rec
+
+    def _reverse_lines(self):
+        # 한 덩어리씩 파일을 열고 닫아서 압축(파일 교체)을 막지 않는다
+        pos = os.path.getsize(self.path)
+        tail = b""
+        while pos > 0:
+            step = min(REVERSE_CHUNK, pos)
+            pos -= step
+            with open(self.path, "rb") as f:
+                f.seek(pos)
+                buf = f.read(step) + tail
+            lines = buf.split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+        if tail:
+            yield tail.decode("utf-8", errors="replace")
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _parse(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # 비정상 종료로 잘린 줄은 무시
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def _load_legacy(self):
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                return []
+            return [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+        return []
+
+    # ---------- 요약 파일 ----------
+    def _read_head(self):
+        try:
+            with open(self.head_path, "r", encoding="utf-8") as f:
+                head = json.load(f)
+        except Exception:
+            return None
+        return head if isinstance(head, dict) else None
+
+    def _write_head(self):
+        if self.read_only:
+            return
+        head = {
+            "count": self.live,
+            "garbage": self.garbage,
+            "latest": self.latest,
+            "size": self.size,
+        }
+        tmp_path = self.head_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(head, f, ensure_ascii=False)
+            os.replace(tmp_path, self.head_path)
+        except OSError:
+            # 요약은 없어도 다음 시작 때 다시 만들 수 있다
+            pass
+
+    # ---------- 쓰기 ----------
+    def _append(self, entry):
+        self._write_lines(_dumps_line(entry))
+
+    def _write_lines(self, line):
+        if self._needs_newline:
+            line = "\n" + line
+            self._needs_newline = False
+        if not self._head_ready:
+            self.header()
+        with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.size += len(line.encode("utf-8"))
+
+    @instrument("journal.append")
+    def append(self, rec):
+        """기록 하나 추가 — O(1)"""
+        self._append({"op": OP_ADD, "rec": rec})
+        self.live += 1
+        date = rec.get("date")
+        if date and (self.latest is None or date > self.latest):
+            self.latest = date
+        self._write_head()
+
+    def append_many(self, records):
+        """기록 여러 개를 한 번의 쓰기 + fsync 로 추가 (가져오기 용)"""
+        if not records:
+            return
+        self._write_lines("".join(_dumps_line({"op": OP_ADD, "rec": rec}) for rec in records))
+        self.live += len(records)
+        newest = max((r.get("date") or "" for r in records), default="")
+        if newest and (self.latest is None or newest > self.latest):
+            self.latest = newest
+        self._write_head()
+
+    @instrument("journal.delete")
+    def delete(self, rec):
+        """기록 삭제 — 툼스톤 한 줄 추가"""
+        self._append({"op": OP_DEL, "key": list(record_key(rec))})
+        self.live = max(0, self.live - 1)
+        self.garbage += 2
+        if rec.get("date") == self.latest:
+            self.latest = None  # 다음 header() 때 다시 찾는다
+        self._write_head()
+
+    def compact(self, records):
+        """살아있는 기록만 남기고 저널을 새로 쓴다 (임시 파일 + 교체)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            for rec in records:
+                f.write(_dumps_line({"op": OP_ADD, "rec": rec}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.size = os.path.getsize(self.path)
+        self._head_ready = True
+        self.generation += 1
+        self.live = len(records)
+        self.garbage = 0
+        self.latest = max((r.get("date", "") for r in records), default=None)
+        self._needs_newline = False
+        self._write_head()
@@ -0,0 +1,110 @@
+import math
+import time
+from collections import deque
+
+# -------------------- 휴식 타이머 --------------------
+# 1초마다 숫자를 1씩 빼는 대신, 끝나는 시각(단조 시계 deadline)을 정해 두고
+# 화면 숫자가 바뀌는 순간에 맞춰 다음 콜백을 예약한다.
+# 프레임이 밀려도 휴식이 늘어나지 않고, 콜백이 늦은 정도(지터)는 따로 기록한다.
+
+
+class RestTimer:
+    """deadline 기반 휴식 타이머 (일시정지/계속/건너뛰기)"""
+
+    def __init__(self, clock, on_tick, on_finish, time_func=time.monotonic, jitter_samples=256):
+        self.clock = clock              # schedule_once(callback, delay) -> 취소 가능한 이벤트 (Kivy Clock 등)
+        self.on_tick = on_tick          # 화면 숫자가 바뀔 때 남은 초(int)로 호출
+        self.on_finish = on_finish
+        self.time_func = time_func
+        self.deadline = None
+        self.shown = None               # 마지막으로 보여준 남은 초
+        self.jitter = deque(maxlen=jitter_samples)
+        self._paused_left = None
+        self._event = None
+        self._target = None
+
+    @property
+    def running(self):
+        return self._event is not None
+
+    @property
+    def paused(self):
+        return self._paused_left is not None
+
+    def remaining(self):
+        if self._paused_left is not None:
+            return self._paused_left
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - self.time_func())
+
+    def start(self, seconds):
+        """새 휴식 시작 — 이미 돌고 있던 타이머는 취소 (중복 예약 방지)"""
+        self.cancel()
+        self.deadline = self.time_func() + seconds
+        self.shown = None
+        self._tick(0)
+
+    def pause(self):
+        if self._event is None:
+            return
+        self._paused_left = self.remaining()
+        self._unschedule()
+
+    def resume(self):
+        if self._paused_left is None:
+            return
+        self.deadline = self.time_func() + self._paused_left
+        self._paused_left = None
+        self._tick(0)
+
+    def skip(self):
+        """남은 휴식을 건너뛰고 바로 끝낸다"""
+        if self.deadline is None:
+            return
+        self.cancel()
+        self.on_finish()
+
+    def cancel(self):
+        self._unschedule()
+        self.deadline = None
+        self._paused_left = None
+
+    def _unschedule(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._target = None
+
+    def _tick(self, dt):
+        now = self.time_func()
+        if self._target is not None:
+            self.jitter.append(max(0.0, now - self._target))
+        self._event = None
+        remaining = self.deadline - now
+        left = math.ceil(remaining)
+        if left <= 0:
+            self.deadline = None
+            self._target = None
+            self.on_finish()
+            return
+        if left != self.shown:
+            self.shown = left
+            self.on_tick(left)
+        # 다음으로 표시 숫자가 바뀌는 순간 (남은 시간이 left - 1 이 되는 시각)
+        delay = remaining - (left - 1)
+        self._target = now + delay
+        self._event = self.clock.schedule_once(self._tick, delay)
+
+    def jitter_stats(self):
+        """콜백 지연 통계 (ms)"""
+        samples = sorted(self.jitter)
+        if not samples:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return {
+            "samples": len(samples),
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
@@ -0,0 +1,120 @@
+import json
+import os
+import struct
+
+from session_engine import SessionEngine, STEP_SET, STEP_REST
+
+# -------------------- 진행 중 세션 체크포인트 --------------------
+# 운동 도중 앱이 꺼져도 이어서 할 수 있도록 세트를 끝낼 때마다 기록을 남긴다.
+#   머리말 : MAGIC(4) + 머리말 길이(4) + JSON {routine, mode, exercises, started}
+#   본문   : 세트 하나당 고정 크기 12바이트 (단계 번호, 운동 번호, 횟수)
+# 세트 하나를 남기는 비용은 열어 둔 파일에 write 한 번뿐이고,
+# 디스크 동기화(fsync)는 저장 스레드에 맡겨서 휴식 화면으로 넘어가는 것을 막지 않는다.
+# 세션이 정상적으로 끝나면 파일을 지운다.
+
+MAGIC = b"EFS1"
+_HEAD = struct.Struct("<4sI")
+ENTRY = struct.Struct("<IIi")
+
+
+class SessionCheckpoint:
+    """진행 중인 운동 세션의 세트 단위 저널"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._valid_size = None     # 되살릴 때 확인된 길이 (잘린 꼬리는 이어 쓰기 전에 잘라낸다)
+
+    def begin(self, engine, started):
+        """새 세션 시작 — 이전 체크포인트는 덮어쓴다"""
+        self.discard()
+        header = json.dumps({
+            "routine": engine.routine,
+            "mode": engine.mode,
+            "exercises": list(engine.exercises),
+            "started": started,
+        }, ensure_ascii=False).encode("utf-8")
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+        os.write(self._fd, _HEAD.pack(MAGIC, len(header)) + header)
+
+    def record_set(self, position, ex_index, reps):
+        """끝낸 세트 하나 추가 — 고정 크기 한 번 쓰기"""
+        if self._fd is None:
+            return
+        os.write(self._fd, ENTRY.pack(position, ex_index, reps))
+
+    def sync(self):
+        """디스크에 확실히 내려 쓰기 (저장 스레드에서 호출)"""
+        fd = self._fd
+        if fd is None:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            # 그 사이 세션이 끝나서 닫혔다
+            pass
+
+    def discard(self):
+        """세션이 끝났거나 버릴 때 — 파일 삭제"""
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """앱 종료 — 파일은 남겨서 다음 실행 때 이어 하기"""
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.fsync(fd)
+            os.close(fd)
+
+    # ---------- 이어 하기 ----------
+    def restore(self):
+        """남아 있는 체크포인트로 세션을 되살린다 -> (SessionEngine, started) 또는 None"""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < _HEAD.size:
+            return None
+        magic, head_len = _HEAD.unpack_from(data)
+        body = _HEAD.size + head_len
+        if magic != MAGIC or len(data) < body:
+            return None
+        try:
+            header = json.loads(data[_HEAD.size:body].decode("utf-8"))
+            engine = SessionEngine(header["routine"], header["exercises"], header["mode"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        # 끝이 잘린 마지막 항목은 버린다
+        end = body + (len(data) - body) // ENTRY.size * ENTRY.size
+        valid = body
+        for position, ex_index, reps in ENTRY.iter_unpack(data[body:end]):
+            if position >= len(engine.plan):
+                break
+            step = engine.plan[position]
+            if step.kind != STEP_SET or step.ex_index != ex_index:
+                break
+            engine.position = position
+            engine.complete_set(reps)
+            valid += ENTRY.size
+        self._valid_size = valid
+        if engine.position == 0 and not any(engine.sets_done):
+            return None
+        # 꺼져 있던 동안 휴식은 이미 지났다고 보고 다음 세트부터
+        if engine.step.kind == STEP_REST:
+            engine.finish_rest()
+        return engine, header.get("started")
+
+    def reopen(self):
+        """되살린 세션에 이어서 쓰기"""
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+            if self._valid_size is not None:
+                os.ftruncate(self._fd, self._valid_size)
+            os.lseek(self._fd, 0, os.SEEK_END)
@@ -0,0 +1,135 @@
+import time
+from collections import namedtuple
+
+# -------------------- 운동 세션 엔진 --------------------
+# 루틴을 시작할 때 한 번만 "세트 → 휴식 → 세트 ..." 단계 목록(plan)으로 컴파일하고,
+# 진행은 단계 번호를 다음 칸으로 옮기기만 한다 (단계마다 O(1)).
+# UI 와 상관없이 동작하므로 화면 없이 수천 번 돌려서 테스트/벤치마크할 수 있다.
+
+MODE_SEQUENTIAL = "sequential"
+MODE_CIRCUIT = "circuit"
+
+STEP_SET = "set"
+STEP_REST = "rest"
+STEP_DONE = "done"
+
+# kind: 단계 종류, ex_index: 운동 번호, set_no: 몇 번째 세트(1부터), reps: 목표 횟수, rest: 휴식 초, next: 다음 단계 번호
+Step = namedtuple("Step", "kind ex_index set_no reps rest next")
+
+
+def _set_order(exercises, mode):
+    """(운동 번호, 세트 번호) 순서"""
+    if mode == MODE_CIRCUIT:
+        # 한 바퀴에 아직 세트가 남은 운동만 한 세트씩
+        order = []
+        active = list(range(len(exercises)))
+        s = 0
+        while active:
+            active = [i for i in active if exercises[i]["sets"] > s]
+            order.extend((i, s) for i in active)
+            s += 1
+        return order
+    return [(i, s) for i, ex in enumerate(exercises) for s in range(ex["sets"])]
+
+
+def compile_plan(exercises, mode):
+    """루틴을 바뀌지 않는 단계 목록(tuple)으로 컴파일"""
+    order = _set_order(exercises, mode)
+    steps = []
+    for k, (i, s) in enumerate(order):
+        ex = exercises[i]
+        steps.append(Step(STEP_SET, i, s + 1, ex["reps"], 0, len(steps) + 1))
+        # 마지막 세트 뒤에는 휴식 없이 끝
+        if k < len(order) - 1 and ex["rest"] > 0:
+            steps.append(Step(STEP_REST, i, s + 1, 0, ex["rest"], len(steps) + 1))
+    steps.append(Step(STEP_DONE, -1, 0, 0, 0, len(steps)))
+    return tuple(steps)
+
+
+class SessionEngine:
+    """UI 없이 진행되는 운동 세션 상태 기계"""
+
+    def __init__(self, routine, exercises, mode, time_func=time.monotonic):
+        self.routine = routine
+        # 진행 중에 루틴이 수정돼도 세션은 시작할 때의 내용으로 진행
+        self.exercises = tuple(dict(ex) for ex in exercises)
+        self.mode = mode
+        self.plan = compile_plan(self.exercises, mode)
+        self.position = 0
+        self.reps = [0] * len(self.exercises)        # 운동별 누적 횟수
+        self.sets_done = [0] * len(self.exercises)
+        self.time_func = time_func
+        self._started = time_func()
+        self._paused_at = None
+        self._paused_total = 0.0
+
+    # ---------- 상태 ----------
+    @property
+    def step(self):
+        return self.plan[self.position]
+
+    @property
+    def done(self):
+        return self.plan[self.position].kind == STEP_DONE
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    def next_set(self):
+        """지금 단계 이후 첫 세트 단계 (휴식 화면에서 다음 운동 안내용)"""
+        step = self.step
+        while step.kind == STEP_REST:
+            step = self.plan[step.next]
+        return step if step.kind == STEP_SET else None
+
+    def elapsed(self):
+        """일시정지 시간을 뺀 운동 시간 (초)"""
+        now = self._paused_at if self._paused_at is not None else self.time_func()
+        return now - self._started - self._paused_total
+
+    # ---------- 진행 ----------
+    def complete_set(self, reps):
+        step = self.step
+        if step.kind != STEP_SET:
+            raise ValueError(f"current step is {step.kind}, not a set")
+        self.reps[step.ex_index] += reps
+        self.sets_done[step.ex_index] += 1
+        self.position = step.next
+        return self.step
+
+    def finish_rest(self):
+        step = self.step
+        if step.kind != STEP_REST:
+            raise ValueError(f"current step is {step.kind}, not a rest")
+        # 일시정지는 휴식 중에만 한다 — 멈춘 채로 건너뛰어도 운동 시간은 다시 흐른다
+        self.resume()
+        self.position = step.next
+        return self.step
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self.time_func()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused_total += self.time_func() - self._paused_at
+            self._paused_at = None
+
+    def result(self, date):
+        """기록 저장 형식 {date, routine, <운동 이름>: 총 횟수}"""
+        record = {"date": date, "routine": self.routine}
+        for i, ex in enumerate(self.exercises):
+            record[ex["name"]] = self.reps[i]
+        return record
+
+
+def run_headless(engine, reps_for=None):
+    """화면 없이 세션을 끝까지 진행 (reps_for(step) 가 없으면 목표 횟수대로)"""
+    while not engine.done:
+        step = engine.step
+        if step.kind == STEP_SET:
+            engine.complete_set(reps_for(step) if reps_for else step.reps)
+        else:
+            engine.finish_rest()
+    return engine
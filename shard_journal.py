@@ -0,0 +1,479 @@
+import json
+import os
+
+from persistence import atomic_write_text
+from record_archive import ARCHIVE_DIR, ARCHIVE_EXT, SUMMARY_NAME, read_archive, summarize, write_archive
+from record_journal import RecordJournal, record_key
+
+# -------------------- 월별 기록 샤드 --------------------
+# 기록 저널을 파일 하나 대신 달마다 하나씩 나눠 둔다:  <폴더>/2024-05.jsonl (+ .head)
+# 샤드 하나하나는 RecordJournal 그대로이고, manifest.json 에 샤드별 요약(기록 수, 최신 날짜, 크기)을 모아 둔다.
+#   시작할 때는 manifest 만 읽고 샤드 파일은 크기만 확인한다 (크기가 다른 샤드만 다시 요약).
+#   최신순으로 읽을 때는 최근 달 샤드부터 필요한 만큼만 연다.
+#   기록 추가/삭제는 그 달 샤드에 한 줄 + manifest 만 쓴다 — 쌓인 기록이 많아도 비용이 그대로다.
+# 같은 (날짜, 루틴) 기록은 늘 같은 샤드에 들어가므로 삭제 툼스톤도 그 샤드 안에서만 짝을 찾으면 된다.
+# 날짜를 읽을 수 없는 기록은 "undated" 샤드에 둔다 (가장 오래된 샤드로 취급).
+# 예전 단일 저널(workout_records.jsonl)이나 그 이전 JSON 이 있으면 처음 한 번 샤드로 나눠 옮긴다 (원본은 그대로 둔다).
+# 보관 기간이 지난 해는 archive() 로 연도별 압축 파일에 옮긴다 (record_archive.py).
+#   manifest 의 archives 에는 기록 수/최신 날짜/크기만, 운동별 집계는 archive/summary.json 에 따로 둔다.
+#   샤드 이름 'YYYY-MM' 과 보관 파일 이름 'YYYY' 는 같은 순서로 정렬되므로 둘을 이어서 최신순으로 읽는다.
+#   보관된 해의 기록을 추가/삭제하면 그 해의 보관 파일을 새로 쓴다 (드문 일 — 가져오기, 오래된 기록 삭제).
+#   옮기는 중인 해는 manifest 의 pending 에 (샤드 목록, 보관 파일에 들어갈 기록 수) 로 먼저 적어 둔다 —
+#   보관 파일을 쓰고 샤드를 다 지우기 전에 멈췄으면 다음에 열 때 ensure() 가 마저 지운다 (같은 기록이 두 번 남지 않게).
+# read_only=True 로 열면 (CLI 조회 명령) 폴더에 아무것도 쓰지 않는다 — 옮기기 전이면 예전 저널을 메모리로 읽고,
+# manifest/요약이 파일과 맞지 않아도 메모리에서만 고친다.
+
+MANIFEST_NAME = "manifest.json"
+SHARD_EXT = ".jsonl"
+UNDATED = "undated"
+MANIFEST_VERSION = 2
+
+
+def shard_of(rec):
+    """기록이 들어갈 샤드 이름 ('YYYY-MM' 또는 undated)"""
+    date = rec.get("date")
+    if isinstance(date, str) and len(date) >= 7 and date[4] == "-" and date[:4].isdigit() and date[5:7].isdigit():
+        return date[:7]
+    return UNDATED
+
+
+def _shard_order(name):
+    # undated 가 가장 오래된 쪽
+    return name != UNDATED, name
+
+
+class ShardedJournal:
+    """월별 RecordJournal 묶음 (RecordJournal 과 같은 방식으로 쓴다)"""
+
+    def __init__(self, directory, legacy_journal=None, legacy_path=None, compact_ratio=0.5, read_only=False):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.legacy_journal = legacy_journal    # 예전 단일 저널 (최초 1회 옮기기)
+        self.legacy_path = legacy_path          # 그보다 예전 workout_records.json
+        self.compact_ratio = compact_ratio
+        self.read_only = read_only
+        self.legacy = None      # 읽기 전용으로 열었는데 아직 옮기기 전이면 예전 저널의 기록 (오래된 순서)
+        self.shards = {}        # 이름 -> RecordJournal (열어 본 샤드만)
+        self.summary = None     # 이름 -> {count, latest, size}
+        self.archive_dir = os.path.join(directory, ARCHIVE_DIR)
+        self.archives = None    # 해 -> {count, latest, size}
+        self.summary_path = os.path.join(self.archive_dir, SUMMARY_NAME)
+        self._year_summaries = None  # 해 -> summarize() 결과 + size (처음 필요할 때 읽는다)
+        self.pending = {}       # 옮기는 중인 해 -> {shards, count} (archive() 가 끝나면 비운다)
+        self.generation = 0     # 압축으로 샤드 구성이 바뀔 때마다 증가
+
+    # ---------- 샤드 / manifest ----------
+    def _journal(self, name):
+        journal = self.shards.get(name)
+        if journal is None:
+            path = os.path.join(self.directory, name + SHARD_EXT)
+            journal = self.shards[name] = RecordJournal(path, compact_ratio=self.compact_ratio,
+                                                        read_only=self.read_only)
+        return journal
+
+    def _archive_path(self, year):
+        return os.path.join(self.archive_dir, year + ARCHIVE_EXT)
+
+    def _scan(self, directory=None, ext=SHARD_EXT):
+        """샤드 이름 -> 파일 크기 (directory/ext 를 주면 보관 파일)"""
+        sizes = {}
+        try:
+            with os.scandir(directory or self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(ext) and entry.is_file():
+                        sizes[entry.name[:-len(ext)]] = entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return sizes
+
+    def _read_manifest(self):
+        """(샤드 요약, 보관 요약, 옮기는 중인 해) — 없거나 깨졌으면 (None, {}, {})"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return None, {}, {}
+        if not isinstance(data, dict):
+            return None, {}, {}
+        shards = data.get("shards")
+        archives = data.get("archives")
+        pending = data.get("pending")
+        return (shards if isinstance(shards, dict) else None), (archives if isinstance(archives, dict) else {}), \
+            (pending if isinstance(pending, dict) else {})
+
+    def _write_manifest(self):
+        if self.read_only:
+            return
+        data = {"version": MANIFEST_VERSION,
+                "shards": {name: self.summary[name] for name in sorted(self.summary, key=_shard_order)},
+                "archives": {year: self.archives[year] for year in sorted(self.archives)}}
+        if self.pending:
+            data["pending"] = self.pending
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # manifest 는 샤드에서 다시 만들 수 있다
+            pass
+
+    def _summarize(self, name):
+        journal = self._journal(name)
+        head = journal.header()
+        self.summary[name] = {"count": head["count"], "latest": head["latest"], "size": journal.size}
+
+    def _summaries(self):
+        if self._year_summaries is None:
+            try:
+                with open(self.summary_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                data = None
+            self._year_summaries = data if isinstance(data, dict) else {}
+        return self._year_summaries
+
+    def _write_summaries(self):
+        if self.read_only:
+            return
+        text = json.dumps({year: self._year_summaries[year] for year in sorted(self._year_summaries)},
+                          ensure_ascii=False, separators=(",", ":"))
+        try:
+            atomic_write_text(self.summary_path, text)
+        except OSError:
+            # 요약은 보관 파일에서 다시 만들 수 있다
+            pass
+
+    def _summarize_archive(self, year, records=None):
+        """보관된 해를 요약한다 — manifest 항목과 summary.json (summary.json 은 바로 쓴다)"""
+        if records is None:
+            records = read_archive(self._archive_path(year))
+        entry = summarize(records)
+        entry["size"] = os.path.getsize(self._archive_path(year))
+        self.archives[year] = {"count": entry["count"], "latest": entry["latest"], "size": entry["size"]}
+        self._summaries()[year] = entry
+        self._write_summaries()
+
+    def ensure(self):
+        """manifest 를 읽고 샤드/보관 파일과 맞춰 둔다 (아무것도 없으면 예전 저널에서 옮겨 온다)"""
+        if self.summary is not None:
+            return
+        if not self.read_only:
+            os.makedirs(self.directory, exist_ok=True)
+        manifest, archived, pending = self._read_manifest()
+        sizes = self._scan()
+        for name in self._finish_archive(pending):
+            sizes.pop(name, None)
+            if not self.read_only:
+                self._remove_shard(name)
+        archive_sizes = self._scan(self.archive_dir, ARCHIVE_EXT)
+        self.archives = {}
+        # manifest 파일이 있으면 이미 옮긴 것이다 — 기록을 모두 지워 샤드가 없어져도 예전 저널을 다시 읽지 않는다
+        if not sizes and not archive_sizes and not os.path.exists(self.manifest_path):
+            self.summary = {}
+            if self.read_only:
+                self.legacy = RecordJournal(self.legacy_journal, legacy_path=self.legacy_path,
+                                            read_only=True).load() if self.legacy_journal else []
+            else:
+                self._migrate()
+            return
+        manifest = manifest or {}
+        self.summary = {}
+        changed = bool(pending) or set(manifest) != set(sizes) or set(archived) != set(archive_sizes)
+        for name, size in sizes.items():
+            entry = manifest.get(name)
+            if isinstance(entry, dict) and entry.get("size") == size:
+                self.summary[name] = entry
+            else:
+                self._summarize(name)
+                changed = True
+        for year, size in archive_sizes.items():
+            entry = archived.get(year)
+            if isinstance(entry, dict) and entry.get("size") == size:
+                self.archives[year] = {"count": entry.get("count", 0), "latest": entry.get("latest"), "size": size}
+                changed = changed or len(entry) != 3   # 예전 manifest 는 운동별 집계까지 들고 있었다
+            else:
+                self._summarize_archive(year)
+                changed = True
+        if changed:
+            self._write_manifest()
+
+    def _finish_archive(self, pending):
+        """archive() 가 중간에 멈춘 해 중 보관 파일을 다 쓴 해의 샤드 이름 (마저 지운다 — 못 쓴 해의 샤드는 그대로 둔다)"""
+        names = []
+        for year, entry in pending.items():
+            if isinstance(entry, dict) and len(read_archive(self._archive_path(year))) == entry.get("count"):
+                names.extend(entry.get("shards") or ())
+        return names
+
+    def _migrate(self):
+        if not self.legacy_journal or \
+                not any(p and os.path.exists(p) for p in (self.legacy_journal, self.legacy_path)):
+            # 옮길 것이 없어도 manifest 를 남겨 둔다 (나중에 생긴 파일을 기록으로 착각하지 않게)
+            self._write_manifest()
+            return
+        records = RecordJournal(self.legacy_journal, legacy_path=self.legacy_path).load()
+        self.compact(records)
+
+    def _touched(self, names):
+        for name in names:
+            journal = self.shards[name]
+            self.summary[name] = {"count": journal.live, "latest": journal.latest, "size": journal.size}
+        self._write_manifest()
+
+    def _partitions(self, archived=True, reverse=False):
+        """샤드 이름과 보관된 해를 날짜 순서로 (undated 가 가장 오래된 쪽)"""
+        names = list(self.summary)
+        if archived:
+            names.extend(self.archives)
+        return sorted(names, key=_shard_order, reverse=reverse)
+
+    def _entry(self, name):
+        entry = self.summary.get(name)
+        return entry if entry is not None else self.archives.get(name, {})
+
+    def _archived_year(self, rec):
+        """기록이 보관된 해에 속하면 그 해 (아니면 None)"""
+        name = shard_of(rec)
+        if name != UNDATED and name[:4] in self.archives:
+            return name[:4]
+        return None
+
+    # ---------- 읽기 ----------
+    def header(self):
+        """manifest 합계 — 기록 수(보관 포함), 최신 날짜, 도장(stamp: 샤드/보관 파일 크기 합)"""
+        self.ensure()
+        if self.legacy is not None:
+            return {"count": len(self.legacy), "latest": max((r.get("date", "") for r in self.legacy), default=None),
+                    "stamp": 0, "shards": 0, "archives": 0}
+        latest = None
+        for name in self._partitions(reverse=True):
+            entry = self._entry(name)
+            if entry.get("count") and entry.get("latest") is None:
+                # 최신 기록이 지워진 샤드 — 그 샤드만 다시 요약
+                self._summarize(name)
+                self._write_manifest()
+                entry = self.summary[name]
+            if entry.get("count"):
+                latest = entry.get("latest")
+                break
+        entries = list(self.summary.values()) + list(self.archives.values())
+        return {"count": sum(e.get("count", 0) for e in entries), "latest": latest,
+                "stamp": sum(e.get("size", 0) for e in entries), "shards": len(self.summary),
+                "archives": len(self.archives)}
+
+    def archive_summaries(self):
+        """보관된 해마다의 요약 (오래된 해부터) — 요약이 보관 파일과 맞지 않는 해만 다시 읽는다"""
+        self.ensure()
+        summaries = self._summaries()
+        for year, entry in self.archives.items():
+            if summaries.get(year, {}).get("size") != entry.get("size"):
+                self._summarize_archive(year)
+        return [summaries[year] for year in sorted(self.archives)]
+
+    def load(self, archived=True):
+        """전체 기록 (보관 파일과 샤드를 날짜 순서대로 이어서) — archived=False 면 샤드만"""
+        self.ensure()
+        if self.legacy is not None:
+            return list(self.legacy)
+        records = []
+        for name in self._partitions(archived):
+            if name in self.summary:
+                records.extend(self._journal(name).load())
+            else:
+                records.extend(read_archive(self._archive_path(name)))
+        # 읽으면서 압축된 샤드가 있을 수 있다
+        self._touched(list(self.summary))
+        return records
+
+    def iter_reverse(self, archived=True):
+        """최신 기록부터 — 최근 달 샤드부터 필요한 만큼만, 보관된 해는 거기까지 왔을 때 처음 푼다"""
+        self.ensure()
+        if self.legacy is not None:
+            yield from reversed(self.legacy)
+            return
+        generation = self.generation
+        name = None
+        while True:
+            # 다음 샤드는 거기까지 왔을 때 고른다 — 읽는 동안 더 오래된 달에 처음 추가된 기록도 읽힌다
+            name = next((n for n in self._partitions(archived, reverse=True)
+                         if name is None or _shard_order(n) < _shard_order(name)), None)
+            if name is None:
+                return
+            if not self._entry(name).get("count"):
+                continue
+            if name in self.summary:
+                source = self._journal(name).iter_reverse()
+            else:
+                source = reversed(read_archive(self._archive_path(name)))
+            for rec in source:
+                if generation != self.generation:
+                    return
+                yield rec
+
+    def iter_forward(self, archived=True):
+        """오래된 기록부터 — 샤드/보관된 해를 하나씩 읽어서 넘겨 준다 (한 번에 한 달/한 해만 메모리에 둔다)"""
+        self.ensure()
+        if self.legacy is not None:
+            yield from self.legacy
+            return
+        name = None
+        while True:
+            name = next((n for n in self._partitions(archived)
+                         if name is None or _shard_order(n) > _shard_order(name)), None)
+            if name is None:
+                return
+            if not self._entry(name).get("count"):
+                continue
+            if name in self.summary:
+                journal = self._journal(name)
+                records = journal.load()
+                if journal.size != self.summary[name].get("size"):
+                    # 읽으면서 압축된 샤드
+                    self._touched((name,))
+            else:
+                records = read_archive(self._archive_path(name))
+            yield from records
+
+    def partition_of(self, rec):
+        """기록이 들어 있는 샤드 이름 또는 보관된 해"""
+        self.ensure()
+        return self._archived_year(rec) or shard_of(rec)
+
+    def read_past(self, rec, last):
+        """iter_reverse() 가 last 까지 읽었을 때 새로 추가된 rec 를 이미 지나쳤는지
+        (읽고 있는 샤드는 읽기 시작할 때의 크기까지만 읽으므로 같은 샤드나 더 최근 샤드면 다시 나오지 않는다)"""
+        return _shard_order(self.partition_of(rec)) >= _shard_order(self.partition_of(last))
+
+    # ---------- 쓰기 ----------
+    def _write_year(self, year, records):
+        """보관된 해를 새로 쓴다 (날짜 순서) — 남은 기록이 없으면 보관 파일을 지운다"""
+        path = self._archive_path(year)
+        if not records:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.archives.pop(year, None)
+            if self._summaries().pop(year, None) is not None:
+                self._write_summaries()
+            return
+        records.sort(key=lambda r: r.get("date", ""))
+        write_archive(path, records)
+        self._summarize_archive(year, records)
+
+    def _remove_shard(self, name):
+        path = os.path.join(self.directory, name + SHARD_EXT)
+        for p in (path, path + ".head"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        self.shards.pop(name, None)
+        if self.summary is not None:
+            self.summary.pop(name, None)
+
+    def append(self, rec):
+        self.ensure()
+        year = self._archived_year(rec)
+        if year is not None:
+            self._write_year(year, read_archive(self._archive_path(year)) + [rec])
+            self._write_manifest()
+            return
+        name = shard_of(rec)
+        self._journal(name).append(rec)
+        self._touched((name,))
+
+    def append_many(self, records):
+        """여러 기록을 샤드별로 모아서 샤드마다 한 번씩 쓴다"""
+        if not records:
+            return
+        self.ensure()
+        groups = {}
+        years = {}
+        for rec in records:
+            year = self._archived_year(rec)
+            if year is not None:
+                years.setdefault(year, []).append(rec)
+            else:
+                groups.setdefault(shard_of(rec), []).append(rec)
+        for year, group in years.items():
+            self._write_year(year, read_archive(self._archive_path(year)) + group)
+        for name, group in groups.items():
+            self._journal(name).append_many(group)
+        self._touched(groups)
+
+    def delete(self, rec):
+        self.ensure()
+        year = self._archived_year(rec)
+        if year is not None:
+            records = read_archive(self._archive_path(year))
+            key = record_key(rec)
+            for i in range(len(records) - 1, -1, -1):
+                if record_key(records[i]) == key:
+                    del records[i]
+                    self._write_year(year, records)
+                    self._write_manifest()
+                    break
+            return
+        name = shard_of(rec)
+        if name not in self.summary:
+            return
+        self._journal(name).delete(rec)
+        self._touched((name,))
+
+    def compact(self, records, archived=True):
+        """기록을 달별로 나눠 샤드마다 새로 쓰고, 비게 된 샤드는 지운다
+        (archived=True 면 records 는 보관 기록까지 전체 — 보관된 해는 보관 파일로 새로 쓴다,
+         False 면 샤드 기록만 — 보관 파일은 그대로 둔다)"""
+        if self.summary is None:
+            self.ensure()
+        groups = {}
+        years = {}
+        for rec in records:
+            year = self._archived_year(rec) if archived else None
+            if year is not None:
+                years.setdefault(year, []).append(rec)
+            else:
+                groups.setdefault(shard_of(rec), []).append(rec)
+        if archived:
+            for year in set(self.archives) | set(years):
+                self._write_year(year, years.get(year, []))
+        for name, group in groups.items():
+            self._journal(name).compact(group)
+        for name in set(self._scan()) - set(groups):
+            self._remove_shard(name)
+        self.summary = {}
+        self.generation += 1
+        self._touched(groups)
+
+    def archive(self, before):
+        """before 해보다 이전 해의 샤드를 연도별 보관 파일로 옮긴다 -> 옮긴 기록 수"""
+        self.ensure()
+        if before is None:
+            return 0
+        years = {}
+        for name in self.summary:
+            if name != UNDATED and name[:4] < before:
+                years.setdefault(name[:4], []).append(name)
+        if not years:
+            return 0
+        moved = 0
+        for year, names in sorted(years.items()):
+            records = read_archive(self._archive_path(year)) if year in self.archives else []
+            for name in sorted(names):
+                group = self._journal(name).load()
+                moved += len(group)
+                records.extend(group)
+            # 보관 파일을 다 쓴 뒤에 샤드를 지운다 (중간에 멈춰도 기록이 사라지지 않게) —
+            # 먼저 pending 에 적어 두면 지우기 전에 멈췄을 때 다음 ensure() 가 마저 지운다
+            self.pending = {year: {"shards": sorted(names), "count": len(records)}}
+            self._write_manifest()
+            self._write_year(year, records)
+            for name in names:
+                self._remove_shard(name)
+            self.pending = {}
+            self._write_manifest()
+        self.generation += 1
+        self._write_manifest()
+        return moved
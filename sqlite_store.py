@@ -0,0 +1,306 @@
+import json
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+from compact_records import CompactRecords
+from perf import instrument
+
+# -------------------- SQLite 저장소 --------------------
+# 루틴/운동/세션/세션별 운동 결과를 테이블로 나눠 저장한다.
+# 편집 한 번 = 작은 트랜잭션 한 번, 기록 조회는 (날짜, id) 순서로 FETCH_CHUNK 개씩 읽는다 (idx_sessions_date).
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS routines (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS exercises (
+    id         INTEGER PRIMARY KEY,
+    routine_id INTEGER NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+    position   INTEGER NOT NULL,
+    name       TEXT NOT NULL,
+    sets       INTEGER NOT NULL,
+    reps       INTEGER NOT NULL,
+    rest       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exercises_routine ON exercises(routine_id, position);
+CREATE INDEX IF NOT EXISTS idx_exercises_name ON exercises(name);
+CREATE TABLE IF NOT EXISTS sessions (
+    id      INTEGER PRIMARY KEY,
+    date    TEXT NOT NULL,
+    routine TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE INDEX IF NOT EXISTS idx_sessions_routine ON sessions(routine, date);
+CREATE TABLE IF NOT EXISTS results (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position   INTEGER NOT NULL,
+    exercise   TEXT NOT NULL,
+    reps       INTEGER NOT NULL,
+    PRIMARY KEY (session_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_results_exercise ON results(exercise, session_id);
+"""
+
+FETCH_CHUNK = 500
+
+
+class SqliteStore:
+    """SQLite 기반 루틴/기록 저장소"""
+
+    def __init__(self, db_path, read_only=False):
+        self.db_path = db_path
+        if read_only:
+            # 조회만 (CLI) — 스키마/설정도 건드리지 않는다.
+            # 앱이 쓰고 있지 않으면 (-wal 파일이 없으면) 잠금용 -shm/-wal 파일도 만들지 않도록 immutable 로 연다
+            mode = "mode=ro" if os.path.exists(db_path + "-wal") else "immutable=1"
+            self.conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?{mode}", uri=True)
+            return
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)",
+                              (str(SCHEMA_VERSION),))
+
+    # ---------- 메타 ----------
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _routine_id(self, name):
+        row = self.conn.execute("SELECT id FROM routines WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    # ---------- 루틴 ----------
+    def load_routines(self):
+        routines = {}
+        ids = {}
+        for rid, name, desc in self.conn.execute("SELECT id, name, description FROM routines ORDER BY id"):
+            routines[name] = {"description": desc, "exercises": []}
+            ids[rid] = name
+        for rid, name, sets, reps, rest in self.conn.execute(
+                "SELECT routine_id, name, sets, reps, rest FROM exercises ORDER BY routine_id, position"):
+            routines[ids[rid]]["exercises"].append({"name": name, "sets": sets, "reps": reps, "rest": rest})
+        return routines
+
+    @instrument("sqlite.save_routines")
+    def save_routines(self, routines):
+        """전체 교체 (가져오기/마이그레이션 용)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM routines")
+            for name, data in routines.items():
+                self._insert_routine(name, data)
+
+    def _insert_routine(self, name, data):
+        cur = self.conn.execute("INSERT INTO routines(name, description) VALUES (?, ?)",
+                                (name, data.get("description", "")))
+        rid = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO exercises(routine_id, position, name, sets, reps, rest) VALUES (?, ?, ?, ?, ?, ?)",
+            [(rid, pos, ex["name"], ex["sets"], ex["reps"], ex["rest"])
+             for pos, ex in enumerate(data.get("exercises", []))])
+
+    def add_routine(self, name, data):
+        with self.conn:
+            self._insert_routine(name, data)
+
+    def delete_routine(self, name):
+        with self.conn:
+            self.conn.execute("DELETE FROM routines WHERE name = ?", (name,))
+
+    def add_exercise(self, routine, ex):
+        with self.conn:
+            rid = self._routine_id(routine)
+            pos = self.conn.execute("SELECT COUNT(*) FROM exercises WHERE routine_id = ?", (rid,)).fetchone()[0]
+            self.conn.execute(
+                "INSERT INTO exercises(routine_id, position, name, sets, reps, rest) VALUES (?, ?, ?, ?, ?, ?)",
+                (rid, pos, ex["name"], ex["sets"], ex["reps"], ex["rest"]))
+
+    @instrument("sqlite.update_exercise")
+    def update_exercise(self, routine, index, ex):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE exercises SET name = ?, sets = ?, reps = ?, rest = ? "
+                "WHERE routine_id = (SELECT id FROM routines WHERE name = ?) AND position = ?",
+                (ex["name"], ex["sets"], ex["reps"], ex["rest"], routine, index))
+
+    def delete_exercise(self, routine, index):
+        with self.conn:
+            rid = self._routine_id(routine)
+            self.conn.execute("DELETE FROM exercises WHERE routine_id = ? AND position = ?", (rid, index))
+            self.conn.execute("UPDATE exercises SET position = position - 1 WHERE routine_id = ? AND position > ?",
+                              (rid, index))
+
+    # ---------- 기록 ----------
+    def _insert_record(self, rec):
+        cur = self.conn.execute("INSERT INTO sessions(date, routine) VALUES (?, ?)",
+                                (rec.get("date", ""), rec.get("routine", "")))
+        sid = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO results(session_id, position, exercise, reps) VALUES (?, ?, ?, ?)",
+            [(sid, pos, k, v) for pos, (k, v) in
+             enumerate((k, v) for k, v in rec.items() if k not in ("date", "routine"))])
+
+    def _bump_generation(self):
+        # 기록이 바뀔 때마다 증가 — 요약/집계 캐시가 최신인지 확인하는 도장
+        self.conn.execute(
+            "INSERT INTO meta(key, value) VALUES ('record_generation', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+    @instrument("sqlite.add_record")
+    def add_record(self, rec):
+        with self.conn:
+            self._insert_record(rec)
+            self._bump_generation()
+
+    def add_records(self, recs):
+        """여러 기록을 트랜잭션 하나로 추가 (가져오기)"""
+        with self.conn:
+            for rec in recs:
+                self._insert_record(rec)
+            self._bump_generation()
+
+    @instrument("sqlite.delete_record")
+    def delete_record(self, rec):
+        with self.conn:
+            self._bump_generation()
+            self.conn.execute(
+                "DELETE FROM sessions WHERE id = "
+                "(SELECT id FROM sessions WHERE date = ? AND routine = ? ORDER BY id DESC LIMIT 1)",
+                (rec.get("date", ""), rec.get("routine", "")))
+
+    def compact_records(self, records=None):
+        """(records 가 주어지면 전체 교체 후) 파일 정리"""
+        if records is not None:
+            with self.conn:
+                self.conn.execute("DELETE FROM sessions")
+                for rec in records:
+                    self._insert_record(rec)
+                self._bump_generation()
+        self.conn.execute("VACUUM")
+
+    def count_records(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def records_header(self):
+        """기록 수, 최신 날짜 (인덱스만 사용)"""
+        count, latest = self.conn.execute("SELECT COUNT(*), MAX(date) FROM sessions").fetchone()
+        return {"count": count, "latest": latest, "stamp": int(self.get_meta("record_generation", 0))}
+
+    def load_records(self):
+        return CompactRecords(self.iter_records())
+
+    def read_past(self, rec, last):
+        """iter_records(newest_first=True) 가 last 까지 읽었을 때 새로 추가된 rec 를 이미 지나쳤는지
+        ((날짜, id) 최신순 — 새 기록은 id 가 가장 크므로 날짜가 같으면 이미 지나쳤다)"""
+        return rec.get("date", "") >= last.get("date", "")
+
+    # 오래된 기록도 인덱스로 바로 찾으므로 연도별 보관 파일로 옮기지 않는다
+    def archive_records(self, before):
+        return 0
+
+    def archive_summaries(self):
+        return []
+
+    def iter_records(self, routine=None, exercise=None, since=None, until=None, newest_first=False, archived=True):
+        """조건에 맞는 기록을 하나씩 반환 (인덱스 사용, 전체를 메모리에 올리지 않음 — 보관된 기록은 없다)"""
+        where, params = [], []
+        if routine is not None:
+            where.append("routine = ?")
+            params.append(routine)
+        if exercise is not None:
+            where.append("id IN (SELECT session_id FROM results WHERE exercise = ?)")
+            params.append(exercise)
+        if since is not None:
+            where.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("date <= ?")
+            params.append(until)
+        order = "DESC" if newest_first else "ASC"
+        after = "<" if newest_first else ">"
+        position = None     # 마지막으로 넘겨 준 기록의 (날짜, id) — 다음 덩어리는 그 다음부터 읽는다
+        while True:
+            clauses, args = list(where), list(params)
+            if position is not None:
+                clauses.append(f"(date, id) {after} (?, ?)")
+                args.extend(position)
+            sql = "SELECT id, date, routine FROM sessions"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY date {order}, id {order} LIMIT {FETCH_CHUNK}"
+            rows = self.conn.execute(sql, args).fetchall()
+            if not rows:
+                return
+            changes = self.conn.total_changes
+            for rec, (sid, date, _) in zip(self._build_records(rows), rows):
+                yield rec
+                position = date, sid
+                if self.conn.total_changes != changes:
+                    # 읽는 동안 기록이 바뀌었다 — 남은 줄은 버리고 마지막으로 넘겨 준 기록 다음부터 다시 읽는다
+                    break
+            else:
+                if len(rows) < FETCH_CHUNK:
+                    return
+
+    def _build_records(self, session_rows):
+        records = {}
+        for sid, date, routine in session_rows:
+            records[sid] = {"date": date, "routine": routine}
+        marks = ",".join("?" * len(records))
+        for sid, exercise, reps in self.conn.execute(
+                f"SELECT session_id, exercise, reps FROM results WHERE session_id IN ({marks}) "
+                f"ORDER BY session_id, position", list(records)):
+            records[sid][exercise] = reps
+        return list(records.values())
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.conn.close()
+
+
+# -------------------- JSON -> SQLite 마이그레이션 --------------------
+def migrated(store):
+    """JSON 데이터를 이미 옮겨 왔는지 (읽기 전용으로 연 빈 파일이면 False)"""
+    try:
+        return bool(store.get_meta("migrated_from_json"))
+    except sqlite3.Error:
+        return False
+
+
+def migrate_from_json(store, data_path, journal):
+    """처음 한 번만 workout_data.json 과 기록 저널(또는 예전 기록 파일)을 옮겨온다"""
+    if migrated(store):
+        return False
+    routines = {}
+    if os.path.exists(data_path):
+        with open(data_path, "r", encoding="utf-8") as f:
+            routines = json.load(f)
+    records = journal.load()
+    with store.conn:
+        store.conn.execute("DELETE FROM routines")
+        store.conn.execute("DELETE FROM sessions")
+        for name, data in routines.items():
+            store._insert_routine(name, data)
+        for rec in records:
+            store._insert_record(rec)
+        store._bump_generation()
+        store.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('migrated_from_json', '1')")
+    return True
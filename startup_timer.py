@@ -0,0 +1,32 @@
+import json
+import time
+from datetime import datetime
+
+# -------------------- 시작 시간 측정 --------------------
+# main.py 맨 위에서 잰 시각부터 단계별(첫 화면, 데이터 로드, 홈 화면 ...) 경과 시간을 남긴다.
+# ECOFIT_STARTUP_LOG 에 파일 경로를 주면 실행할 때마다 한 줄(JSON)씩 덧붙여서 변화를 추적할 수 있다.
+
+
+class StartupTimer:
+    """시작 단계별 경과 시간 (ms)"""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = []     # (단계 이름, 시작부터 ms)
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.t0) * 1000))
+
+    def as_dict(self):
+        return {name: round(ms, 1) for name, ms in self.marks}
+
+    def summary(self):
+        return " ".join(f"{name}={ms:.0f}ms" for name, ms in self.marks)
+
+    def append_to(self, path):
+        entry = {"date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "marks": self.as_dict()}
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,180 @@
+import json
+import os
+import time
+
+from persistence import atomic_write_text
+from perf import timed
+from shard_journal import ShardedJournal
+from compact_records import CompactRecords
+
+# -------------------- 저장소 --------------------
+# 앱은 메모리의 routines dict 를 먼저 수정한 뒤 아래 메서드로 변경 사항만 알려준다.
+#   JSON 저장소   : 루틴 파일 전체 저장 (백그라운드 스레드에서 모아서) + 기록은 저널에 한 줄 추가
+#                   보관 기간이 지난 해는 연도별 압축 파일로 옮긴다 (archive_records, record_archive.py)
+#   SQLite 저장소 : 해당 행만 바꾸는 작은 트랜잭션 (sqlite_store.py)
+
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+
+
+class JsonStore:
+    """workout_data.json + 기록 저널 저장소 (기본)"""
+
+    def __init__(self, data_path, journal, worker=None):
+        self.data_path = data_path
+        self.journal = journal
+        self.worker = worker    # 없으면 바로 저장 (CLI 등)
+        self.routines = {}
+        self.records = None     # 기록 화면 등에서 처음 필요할 때 읽는다 (CompactRecords)
+
+    # ---------- 루틴 ----------
+    def load_routines(self):
+        if os.path.exists(self.data_path):
+            with open(self.data_path, "r", encoding="utf-8") as f:
+                self.routines = json.load(f)
+        else:
+            self.routines = {}
+        return self.routines
+
+    def save_routines(self, routines=None):
+        """routines 파일 전체 저장 (바로)"""
+        if routines is not None:
+            self.routines = routines
+        self._write_routines()
+
+    def _write_routines(self):
+        for _ in range(3):
+            try:
+                with timed("storage.routines.dumps"):
+                    text = json.dumps(self.routines, ensure_ascii=False, indent=4)
+                break
+            except RuntimeError:
+                # UI 스레드가 수정하는 중이었다 — 그 수정이 끝나면 저장 요청이 다시 오므로 잠깐 뒤 재시도
+                time.sleep(0.01)
+        else:
+            return
+        with timed("storage.routines.write"):
+            atomic_write_text(self.data_path, text)
+
+    def _schedule_routines(self):
+        if self.worker is None:
+            self._write_routines()
+        else:
+            self.worker.schedule(self.data_path, self._write_routines)
+
+    def add_routine(self, name, data):
+        self._schedule_routines()
+
+    def delete_routine(self, name):
+        self._schedule_routines()
+
+    def add_exercise(self, routine, ex):
+        self._schedule_routines()
+
+    def update_exercise(self, routine, index, ex):
+        self._schedule_routines()
+
+    def delete_exercise(self, routine, index):
+        self._schedule_routines()
+
+    # ---------- 기록 ----------
+    def records_header(self):
+        """기록 수, 최신 날짜 (저널 전체를 읽지 않음)"""
+        return self.journal.header()
+
+    def load_records(self):
+        """전체 기록 (보관된 해까지 모두 푼다 — 앱은 최신순 구간 읽기만 쓴다)"""
+        if self.records is None:
+            self.records = CompactRecords(self.journal.load())
+        return self.records
+
+    def add_record(self, rec):
+        if self.records is not None:
+            self.records.append(rec)
+        self.journal.append(rec)
+
+    def add_records(self, recs):
+        """여러 기록을 한 번에 추가 (가져오기)"""
+        if self.records is not None:
+            self.records.extend(recs)
+        self.journal.append_many(recs)
+
+    def delete_record(self, rec):
+        records = self.records
+        if records is not None:
+            # 최근 기록을 지우는 경우가 많으므로 뒤에서부터 찾는다
+            pos = records.find(rec, from_end=True)
+            if pos is None:
+                return
+            records.pop(pos)
+        self.journal.delete(rec)
+
+    def compact_records(self, records=None):
+        """(records 가 주어지면 전체 교체 후) 파일 정리 — 주어지지 않으면 샤드만 새로 쓰고 보관 파일은 그대로"""
+        if records is not None:
+            self.records = CompactRecords(records)
+            self.journal.compact(self.records)
+        else:
+            self.journal.compact(self.journal.load(archived=False), archived=False)
+
+    def read_past(self, rec, last):
+        """iter_records(newest_first=True) 가 last 까지 읽었을 때 새로 추가된 rec 를 이미 지나쳤는지"""
+        return self.journal.read_past(rec, last)
+
+    def archive_records(self, before):
+        """before 해보다 이전 해의 기록을 연도별 압축 파일로 옮긴다 -> 옮긴 기록 수"""
+        return self.journal.archive(before)
+
+    def archive_summaries(self):
+        """보관된 해마다의 요약 (운동/루틴별 집계 포함)"""
+        return self.journal.archive_summaries()
+
+    def iter_records(self, routine=None, exercise=None, since=None, until=None, newest_first=False, archived=True):
+        """조건에 맞는 기록을 하나씩 반환 (기본은 오래된 순서, archived=False 면 보관된 해는 빼고)"""
+        if newest_first:
+            # 최신순은 저널 끝에서부터 필요한 만큼만 읽는다 (읽어 둔 기록이 있어도 — 읽는 위치는 read_past() 로 판단)
+            source = self.journal.iter_reverse(archived)
+        elif not archived or self.records is None:
+            # 오래된 순서는 샤드/보관된 해를 하나씩 읽는다 (내보내기 — 전체를 self.records 에 올리지 않는다)
+            source = self.journal.iter_forward(archived)
+        else:
+            # 이미 읽어 둔 전체 기록 — 넘겨보는 동안 삭제가 일어나도 안전하도록 배열을 복사해 둔다
+            source = iter(self.records.copy())
+        for rec in source:
+            if routine is not None and rec.get("routine") != routine:
+                continue
+            if exercise is not None and exercise not in rec:
+                continue
+            date = rec.get("date", "")
+            if since is not None and date < since:
+                continue
+            if until is not None and date > until:
+                continue
+            yield rec
+
+    def flush(self):
+        if self.worker is not None:
+            self.worker.flush()
+
+    def close(self):
+        """남은 저장을 모두 끝낸다 (저장 스레드 종료는 만든 쪽에서)"""
+        self.flush()
+
+
+def open_store(backend, files, worker=None, read_only=False):
+    """데이터 폴더(paths.DataFiles)의 저장소를 연다 (SQLite 는 처음 열 때 JSON 데이터를 옮겨온다)
+    read_only=True 면 폴더에 아무것도 쓰지 않는다 (옮기기 전이면 옮겨 올 데이터를 그대로 읽는다 — CLI 조회 명령)"""
+    journal = ShardedJournal(files.shards, legacy_journal=files.journal, legacy_path=files.records,
+                             read_only=read_only)
+    if backend == BACKEND_SQLITE:
+        from sqlite_store import SqliteStore, migrate_from_json, migrated
+        if not read_only:
+            store = SqliteStore(files.db)
+            migrate_from_json(store, files.data, journal)
+            return store
+        if os.path.exists(files.db):
+            store = SqliteStore(files.db, read_only=True)
+            if migrated(store):
+                return store
+            store.close()
+    return JsonStore(files.data, journal, worker=worker)
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from compact_records import CompactRecords
+
+try:
+    import numpy as np
+    from analytics import PERIOD_MONTH, TrainingAnalytics
+except ImportError:
+    np = None
+
+# -------------------- 운동량 분석 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_analytics)
+
+
+def _records(count, seed=3):
+    """오래된 순서의 기록 — 열로 담지 못하는 기록(날짜 형식, 횟수 형식)도 섞는다"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        day = 1 + i // 3
+        rec = {"date": f"2024-{1 + day // 28:02d}-{1 + day % 28:02d} 0{i % 3}:00:00",
+               "routine": rng.choice(["A", "B", "C"])}
+        for name in rng.sample(["push", "pull", "squat", "plank"], rng.randint(1, 3)):
+            rec[name] = rng.randint(1, 30)
+        if i % 17 == 5:
+            rec["date"] = rec["date"][:10]
+        if i % 23 == 7:
+            rec["push"] = "12"
+        records.append(rec)
+    return records
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class FromCompactTest(unittest.TestCase):
+    """열 배열로 만든 엔진은 기록 dict 로 만든 엔진과 같은 결과를 낸다"""
+
+    def _check(self, records, compact):
+        expected = TrainingAnalytics(records)
+        engine = TrainingAnalytics.from_compact(compact)
+        self.assertEqual(engine.session_count, expected.session_count)
+        self.assertEqual(engine.totals(), expected.totals())
+        self.assertEqual(engine.streaks(), expected.streaks())
+        self.assertEqual(engine.personal_bests(), expected.personal_bests())
+        for period in ("week", PERIOD_MONTH):
+            for name in expected.exercise_names:
+                starts, series = engine.exercise_volume(name, period)
+                want_starts, want = expected.exercise_volume(name, period)
+                np.testing.assert_array_equal(starts, want_starts)
+                np.testing.assert_array_equal(series, want)
+
+    def test_matches_dict_engine(self):
+        records = _records(300)
+        self._check(records, CompactRecords(reversed(records)))
+
+    def test_prepended_and_removed_records(self):
+        records = _records(120)
+        compact = CompactRecords(reversed(records[:100]))
+        for rec in records[100:]:
+            compact.prepend(rec)
+        for index in (7, 50, 3):
+            removed = compact.pop(index)
+            records.remove(removed)
+        self._check(records, compact)
+
+    def test_empty(self):
+        engine = TrainingAnalytics.from_compact(CompactRecords())
+        self.assertEqual(engine.session_count, 0)
+        self.assertEqual(engine.totals(), {})
+        self.assertEqual(engine.streaks()["longest"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
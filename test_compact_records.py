@@ -0,0 +1,140 @@
+import random
+import unittest
+
+from compact_records import CompactRecords, decode_date, encode_date
+from record_journal import record_key
+
+# -------------------- 압축 기록 목록 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_compact_records)
+# 무작위로 append / prepend / pop 을 섞어서 보통 list 와 같은 결과인지 확인한다.
+
+ROUTINES = ["A", "B", "Push day"]
+EXERCISES = ["push", "pull", "squat", "plank", "팔굽혀펴기"]
+
+
+def random_record(rng):
+    """대부분 열에 담기는 기록, 가끔 dict 그대로 남는 기록 (날짜 형식, 키 순서, 횟수 형식이 다른 것)"""
+    rec = {"date": f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+                   f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+           "routine": rng.choice(ROUTINES)}
+    for name in rng.sample(EXERCISES, rng.randint(0, 3)):
+        rec[name] = rng.randint(0, 50)
+    odd = rng.random()
+    if odd < 0.05:
+        rec["date"] = rec["date"][:10]
+    elif odd < 0.08:
+        rec = {"routine": rec.pop("routine"), **rec}
+    elif odd < 0.11:
+        rec["push"] = 12.5
+    elif odd < 0.13:
+        del rec["date"]
+    return rec
+
+
+class CompactRecordsTest(unittest.TestCase):
+
+    def _check(self, compact, model):
+        self.assertEqual(len(compact), len(model))
+        self.assertEqual(list(compact), [rec for _, rec in model])
+        self.assertEqual(list(reversed(compact)), [rec for _, rec in reversed(model)])
+        self.assertEqual([compact.id_at(i) for i in range(len(model))], [rid for rid, _ in model])
+        for rid, rec in model:
+            self.assertEqual(compact.by_id(rid), rec)
+        if model:
+            self.assertEqual(compact[-1], model[-1][1])
+            self.assertEqual(compact[1:4], [rec for _, rec in model[1:4]])
+        with self.assertRaises(IndexError):
+            compact[len(model)]
+
+    def test_random_append_prepend_pop(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            compact = CompactRecords()
+            model = []      # [(id, 기록)] — 목록 순서대로
+            removed = set()
+            for step in range(600):
+                op = rng.random()
+                if op < 0.5 or not model:
+                    rec = random_record(rng)
+                    model.append((compact.append(rec), rec))
+                elif op < 0.7:
+                    rec = random_record(rng)
+                    model.insert(0, (compact.prepend(rec), rec))
+                else:
+                    index = rng.randrange(-len(model), len(model))
+                    rid, rec = model.pop(index)
+                    self.assertEqual(compact.pop(index), rec)
+                    removed.add(rid)
+                if step % 97 == 0:
+                    self._check(compact, model)
+            self._check(compact, model)
+            ids = [rid for rid, _ in model]
+            self.assertEqual(len(set(ids)), len(ids))
+            for rid in removed:
+                self.assertIsNone(compact.by_id(rid))
+
+            # 열 기록만 id 순서대로 (앞에 넣은 기록은 front_items)
+            front = compact.front_items()
+            columned = [(rid, rec) for rid, rec in model if rid not in dict(front)]
+            self.assertEqual(sorted(front), sorted((rid, rec) for rid, rec in model if rid in dict(front)))
+            self.assertEqual([rid for rid, _ in columned], sorted(rid for rid, _ in columned))
+            if columned:
+                middle = columned[len(columned) // 2][0]
+                self.assertEqual(list(compact.items_from(middle)), [(r, x) for r, x in columned if r >= middle])
+                self.assertEqual(compact.count_from(middle), sum(1 for r, _ in columned if r >= middle))
+
+    def test_find(self):
+        rng = random.Random(7)
+        compact = CompactRecords()
+        model = []
+        for _ in range(300):
+            rec = random_record(rng)
+            if rng.random() < 0.2:
+                compact.prepend(rec)
+                model.insert(0, rec)
+            else:
+                compact.append(rec)
+                model.append(rec)
+        keys = [record_key(r) for r in model]
+        for rec in rng.sample(model, 60):
+            key = record_key(rec)
+            probe = dict(rec)   # 같은 키, 다른 객체
+            self.assertEqual(compact.find(probe), keys.index(key))
+            self.assertEqual(compact.find(probe, from_end=True), len(keys) - 1 - keys[::-1].index(key))
+        self.assertIsNone(compact.find({"date": "1999-01-01 00:00:00", "routine": "A"}))
+
+    def test_copy_is_independent(self):
+        rng = random.Random(11)
+        compact = CompactRecords(random_record(rng) for _ in range(50))
+        compact.prepend(random_record(rng))
+        snapshot = compact.copy()
+        before = list(snapshot)
+        compact.pop(10)
+        compact.append(random_record(rng))
+        compact.prepend(random_record(rng))
+        self.assertEqual(list(snapshot), before)
+
+    def test_dict_records(self):
+        rng = random.Random(5)
+        compact = CompactRecords()
+        model = []      # [(기록, dict 로 남는지)]
+        for _ in range(200):
+            rec = random_record(rng)
+            if rng.random() < 0.1:
+                compact.prepend(rec)
+                model.insert(0, (rec, True))
+            else:
+                compact.append(rec)
+                model.append((rec, bool(CompactRecords([rec]).dict_records())))
+        self.assertEqual(compact.dict_records(), [rec for rec, loose in model if loose])
+        self.assertTrue(any(loose for _, loose in model[20:]))
+
+    def test_date_round_trip(self):
+        for text in ("1970-01-01 00:00:00", "2024-02-29 23:59:59", "1969-12-31 12:00:00"):
+            self.assertEqual(decode_date(encode_date(text)), text)
+        for bad in ("2024-02-30 10:00:00", "2024-01-01", "2024/01/01 10:00:00", None, 12):
+            self.assertIsNone(encode_date(bad))
+
+
+if __name__ == "__main__":
+    unittest.main()
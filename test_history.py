@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from history import HistoryLoader
+from paths import data_files
+from record_journal import record_key
+from storage import open_store
+
+# -------------------- 기록 지연 로더 회귀 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_history)
+
+
+def _month(month, day=1, year=2024):
+    return {"date": f"{year}-{month:02d}-{day:02d} 10:00:00", "routine": "A", "push": month}
+
+
+class AddWhileReadingTest(unittest.TestCase):
+    """읽는 도중 추가한 기록은 한 번만 나와야 한다 — 아직 읽지 않은 달이면 저장소에서 읽힐 때 나온다"""
+
+    backend = "json"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = open_store(self.backend, data_files(self.tmp.name))
+        self.store.add_records([_month(m) for m in range(1, 13)])
+        self.history = HistoryLoader(self.store)
+        # 최신 세 달만 읽어 둔다 (10월 샤드를 읽는 중)
+        self.assertEqual(len(self.history.window(0, 3)), 3)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _assert_all(self, expected):
+        records = list(self.history.all())
+        self.assertEqual(len(records), expected)
+        self.assertEqual(len(records), self.history.count)
+        self.assertEqual(len({(record_key(r), r.get("push")) for r in records}), expected)
+        self.assertEqual(len(records), self.store.records_header()["count"])
+
+    def test_add_many_to_unread_month(self):
+        self.history.add_many([_month(3, day=15)])
+        self._assert_all(13)
+
+    def test_add_to_unread_month(self):
+        self.history.add(_month(5, day=20))
+        self._assert_all(13)
+
+    def test_add_to_month_being_read(self):
+        self.history.add(_month(10, day=20))
+        self.assertEqual(self.history.window(0, 1)[0]["date"], "2024-10-20 10:00:00")
+        self._assert_all(13)
+
+    def test_add_to_new_older_month(self):
+        # 읽기 시작할 때 없던 달 (샤드가 새로 생긴다)
+        self.history.add_many([_month(6, year=2023), _month(12, day=31)])
+        self._assert_all(14)
+        self.assertEqual(self.history.all()[-1]["date"], "2023-06-01 10:00:00")
+
+    def test_add_after_reading_everything(self):
+        self.history.all()
+        self.history.add(_month(2, day=2))
+        self._assert_all(13)
+
+
+class SqliteAddWhileReadingTest(AddWhileReadingTest):
+    backend = "sqlite"
+
+    def test_newest_first_by_date(self):
+        # 가져오기처럼 날짜 순서와 다르게 들어간 기록도 날짜 최신순으로 읽는다
+        self.store.add_records([_month(m, day=9, year=2023) for m in range(1, 13)])
+        self.store.add_records([_month(m, day=5) for m in range(12, 0, -1)])
+        self.history.reset()
+        dates = [r["date"] for r in self.history.all()]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertEqual(len(dates), 36)
+        self.assertEqual([r["date"] for r in self.store.iter_records()], sorted(dates))
+
+    def test_add_inside_fetched_chunk(self):
+        # 이미 가져온 덩어리 안쪽(읽은 위치보다 오래된 자리)에 추가된 기록도 한 번 읽힌다
+        with mock.patch("sqlite_store.FETCH_CHUNK", 4):
+            self.history.reset()
+            self.history.window(0, 2)
+            self.history.add(_month(10, day=15))
+            self._assert_all(13)
+            dates = [r["date"] for r in self.history.all()]
+            self.assertEqual(dates, sorted(dates, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import json
+import random
+import unittest
+from collections import Counter
+
+from compact_records import CompactRecords, encode_date
+from history_index import NO_DATE, HistoryIndex
+
+# -------------------- 기록 검색 색인 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_history_index)
+# 루틴 / 운동 이름(앞부분) / 날짜 범위 조건을 무작위로 섞어서 전체 기록을 훑은 결과와 비교한다.
+
+ROUTINES = ["A", "B", "Legs"]
+EXERCISES = ["Push-up", "push press", "Pull-up", "squat", "Squat jump", "plank"]
+
+
+def random_record(rng):
+    # 하루의 처음/끝 시각도 넣어서 날짜 범위 경계를 확인한다
+    rec = {"date": f"2024-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d} "
+                   f"{rng.choice(['00:00:00', '07:00:00', '12:00:00', '23:59:59'])}",
+           "routine": rng.choice(ROUTINES)}
+    for name in rng.sample(EXERCISES, rng.randint(1, 3)):
+        rec[name] = rng.randint(1, 40)
+    if rng.random() < 0.05:
+        rec["date"] = rec["date"][:10]    # 읽을 수 없는 날짜 — 가장 오래된 것으로 취급
+    return rec
+
+
+def _key(rec):
+    seconds = encode_date(rec.get("date"))
+    return NO_DATE if seconds is None else -seconds
+
+
+def _bound(date, end_of_day=False):
+    if date is None:
+        return None
+    if len(date) == 10:
+        date += " 23:59:59" if end_of_day else " 00:00:00"
+    return -encode_date(date)
+
+
+def scan(records, routine=None, exercise=None, prefix=None, since=None, until=None):
+    """조건에 맞는 기록을 목록 전체를 훑어서 찾는다 (최신순 정렬)"""
+    lo, hi = _bound(until, end_of_day=True), _bound(since)
+    found = []
+    for rec in records:
+        key = _key(rec)
+        names = [n for n in rec if n != "date" and n != "routine"]
+        if lo is not None and key < lo or hi is not None and key > hi:
+            continue
+        if routine is not None and rec.get("routine", "") != routine:
+            continue
+        if exercise is not None and exercise not in names:
+            continue
+        if prefix and not any(n.casefold().startswith(prefix.casefold()) for n in names):
+            continue
+        found.append(rec)
+    found.sort(key=_key)
+    return found
+
+
+def _counter(records):
+    return Counter(json.dumps(r, sort_keys=True) for r in records)
+
+
+class HistoryIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(42)
+        self.records = CompactRecords(random_record(self.rng) for _ in range(300))
+        self.index = HistoryIndex(self.records)
+
+    def _random_query(self):
+        rng = self.rng
+        query = {}
+        if rng.random() < 0.4:
+            query["routine"] = rng.choice(ROUTINES + ["Nope"])
+        if rng.random() < 0.3:
+            query["exercise"] = rng.choice(EXERCISES + ["push"])
+        if rng.random() < 0.4:
+            query["prefix"] = rng.choice(["p", "PU", "push", "Squat", "x", ""])
+        if rng.random() < 0.4:
+            query["since"] = rng.choice([f"2024-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}",
+                                         f"2024-02-{rng.randint(1, 28):02d} 12:00:00"])
+        if rng.random() < 0.4:
+            query["until"] = rng.choice([f"2024-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}",
+                                         f"2024-02-{rng.randint(1, 28):02d} 12:00:00"])
+        return query
+
+    def _check_queries(self, count=200):
+        records = list(self.records)
+        for _ in range(count):
+            query = self._random_query()
+            expected = scan(records, **query)
+            page = self.index.query(**query)
+            self.assertEqual(page.total, len(expected), query)
+            # 같은 날짜끼리의 순서는 색인에 넣은 순서라 날짜 순서와 기록 모음만 비교한다
+            self.assertEqual([_key(r) for r in page.records], [_key(r) for r in expected], query)
+            self.assertEqual(_counter(page.records), _counter(expected), query)
+            # 페이지로 나눠 읽어도, 오래된 순서로 읽어도 같은 결과
+            pages = []
+            for offset in range(0, page.total, 7):
+                part = self.index.query(offset=offset, limit=7, **query)
+                self.assertEqual(part.total, page.total)
+                pages.extend(part.records)
+            self.assertEqual(pages, page.records, query)
+            self.assertEqual(self.index.query(newest_first=False, **query).records, page.records[::-1], query)
+            oldest = self.index.query(newest_first=False, offset=2, limit=5, **query).records
+            self.assertEqual(oldest, page.records[::-1][2:7], query)
+
+    def test_queries_match_scan(self):
+        self.assertEqual(self.index.pending, 300)
+        self.assertEqual(self.index.catch_up(120), 120)
+        self.assertEqual(self.index.pending, 180)
+        self.index.catch_up()
+        self.assertEqual(self.index.pending, 0)
+        self._check_queries()
+
+    def test_changes_after_catch_up(self):
+        self.index.catch_up()
+        # 뒤에 읽혀 들어온 기록, 앞에 새로 추가된 기록, 지운 기록
+        for _ in range(80):
+            rec = random_record(self.rng)
+            self.index.append(rec, self.records.append(rec))
+        for _ in range(20):
+            rec = random_record(self.rng)
+            self.index.add(rec, self.records.prepend(rec))
+        for _ in range(40):
+            pos = self.rng.randrange(len(self.records))
+            self.assertTrue(self.index.remove(self.records.id_at(pos)))
+            self.records.pop(pos)
+        self.assertEqual(self.index.pending, 0)
+        self.assertEqual(len(self.index), len(self.records))
+        self._check_queries()
+
+    def test_append_before_catch_up_waits(self):
+        self.index.catch_up(50)
+        rec = random_record(self.rng)
+        self.index.append(rec, self.records.append(rec))
+        # 따라잡기 전에 들어온 기록은 catch_up 이 순서대로 넣는다
+        self.assertEqual(self.index.pending, 251)
+        self.index.catch_up()
+        self.assertEqual(len(self.index), 301)
+        self._check_queries(50)
+
+    def test_exercise_names(self):
+        self.index.catch_up()
+        self.assertEqual(self.index.exercise_names("pu"), ["Pull-up", "push press", "Push-up"])
+        self.assertEqual(self.index.exercise_names("SQUAT"), ["squat", "Squat jump"])
+        self.assertEqual(self.index.exercise_names("z"), [])
+
+    def test_bad_date(self):
+        with self.assertRaises(ValueError):
+            self.index.query(since="2024-13-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+
+from session_checkpoint import ENTRY, SessionCheckpoint
+from session_engine import (MODE_CIRCUIT, MODE_SEQUENTIAL, STEP_DONE, STEP_REST, STEP_SET, SessionEngine,
+                            compile_plan, run_headless)
+
+# -------------------- 운동 세션 엔진 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_session_engine)
+
+EXERCISES = [
+    {"name": "push", "sets": 3, "reps": 10, "rest": 30},
+    {"name": "pull", "sets": 1, "reps": 8, "rest": 0},
+    {"name": "squat", "sets": 2, "reps": 12, "rest": 45},
+]
+
+
+def _steps(plan):
+    return [(s.kind, s.ex_index, s.set_no) for s in plan]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class CompilePlanTest(unittest.TestCase):
+    """운동마다 세트 수가 다르고, 휴식 0초인 운동은 휴식 단계가 없다"""
+
+    def test_sequential(self):
+        plan = compile_plan(EXERCISES, MODE_SEQUENTIAL)
+        self.assertEqual(_steps(plan), [
+            (STEP_SET, 0, 1), (STEP_REST, 0, 1), (STEP_SET, 0, 2), (STEP_REST, 0, 2), (STEP_SET, 0, 3),
+            (STEP_REST, 0, 3), (STEP_SET, 1, 1), (STEP_SET, 2, 1), (STEP_REST, 2, 1), (STEP_SET, 2, 2),
+            (STEP_DONE, -1, 0)])
+        self.assertEqual([s.next for s in plan[:-1]], list(range(1, len(plan))))
+        self.assertEqual(plan[-1].next, len(plan) - 1)
+
+    def test_circuit(self):
+        plan = compile_plan(EXERCISES, MODE_CIRCUIT)
+        sets = [(s.ex_index, s.set_no) for s in plan if s.kind == STEP_SET]
+        self.assertEqual(sets, [(0, 1), (1, 1), (2, 1), (0, 2), (2, 2), (0, 3)])
+        rests = [(s.ex_index, s.rest) for s in plan if s.kind == STEP_REST]
+        # pull(0초) 뒤와 마지막 세트 뒤에는 휴식이 없다
+        self.assertEqual(rests, [(0, 30), (2, 45), (0, 30), (2, 45)])
+        self.assertEqual(plan[-2].kind, STEP_SET)
+
+    def test_all_rests_zero(self):
+        exercises = [dict(ex, rest=0) for ex in EXERCISES]
+        for mode in (MODE_SEQUENTIAL, MODE_CIRCUIT):
+            plan = compile_plan(exercises, mode)
+            self.assertNotIn(STEP_REST, [s.kind for s in plan])
+            self.assertEqual(len(plan), 7)
+
+
+class SessionEngineTest(unittest.TestCase):
+
+    def test_run_headless(self):
+        for mode in (MODE_SEQUENTIAL, MODE_CIRCUIT):
+            engine = run_headless(SessionEngine("A", EXERCISES, mode))
+            self.assertTrue(engine.done)
+            self.assertEqual(engine.sets_done, [3, 1, 2])
+            self.assertEqual(engine.result("2024-01-01 10:00:00"),
+                             {"date": "2024-01-01 10:00:00", "routine": "A", "push": 30, "pull": 8, "squat": 24})
+
+    def test_wrong_step(self):
+        engine = SessionEngine("A", EXERCISES, MODE_SEQUENTIAL)
+        with self.assertRaises(ValueError):
+            engine.finish_rest()
+        engine.complete_set(10)
+        with self.assertRaises(ValueError):
+            engine.complete_set(10)
+
+    def test_skip_rest_while_paused_resumes(self):
+        clock = FakeClock()
+        engine = SessionEngine("A", EXERCISES, MODE_SEQUENTIAL, time_func=clock)
+        engine.complete_set(10)
+        clock.now += 5
+        engine.pause()
+        clock.now += 20
+        # 멈춘 채로 휴식 건너뛰기
+        engine.finish_rest()
+        self.assertFalse(engine.paused)
+        clock.now += 7
+        self.assertEqual(engine.elapsed(), 12)
+
+
+class CheckpointRestoreTest(unittest.TestCase):
+    """세트마다 남긴 체크포인트로 되살린다 — 끝이 잘린 마지막 항목은 버리고 그 자리부터 이어 쓴다"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "session.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _play(self, engine, checkpoint, sets):
+        for _ in range(sets):
+            if engine.step.kind == STEP_REST:
+                engine.finish_rest()
+            position, step = engine.position, engine.step
+            reps = step.reps - 1
+            engine.complete_set(reps)
+            checkpoint.record_set(position, step.ex_index, reps)
+
+    def test_round_trip_with_torn_entry(self):
+        for mode in (MODE_SEQUENTIAL, MODE_CIRCUIT):
+            engine = SessionEngine("A", EXERCISES, mode)
+            checkpoint = SessionCheckpoint(self.path)
+            checkpoint.begin(engine, "2024-01-01 10:00:00")
+            self._play(engine, checkpoint, 4)
+            # 다섯 번째 세트를 쓰다가 꺼졌다
+            os.write(checkpoint._fd, ENTRY.pack(engine.position, engine.step.ex_index, 99)[:7])
+            checkpoint.close()
+
+            checkpoint = SessionCheckpoint(self.path)
+            restored, started = checkpoint.restore()
+            self.assertEqual(started, "2024-01-01 10:00:00")
+            self.assertEqual(restored.mode, mode)
+            self.assertEqual(restored.sets_done, engine.sets_done)
+            self.assertEqual(restored.reps, engine.reps)
+            # 휴식 중에 꺼졌으면 다음 세트부터
+            self.assertEqual(restored.step.kind, STEP_SET)
+
+            checkpoint.reopen()
+            self._play(restored, checkpoint, 2)
+            checkpoint.close()
+            again, _ = SessionCheckpoint(self.path).restore()
+            self.assertEqual(again.sets_done, restored.sets_done)
+            self.assertEqual(sum(again.sets_done), 6)
+            self.assertEqual(run_headless(again, lambda step: step.reps - 1).reps, [27, 7, 22])
+
+    def test_nothing_to_restore(self):
+        checkpoint = SessionCheckpoint(self.path)
+        self.assertIsNone(checkpoint.restore())
+        checkpoint.begin(SessionEngine("A", EXERCISES, MODE_SEQUENTIAL), None)
+        checkpoint.close()
+        self.assertIsNone(SessionCheckpoint(self.path).restore())
+
+
+if __name__ == "__main__":
+    unittest.main()
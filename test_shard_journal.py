@@ -0,0 +1,186 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import cli
+from paths import data_files
+from record_archive import read_archive
+from record_journal import RecordJournal
+from shard_journal import ShardedJournal
+from storage import open_store
+
+# -------------------- 월별 샤드 회귀 테스트 --------------------
+# python -m pytest -q  (또는 python -m unittest test_shard_journal)
+
+
+class MigrateOnceTest(unittest.TestCase):
+    """예전 저널은 처음 한 번만 옮긴다 — 기록을 다 지운 뒤 다시 열어도 되살아나면 안 된다"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.files = data_files(self.dir)
+        legacy = RecordJournal(self.files.journal)
+        legacy.append({"date": "2024-01-01 10:00:00", "routine": "A", "push": 10})
+        legacy.append({"date": "2024-02-01 10:00:00", "routine": "A", "push": 12})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _header(self):
+        store = open_store("json", self.files)
+        try:
+            return store.records_header()
+        finally:
+            store.close()
+
+    def _cli(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = cli.main(["--data-dir", self.dir, *argv])
+        self.assertEqual(code, 0)
+        return out.getvalue()
+
+    def test_deleted_records_stay_deleted_after_compact(self):
+        store = open_store("json", self.files)
+        try:
+            self.assertEqual(store.records_header()["count"], 2)
+            for rec in list(store.iter_records()):
+                store.delete_record(rec)
+            self.assertEqual(store.records_header()["count"], 0)
+        finally:
+            store.close()
+        self._cli("compact")
+        # 예전 저널은 그대로 남아 있지만 다시 옮기지 않는다
+        self.assertTrue(os.path.exists(self.files.journal))
+        self.assertEqual(self._header()["count"], 0)
+        stats = json.loads(self._cli("stats", "--json"))
+        self.assertEqual(stats["records"], 0)
+
+
+class ReadOnlyCliTest(unittest.TestCase):
+    """조회 명령과 merge 의 원본 폴더는 옮기기 전 데이터 폴더에 아무것도 쓰지 않는다"""
+
+    backend = "json"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.dir)
+        legacy = RecordJournal(data_files(self.dir).journal)
+        legacy.append({"date": "2024-01-01 10:00:00", "routine": "A", "push": 10})
+        legacy.append({"date": "2024-02-01 10:00:00", "routine": "A", "push": 12})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _snapshot(self):
+        files = {}
+        for root, _, names in os.walk(self.dir):
+            for name in names:
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, self.dir)] = os.stat(path).st_mtime_ns
+        return files
+
+    def _cli(self, data_dir, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = cli.main(["--data-dir", data_dir, "--backend", self.backend, *argv])
+        self.assertEqual(code, 0)
+        return out.getvalue()
+
+    def test_read_commands_leave_directory_alone(self):
+        before = self._snapshot()
+        stats = json.loads(self._cli(self.dir, "stats", "--json"))
+        self.assertEqual(stats["records"], 2)
+        self._cli(self.dir, "validate")
+        self._cli(self.dir, "profiles")
+        out_path = os.path.join(self.tmp.name, "records.jsonl")
+        self.assertIn("records exported: 2", self._cli(self.dir, "export", "--records", out_path))
+        target = os.path.join(self.tmp.name, "target")
+        os.makedirs(target)
+        self.assertIn("records added: 2", self._cli(target, "merge", self.dir))
+        self.assertEqual(self._snapshot(), before)
+
+
+class SqliteReadOnlyCliTest(ReadOnlyCliTest):
+    backend = "sqlite"
+
+    def test_read_migrated_database(self):
+        open_store("sqlite", data_files(self.dir)).close()
+        before = self._snapshot()
+        self.assertIn("workout.db", before)
+        stats = json.loads(self._cli(self.dir, "stats", "--json"))
+        self.assertEqual(stats["records"], 2)
+        self._cli(self.dir, "validate")
+        self.assertEqual(self._snapshot(), before)
+
+
+class ArchiveCrashTest(unittest.TestCase):
+    """archive() 가 보관 파일을 쓴 뒤 샤드를 지우기 전에 멈춰도 기록이 두 번 남으면 안 된다"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "shards")
+        journal = ShardedJournal(self.dir)
+        journal.append_many([{"date": f"2019-0{m} 10:00:00", "routine": "A", "push": m} for m in (1, 2, 3)])
+        journal.append({"date": "2024-05-01 10:00:00", "routine": "A", "push": 4})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _crash(self, method):
+        journal = ShardedJournal(self.dir)
+
+        def crash(*args):
+            raise KeyboardInterrupt
+        setattr(journal, method, crash)
+        with self.assertRaises(KeyboardInterrupt):
+            journal.archive("2020")
+
+    def _assert_records(self):
+        journal = ShardedJournal(self.dir)
+        self.assertEqual(journal.header()["count"], 4)
+        self.assertEqual(len(journal.load()), 4)
+        return journal
+
+    def test_crash_before_removing_shards(self):
+        self._crash("_remove_shard")
+        journal = self._assert_records()
+        self.assertEqual(journal.header()["shards"], 1)
+        self.assertEqual(journal.archive("2020"), 0)
+        self.assertEqual(len(read_archive(journal._archive_path("2019"))), 3)
+        self._assert_records()
+
+    def test_crash_before_writing_archive(self):
+        self._crash("_write_year")
+        journal = self._assert_records()
+        self.assertEqual(journal.header()["archives"], 0)
+        self.assertEqual(journal.archive("2020"), 3)
+        self._assert_records()
+
+
+class StreamOldestFirstTest(unittest.TestCase):
+    """오래된 순서로 읽기(내보내기)는 보관된 해와 샤드를 이어서 읽고, 전체를 캐시에 올리지 않는다"""
+
+    def test_iter_records_streams_partitions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = open_store("json", data_files(tmp))
+            try:
+                dates = [f"{year}-{month:02d}-03 10:00:00" for year in (2018, 2019, 2024) for month in (11, 2, 7)]
+                store.add_records([{"date": d, "routine": "A", "push": 1} for d in dates])
+                store.add_record({"routine": "A", "push": 2})
+                self.assertEqual(store.archive_records("2020"), 6)
+                records = list(store.iter_records())
+                self.assertIsNone(store.records)
+                self.assertEqual([r.get("date") for r in records], [None] + sorted(dates))
+                self.assertEqual(len(list(store.iter_records(archived=False))), 4)
+            finally:
+                store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
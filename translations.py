@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import weakref
+from string import Formatter
+
+# -------------------- 번역 카탈로그 --------------------
+# languages/<lang>.json 은 언어별로 한 번만 읽어서 메모리에 둔다.
+# 자주 쓰는 문장(운동 줄, 세트/횟수/휴식 표시)은 언어를 바꿀 때 한 번만
+# format 문자열로 만들어 두고, 화면의 글자는 위젯을 다시 만들지 않고 그 자리에서 바꾼다.
+
+# 번역 키를 조합한 format 문자열 ({} 안은 값이 들어갈 자리)
+TEMPLATES = {
+    "exercise_row": "{{name}} - {{sets}} {sets_short} x {{reps}} {reps_short} | {rest_short} {{rest}}{sec_short}",
+    "set_title": "{{name}} ({set_label} {{set}}/{{sets}})",
+    "rep_count": "{{done}}/{{target}} {reps_unit}",
+    "rest_count": "{rest_label}: {{sec}}{sec_short}",
+    "exercise_summary": "{last_time}: {{last}} | {best_reps}: {{best}}",
+    "import_result": "{imported}: {{added}} | {duplicates}: {{duplicates}} | {errors}: {{errors}}",
+    "export_result": "{exported}: {{count}}",
+}
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class TranslationCatalog:
+    """언어 파일 캐시 + 미리 만든 문장 틀 + 위젯 글자 바인딩"""
+
+    def __init__(self, lang_dir, lang):
+        self.lang_dir = lang_dir
+        self._catalogs = {}     # lang -> {key: 번역}
+        self._templates = {}    # lang -> {틀 이름: format 문자열}
+        self._bindings = []     # (위젯 weakref, 속성, 키)
+        self._listeners = []    # 언어가 바뀌면 부를 함수 (값이 들어간 글자 갱신용)
+        self.lang = lang
+        self.strings = self.load(lang)
+        self.templates = self._compile(lang)
+
+    # ---------- 읽기 ----------
+    def load(self, lang):
+        """언어 파일을 한 번만 읽는다"""
+        catalog = self._catalogs.get(lang)
+        if catalog is None:
+            catalog = {}
+            path = os.path.join(self.lang_dir, f"{lang}.json")
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    catalog = {sys.intern(k): v for k, v in data.items() if isinstance(v, str)}
+                except Exception:
+                    catalog = {}
+            self._catalogs[lang] = catalog
+        return catalog
+
+    def preload(self):
+        """languages/ 안의 모든 언어 파일을 미리 읽어 둔다"""
+        try:
+            names = os.listdir(self.lang_dir)
+        except OSError:
+            return
+        for name in names:
+            lang, ext = os.path.splitext(name)
+            if ext == ".json" and lang != "language":
+                self.load(lang)
+                self._compile(lang)
+
+    def _compile(self, lang):
+        templates = self._templates.get(lang)
+        if templates is None:
+            strings = self.load(lang)
+            values = {}
+            for fmt in TEMPLATES.values():
+                # "{key}" 한 겹짜리 자리만 번역 키 ({{...}} 는 값 자리)
+                for _, key, _, _ in Formatter().parse(fmt):
+                    if not key:
+                        continue
+                    values[key] = _escape(strings.get(key, key))
+            templates = {name: fmt.format(**values) for name, fmt in TEMPLATES.items()}
+            self._templates[lang] = templates
+        return templates
+
+    # ---------- 사용 ----------
+    def tr(self, key):
+        return self.strings.get(key, key)
+
+    def template(self, name):
+        return self.templates[name]
+
+    def bind(self, widget, key, attr="text"):
+        """위젯 글자를 번역 키에 묶는다 — 언어가 바뀌면 자동으로 바뀜"""
+        setattr(widget, attr, self.tr(key))
+        self._bindings.append((weakref.ref(widget), attr, key))
+        return widget
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def set_language(self, lang):
+        """언어 전환 — 파일은 처음 한 번만 읽고, 위젯은 그 자리에서 글자만 바꾼다"""
+        self.lang = lang
+        self.strings = self.load(lang)
+        self.templates = self._compile(lang)
+        alive = []
+        for ref, attr, key in self._bindings:
+            widget = ref()
+            if widget is not None:
+                setattr(widget, attr, self.tr(key))
+                alive.append((ref, attr, key))
+        self._bindings = alive
+        for callback in self._listeners:
+            callback()
+
@@ -0,0 +1,50 @@
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.core.text import LabelBase
+
+from paths import resource_path
+from perf import timed
+
+# -------------------- 커스텀 위젯 (첫 화면용) --------------------
+# 폰트는 모듈을 불러올 때가 아니라 처음 글자 위젯을 만들 때 등록한다.
+# 입력창/기록 줄처럼 첫 화면에 없는 위젯은 extra_widgets.py 에 두고 Factory 로 늦게 불러온다.
+
+FONT_NAME = "NotoSans"
+FONT_FILE = resource_path("NotoSansKR-VariableFont_wght.ttf")
+
+_font_registered = False
+
+
+def register_font():
+    """한글 폰트 등록 (한 번만)"""
+    global _font_registered
+    if _font_registered:
+        return
+    _font_registered = True
+    try:
+        LabelBase.register(name=FONT_NAME, fn_regular=FONT_FILE)
+    except Exception:
+        # 폰트 파일이 없으면 (소스에서 바로 실행, 벤치마크 등) 같은 이름으로 Kivy 기본 폰트를 쓴다
+        LabelBase.register(name=FONT_NAME, fn_regular="data/fonts/Roboto-Regular.ttf")
+
+
+class FLabel(Label):
+    def __init__(self, **kwargs):
+        register_font()
+        kwargs.setdefault("font_name", FONT_NAME)
+        super().__init__(**kwargs)
+
+    def texture_update(self, *largs):
+        # 글자 텍스처 만들기 (폰트 렌더링) 시간
+        with timed("label.texture"):
+            super().texture_update(*largs)
+
+class FButton(Button):
+    def __init__(self, **kwargs):
+        register_font()
+        kwargs.setdefault("font_name", FONT_NAME)
+        super().__init__(**kwargs)
+
+    def texture_update(self, *largs):
+        with timed("label.texture"):
+            super().texture_update(*largs)